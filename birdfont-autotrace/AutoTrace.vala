@@ -137,7 +137,7 @@ class AutoTrace {
 			g.left_limit = -w / 2.0;
 			g.right_limit = w / 2.0;
 			
-			bg.center_in_glyph ();
+			bg.center_in_glyph (g);
 						
 			pl = bg.autotrace ();
 			
@@ -168,14 +168,9 @@ class AutoTrace {
 
 public static int main (string[] arg) {
 	AutoTrace autotrace;
-	Preferences p;
 
-	BirdFont.current_font = new Font ();
-	
-	p = new Preferences ();
-	
 	BirdFont.init_gettext ();
-	Theme.set_default_colors ();
+	HeadlessExport.init ();
 	
 	DrawingTools.background_threshold = new SpinButton ();
 	DrawingTools.background_scale = new SpinButton ();
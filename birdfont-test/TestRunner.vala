@@ -1,9 +1,18 @@
 using BirdFont;
 using Cairo;
 
+[CCode (cname = "backtrace", cheader_filename = "execinfo.h")]
+extern int backtrace ([CCode (array_length = false)] void*[] buffer, int size);
+
+[CCode (cname = "backtrace_symbols_fd", cheader_filename = "execinfo.h")]
+extern void backtrace_symbols_fd ([CCode (array_length = false)] void*[] buffer, int size, int fd);
+
 namespace BirdFont {
 
 public class TestRunner : NativeWindow, GLib.Object  {
+	
+	const int MAX_FRAMES = 64;
+	static void* crash_frames[64];
 
 	public static void run (string[] args) {
 		if (args.length < 2) {
@@ -15,6 +24,8 @@ public class TestRunner : NativeWindow, GLib.Object  {
 		
 		if (type == "SVG" || type == "BF") {
 			fuzz_test (args);
+		} else if (type == "FUZZ") {
+			persistent_fuzz_test (args);
 		} else if (type == "speed") {
 			speed_test ();
 		} else {
@@ -26,14 +37,72 @@ public class TestRunner : NativeWindow, GLib.Object  {
 	static void print_usage (string[] args) {
 		print ("Usage: " + args[0] + " TEST FILE\n");
 		print ("TEST parameter can be BF SVG or speed\n");
+		print ("   or: " + args[0] + " FUZZ BF|SVG [DIRECTORY]\n");
+		print ("Load all files in DIRECTORY or each file named on stdin.\n");
 	}
 	
 	public static void fuzz_test (string[] arg) {
 		return_if_fail (arg.length == 3);
 		
-		string type = arg[1];
-		string file = arg[2];
+		load_fuzz_case (arg[1], arg[2]);
+		
+		Process.exit (0);
+	}
+	
+	/** Load many inputs without restarting the process. File names are
+	 * read from stdin, one per line, and DONE is printed when a file
+	 * has been loaded so that a crash can be tied to its input. A
+	 * backtrace is printed to stderr if the process crashes.
+	 */
+	public static void persistent_fuzz_test (string[] arg) {
+		return_if_fail (arg.length == 3 || arg.length == 4);
+		
+		string type = arg[2];
+		string? line;
+		
+		// warnings for broken input are expected
+		Log.set_default_handler ((domain, level, message) => {});
+		
+		Posix.signal (Posix.SIGSEGV, print_backtrace);
+		Posix.signal (Posix.SIGABRT, print_backtrace);
+		Posix.signal (Posix.SIGBUS, print_backtrace);
+		Posix.signal (Posix.SIGFPE, print_backtrace);
+		Posix.signal (Posix.SIGILL, print_backtrace);
+		
+		if (arg.length == 4) {
+			load_fuzz_directory (type, arg[3]);
+		} else {
+			while ((line = stdin.read_line ()) != null) {
+				load_fuzz_case (type, (!) line);
+				print ("DONE\n");
+				stdout.flush ();
+			}
+		}
+		
+		Process.exit (0);
+	}
+	
+	static void load_fuzz_directory (string type, string directory) {
+		File folder = File.new_for_path (directory);
+		FileEnumerator enumerator;
+		FileInfo? info;
+		string path;
 		
+		try {
+			enumerator = folder.enumerate_children (FileAttribute.STANDARD_NAME, 0);
+			
+			while ((info = enumerator.next_file ()) != null) {
+				path = (!) get_child (folder, ((!) info).get_name ()).get_path ();
+				print (@"$path\n");
+				stdout.flush ();
+				load_fuzz_case (type, path);
+			}
+		} catch (GLib.Error e) {
+			warning (e.message);
+		}
+	}
+	
+	static void load_fuzz_case (string type, string file) {
 		if (type == "SVG") {
 			File f = File.new_for_path (file);
 			Font font = new Font ();
@@ -43,8 +112,13 @@ public class TestRunner : NativeWindow, GLib.Object  {
 			font.set_font_file (file);
 			font.load ();
 		}
-		
-		Process.exit (0);
+	}
+	
+	static void print_backtrace (int signal) {
+		int frames = backtrace (crash_frames, MAX_FRAMES);
+		backtrace_symbols_fd (crash_frames, frames, Posix.STDERR_FILENO);
+		Posix.signal (signal, Posix.SIG_DFL);
+		Posix.raise (signal);
 	}
 	
 	static void speed_test () {
@@ -1,32 +1,46 @@
 #!/usr/bin/python3
 
 import dodo
+import os
+from optparse import OptionParser
 from sys import platform
 
 from scripts.builder import process_tasks
+from scripts.builder import get_default_jobs
 from scripts import config
-from scripts.translations import compile_translations
+from scripts.translations import translation_tasks
 from scripts import version
 
+parser = OptionParser()
+parser.add_option ("-j", "--jobs", dest="jobs", type="int", default=get_default_jobs(),
+	help="number of tasks to run at the same time", metavar="N")
+parser.add_option ("-c", "--object-cache", dest="object_cache",
+	default=os.environ.get("BIRDFONT_OBJECT_CACHE"),
+	help="share compiled objects between builds in this directory", metavar="DIRECTORY")
+
+(options, args) = parser.parse_args()
+
+tasks = []
+
 if platform == 'msys':
-	process_tasks(dodo.make_libbirdgems('libbirdgems.dll', []))
-	process_tasks(dodo.make_libbirdfont('libbirdfont.dll', ['libbirdgems.dll']))
+	tasks.append(dodo.make_libbirdgems('libbirdgems.dll', []))
+	tasks.append(dodo.make_libbirdfont('libbirdfont.dll', ['libbirdgems.dll']))
 elif platform == 'darwin':
 	gems = "libbirdgems." + str(version.LIBBIRDGEMS_SO_VERSION) + '.dylib'
 	bird = "libbirdfont." + str(version.SO_VERSION) + '.dylib';
-	process_tasks(dodo.make_libbirdgems(gems, []))
-	process_tasks(dodo.make_libbirdfont(bird, [gems]))
-	process_tasks(dodo.task_man())
+	tasks.append(dodo.make_libbirdgems(gems, []))
+	tasks.append(dodo.make_libbirdfont(bird, [gems]))
 else:
-	process_tasks(dodo.task_libbirdgems())
-	process_tasks(dodo.task_libbirdfont())
+	tasks.append(dodo.task_libbirdgems())
+	tasks.append(dodo.task_libbirdfont())
 
-process_tasks(dodo.task_birdfont())
-process_tasks(dodo.task_birdfont_autotrace())
-process_tasks(dodo.task_birdfont_export())
-process_tasks(dodo.task_birdfont_import())
-process_tasks(dodo.task_man())
+tasks.append(dodo.task_birdfont())
+tasks.append(dodo.task_birdfont_autotrace())
+tasks.append(dodo.task_birdfont_export())
+tasks.append(dodo.task_birdfont_import())
+tasks.append(dodo.task_man())
+tasks.append(translation_tasks())
 
-compile_translations()
+process_tasks(tasks, options.jobs, options.object_cache)
 
 print('Done')
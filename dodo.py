@@ -21,7 +21,7 @@ import subprocess
 import sys
 
 from scripts import version
-from scripts.translations import compile_translations
+from scripts.translations import translation_tasks
 from scripts import config
 from scripts.builder import Builder
 
@@ -178,6 +178,64 @@ def make_birdfont_export(target_binary, deps):
 def task_birdfont_export():
     yield make_birdfont_export('birdfont-export', ['libbirdgems.so', 'libbirdfont.so'])
 
+def make_birdfont_test(target_binary, deps):
+    valac_command = """{valac} \
+        -C \
+		--enable-experimental \
+        --basedir build/birdfont-test/ \
+        {non_null} \
+        {valacflags[birdfont-test]} \
+		birdfont-test/*.vala \
+		--vapidir=./ \
+		--pkg posix \
+		--pkg {gee} \
+		--pkg gio-2.0  \
+		--pkg cairo \
+		--pkg xmlbird \
+		--pkg libbirdfont \
+        """.format(**config.SETTINGS)
+
+    cc_command = """{cc} {cflags[birdfont-test]} \
+        -c C_SOURCE \
+		-D 'GETTEXT_PACKAGE="birdfont"' \
+        -I./build/libbirdfont \
+		$({pkg-config} --cflags sqlite3) \
+		$({pkg-config} --cflags {gee}) \
+		$({pkg-config} --cflags gio-2.0) \
+		$({pkg-config} --cflags cairo) \
+		$({pkg-config} --cflags glib-2.0) \
+		$({pkg-config} --cflags xmlbird) \
+        -o OBJECT_FILE""".format(**config.SETTINGS)
+        
+    linker_command = """{cc} {ldflags[birdfont-test]} \
+		build/birdfont-test/*.o \
+		-Lbuild/bin/ -lbirdfont \
+		-lm \
+		-rdynamic \
+		$({pkg-config} --libs sqlite3) \
+		$({pkg-config} --libs {gee}) \
+		$({pkg-config} --libs gio-2.0) \
+		$({pkg-config} --libs cairo) \
+		$({pkg-config} --libs cairo-gobject) \
+		$({pkg-config} --libs glib-2.0) \
+		$({pkg-config} --libs xmlbird) \
+		-L./build -L./build/bin -l birdgems \
+		-o ./build/bin/""".format(**config.SETTINGS) + target_binary
+
+    birdfont_test = Builder('birdfont-test',
+                              valac_command, 
+                              cc_command,
+                              linker_command,
+                              target_binary,
+                              None,
+                              deps)
+			
+    yield birdfont_test.build()
+
+def task_birdfont_test():
+    """test program used by the fuzzer, not built by default"""
+    yield make_birdfont_test('birdfont-test', ['libbirdgems.so', 'libbirdfont.so'])
+
 def make_birdfont_import(target_binary, deps):
     valac_command = """{valac} \
         -C  \
@@ -405,9 +463,7 @@ def task_libbirdgems():
 
 def task_compile_translations ():
     """translate po files"""
-    return  {
-        'actions': [compile_translations]
-        }
+    yield translation_tasks()
         
 def task_man():
     """gzip linux man pages"""
@@ -144,7 +144,7 @@ public class BackgroundImage : GLib.Object {
 
 	public ScaledBackgrounds get_scaled_backgrounds () {
 		if (scaled == null) {
-			ImageSurface rotated = rotate ((ImageSurface) get_padded_image ());
+			ImageSurface rotated = rotate ((ImageSurface) get_padded_image (false));
 			scaled = new ScaledBackgrounds (rotated);
 		}
 		
@@ -569,7 +569,10 @@ public class BackgroundImage : GLib.Object {
 		cr.restore ();
 	}
 	
-	public Surface get_padded_image () {
+	/** @param white_margin fill the margin with white instead of the
+	 * background color in the theme, the autotrace needs a white margin
+	 */
+	public Surface get_padded_image (bool white_margin) {
 		double x, y;
 		double iw, ih;
 		int h, w;
@@ -590,7 +593,13 @@ public class BackgroundImage : GLib.Object {
 		wc = get_margin_width ();
 		hc = get_margin_height ();
 		
-		Theme.color (cg, "Background 1");
+		// there is no theme in the command line tools
+		if (white_margin || !Theme.has_color ("Background 1")) {
+			cg.set_source_rgba (1, 1, 1, 1);
+		} else {
+			Theme.color (cg, "Background 1");
+		}
+		
 		cg.rectangle (0, 0, size_margin, size_margin);
 		cg.fill ();
 		
@@ -841,12 +850,12 @@ public class BackgroundImage : GLib.Object {
 		scaled_width = (int) (600 * trace_resolution);
 
 		s = new ImageSurface (Format.RGB24, scaled_width, scaled_width);
-		sg = (ImageSurface) get_padded_image ();	
+		sg = (ImageSurface) get_padded_image (true);	
 		sg = rotate (sg);
 		c = new Context (s);
 	
 		c.save ();
-		Theme.color (c, "Background 1");
+		c.set_source_rgba (1, 1, 1, 1);
 		c.rectangle (0, 0, scaled_width, scaled_width);
 		c.fill ();
 
@@ -0,0 +1,280 @@
+/*
+	Copyright (C) 2026 Johan Mattsson
+
+	This library is free software; you can redistribute it and/or modify
+	it under the terms of the GNU Lesser General Public License as
+	published by the Free Software Foundation; either version 3 of the
+	License, or (at your option) any later version.
+
+	This library is distributed in the hope that it will be useful, but
+	WITHOUT ANY WARRANTY; without even the implied warranty of
+	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+	Lesser General Public License for more details.
+*/
+
+namespace BirdFont {
+
+/** Backups of .bf files split in chunks, one chunk per glyph collection
+ * and one for the data between them. Each chunk is compressed and stored
+ * once, named by its checksum. A backup is a manifest that lists the
+ * chunks, a new backup only writes the chunks that have changed.
+ */
+public class BackupStore : GLib.Object {
+	public const string MANIFEST_SUFFIX = ".bf_manifest";
+	public const string CHUNK_DIRECTORY = "chunks";
+	const string MAGIC = "BirdFont backup 1";
+
+	File directory;
+	File chunk_directory;
+
+	public int written_chunks = 0;
+	public int reused_chunks = 0;
+
+	/** @param directory backup directory for one font */
+	public BackupStore (File directory) {
+		this.directory = directory;
+		chunk_directory = get_child (directory, CHUNK_DIRECTORY);
+	}
+
+	public static bool is_manifest (string path) {
+		return path.has_suffix (MANIFEST_SUFFIX);
+	}
+
+	/** Store a backup of a .bf file.
+	 * @param font_path the file to back up
+	 * @param name file name of the manifest without suffix
+	 */
+	public bool save (string font_path, string name) throws GLib.Error {
+		File manifest = get_child (directory, name + MANIFEST_SUFFIX);
+		File temp_file = get_child (directory, "." + name + MANIFEST_SUFFIX + ".tmp");
+		StringBuilder chunks = new StringBuilder ();
+		DataOutputStream os;
+		string data;
+		string chunk;
+		string checksum;
+		int start = 0;
+
+		FileUtils.get_contents (font_path, out data);
+
+		written_chunks = 0;
+		reused_chunks = 0;
+
+		foreach (int end in get_cuts (data)) {
+			if (end > start) {
+				chunk = data.substring (start, end - start);
+				checksum = Checksum.compute_for_string (ChecksumType.SHA1, chunk);
+				write_chunk (checksum, chunk);
+				chunks.append (@"$checksum $(chunk.length)\n");
+				start = end;
+			}
+		}
+
+		os = new DataOutputStream (temp_file.replace (null, false, FileCreateFlags.PRIVATE));
+		os.put_string (MAGIC + "\n");
+		os.put_string (chunks.str);
+		os.close ();
+		temp_file.move (manifest, FileCopyFlags.OVERWRITE);
+
+		printd (@"Backup $name: $written_chunks new chunks, $reused_chunks reused.\n");
+
+		return true;
+	}
+
+	/** Positions where the file is split in chunks. The file is split 
+	 * before each line with a collection tag and after the line that
+	 * ends it. */
+	static Gee.ArrayList<int> get_cuts (string data) {
+		Gee.ArrayList<int> cuts = new Gee.ArrayList<int> ();
+		int position = 0;
+		int start;
+		int end;
+
+		while ((start = data.index_of ("<collection", position)) != -1) {
+			while (start > 0 && data[start - 1] != '\n') {
+				start--;
+			}
+
+			end = data.index_of ("</collection>", start);
+
+			if (end == -1) {
+				break;
+			}
+
+			end = data.index_of ("\n", end);
+
+			if (end == -1) {
+				end = data.length;
+			} else {
+				end++;
+			}
+
+			cuts.add (start);
+			cuts.add (end);
+			position = end;
+		}
+
+		cuts.add (data.length);
+
+		return cuts;
+	}
+
+	File get_chunk_file (string checksum) {
+		File subdirectory = get_child (chunk_directory, checksum.substring (0, 2));
+		return get_child (subdirectory, checksum + ".gz");
+	}
+
+	void write_chunk (string checksum, string chunk) throws GLib.Error {
+		File file = get_chunk_file (checksum);
+		File folder = (!) file.get_parent ();
+		File temp_file;
+		ConverterOutputStream os;
+		size_t written;
+
+		if (file.query_exists ()) {
+			reused_chunks++;
+			return;
+		}
+
+		if (!folder.query_exists ()) {
+			folder.make_directory_with_parents ();
+		}
+
+		temp_file = get_child (folder, "." + (!) file.get_basename () + ".tmp");
+		os = new ConverterOutputStream (temp_file.replace (null, false, FileCreateFlags.PRIVATE),
+			new ZlibCompressor (ZlibCompressorFormat.GZIP));
+		os.write_all (chunk.data, out written);
+		os.close ();
+		temp_file.move (file, FileCopyFlags.OVERWRITE);
+
+		written_chunks++;
+	}
+
+	/** Checksums of all chunks in a manifest. */
+	static Gee.ArrayList<string> read_manifest (File manifest) throws GLib.Error {
+		Gee.ArrayList<string> chunks = new Gee.ArrayList<string> ();
+		DataInputStream dis = new DataInputStream (manifest.read ());
+		string? line;
+		string[] columns;
+
+		if (dis.read_line (null) != MAGIC) {
+			throw new IOError.INVALID_DATA (@"$((!) manifest.get_path ()) is not a backup manifest.");
+		}
+
+		while ((line = dis.read_line (null)) != null) {
+			columns = ((!) line).split (" ");
+
+			if (columns.length != 2) {
+				throw new IOError.INVALID_DATA ("Bad line in backup manifest.");
+			}
+
+			chunks.add (columns[0]);
+		}
+
+		return chunks;
+	}
+
+	/** Assemble the font in a backup.
+	 * @param manifest path to a manifest in this store
+	 * @param destination the restored .bf file
+	 */
+	public bool restore (string manifest, File destination) {
+		ConverterInputStream chunk_stream;
+		FileOutputStream os;
+		uint8[] buffer = new uint8[64 * 1024];
+		ssize_t read;
+		size_t written;
+		Checksum checksum;
+
+		try {
+			os = destination.replace (null, false, FileCreateFlags.PRIVATE);
+
+			foreach (string chunk in read_manifest (File.new_for_path (manifest))) {
+				chunk_stream = new ConverterInputStream (get_chunk_file (chunk).read (),
+					new ZlibDecompressor (ZlibCompressorFormat.GZIP));
+				checksum = new Checksum (ChecksumType.SHA1);
+
+				while ((read = chunk_stream.read (buffer)) > 0) {
+					checksum.update (buffer, read);
+					os.write_all (buffer[0:read], out written);
+				}
+
+				chunk_stream.close ();
+
+				if (checksum.get_string () != chunk) {
+					throw new IOError.INVALID_DATA (@"Backup chunk $chunk is damaged.");
+				}
+			}
+
+			os.close ();
+		} catch (GLib.Error e) {
+			warning (@"Can't restore $manifest: $(e.message)");
+			return false;
+		}
+
+		return true;
+	}
+
+	/** Restore a backup to a temporary file.
+	 * @return path to a .bf_backup file or null if it can't be restored
+	 */
+	public static string? restore_to_temporary_file (string manifest) {
+		File file = File.new_for_path (manifest);
+		File directory = (!) file.get_parent ();
+		BackupStore store = new BackupStore (directory);
+		string name = (!) file.get_basename ();
+		File destination;
+
+		name = name.substring (0, name.length - MANIFEST_SUFFIX.length);
+		destination = get_child (File.new_for_path (Environment.get_tmp_dir ()), name + ".bf_backup");
+
+		if (!store.restore (manifest, destination)) {
+			return null;
+		}
+
+		return (string?) destination.get_path ();
+	}
+
+	/** Delete all chunks that are not used in any of the manifests. */
+	public void delete_unused_chunks (Gee.ArrayList<string> manifests) {
+		Gee.HashSet<string> used = new Gee.HashSet<string> ();
+		FileEnumerator subdirectories;
+		FileEnumerator chunks;
+		FileInfo? info;
+		FileInfo? chunk_info;
+		File subdirectory;
+		string name;
+
+		if (!chunk_directory.query_exists ()) {
+			return;
+		}
+
+		try {
+			// an unreadable manifest stops the cleanup before any chunk is deleted
+			foreach (string manifest in manifests) {
+				if (is_manifest (manifest)) {
+					used.add_all (read_manifest (File.new_for_path (manifest)));
+				}
+			}
+
+			subdirectories = chunk_directory.enumerate_children (FileAttribute.STANDARD_NAME, 0);
+			while ((info = subdirectories.next_file ()) != null) {
+				subdirectory = get_child (chunk_directory, ((!) info).get_name ());
+				chunks = subdirectory.enumerate_children (FileAttribute.STANDARD_NAME, 0);
+
+				while ((chunk_info = chunks.next_file ()) != null) {
+					name = ((!) chunk_info).get_name ();
+
+					if (name.has_suffix (".gz") && !used.contains (name.substring (0, name.length - ".gz".length))) {
+						printd (@"Deleting backup chunk: $name\n");
+						get_child (subdirectory, name).delete ();
+					}
+				}
+			}
+		} catch (GLib.Error e) {
+			warning (e.message);
+			warning ("Can't delete unused backup chunks.");
+		}
+	}
+}
+
+}
@@ -41,7 +41,19 @@ public class BackupTab : Table {
 		} else if (row.get_index () == FONT_FILE) {
 			return_if_fail (row.get_row_data () is String);
 			String backup_file = (String) row.get_row_data ();
-			RecentFiles.load_font (backup_file.c_str);
+			string path = backup_file.c_str;
+			
+			if (BackupStore.is_manifest (path)) {
+				string? restored = BackupStore.restore_to_temporary_file (path);
+				
+				if (restored == null) {
+					return;
+				}
+				
+				path = (!) restored;
+			}
+			
+			RecentFiles.load_font (path);
 			MainWindow.scrollbar.set_size (0);
 		}
 
@@ -107,9 +119,14 @@ public class BackupTab : Table {
 	
 	public string get_time_stamp_from_file_name (string file_name) {
 		int dash = file_name.last_index_of ("-");
+		string suffix = ".bf_backup";
+		
+		if (BackupStore.is_manifest (file_name)) {
+			suffix = BackupStore.MANIFEST_SUFFIX;
+		}
 		
-		if (file_name.has_suffix (".bf_backup") && dash > -1) {
-			string time_stamp = file_name.substring (dash + "-".length, file_name.length - dash - ".bf_backup".length);
+		if (file_name.has_suffix (suffix) && dash > -1) {
+			string time_stamp = file_name.substring (dash + "-".length, file_name.length - dash - suffix.length);
 			time_stamp = time_stamp.replace ("_", " ");
 			return time_stamp;
 		}
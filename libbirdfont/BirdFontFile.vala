@@ -32,6 +32,11 @@ class BirdFontFile : GLib.Object {
 	//public bool has_svg_glyphs = false;
 
 	Gee.ArrayList<string> written_images = new Gee.ArrayList<string> ();
+	
+	/** Buffer for path data, reused for all paths in the font. */
+	StringBuilder point_data = new StringBuilder ();
+	
+	const int WRITE_BUFFER_SIZE = 256 * 1024;
 		
 	public BirdFontFile (Font f) {
 		font = f;
@@ -60,15 +65,33 @@ class BirdFontFile : GLib.Object {
 		return ok;
 	}
 	
+	/** Load font-wide data and an index of all glyph collections in a 
+	 * .bf file. The glyphs are parsed when they are used.
+	 * @param path path to a valid .bf file
+	 */
+	public bool load_lazy (string path) {
+		BirdFontFileIndex index = new BirdFontFileIndex (path);
+		XmlParser parser;
+		
+		if (!index.load ()) {
+			return false;
+		}
+
+		font.background_images.clear ();
+		font.font_file = path;
+		font.set_glyph_index (index);
+		
+		parser = new XmlParser (index.get_metadata ());
+		return load_xml (parser);
+	}
+	
 	public bool load_part (string bfp_file) {
 		string xml_data;
-		XmlParser parser;
 		bool ok = false;
 	
 		try {
 			FileUtils.get_contents(bfp_file, out xml_data);
-			parser = new XmlParser (xml_data);
-			ok = load_xml (parser);
+			ok = load_part_data (xml_data);
 		} catch (GLib.FileError e) {
 			warning (e.message);
 		}
@@ -76,6 +99,12 @@ class BirdFontFile : GLib.Object {
 		return ok;
 	}
 
+	/** Parse one part of a .bfp font. */
+	public bool load_part_data (string xml_data) {
+		XmlParser parser = new XmlParser (xml_data);
+		return load_xml (parser);
+	}
+
 	/** Load a new .bf file.
 	 * @param xml_data data for a valid .bf file
 	 */
@@ -100,6 +129,8 @@ class BirdFontFile : GLib.Object {
 	}
 
 	public bool write_font_file (string path, bool backup = false) {
+		font.parse_all_glyph_collections ();
+		
 		try {
 			DataOutputStream os;
 			File file;
@@ -115,7 +146,8 @@ class BirdFontFile : GLib.Object {
 				file.delete ();
 			}
 
-			os = new DataOutputStream (file.create (FileCreateFlags.REPLACE_DESTINATION));
+			os = new DataOutputStream (new BufferedOutputStream.sized (
+				file.create (FileCreateFlags.REPLACE_DESTINATION), WRITE_BUFFER_SIZE));
 			write_root_tag (os);
 			
 			// this a backup of another font
@@ -474,7 +506,7 @@ class BirdFontFile : GLib.Object {
 	}
 
 	void write_layer (Layer layer, DataOutputStream os) throws GLib.Error {
-		string data;
+		StringBuilder data = point_data;
 		
 		// FIXME: name etc.
 		os.put_string (@"\t\t<layer name= \"$(layer.name)\" visible=\"$(layer.visible)\">\n");
@@ -482,8 +514,10 @@ class BirdFontFile : GLib.Object {
 		PathList all_paths = layer.get_all_paths ();
 			
 		foreach (Path p in all_paths.paths) {
-			data = get_point_data (p);
-			if (data != "") {
+			data.truncate (0);
+			append_point_data (p, data);
+			
+			if (data.len > 0) {
 				os.put_string (@"\t\t\t<path ");
 				
 				if (p.stroke != 0) {
@@ -502,7 +536,9 @@ class BirdFontFile : GLib.Object {
 					os.put_string (@"skew=\"$(double_to_string (p.skew))\" ");
 				}
 				
-				os.put_string (@"data=\"$(data)\" />\n");
+				os.put_string ("data=\"");
+				os.put_string (data.str);
+				os.put_string ("\" />\n");
 			}
 		}
 		
@@ -510,8 +546,8 @@ class BirdFontFile : GLib.Object {
 	}
 
 	public static string double_to_string (double n) {
-		string d = @"$n";
-		return d.replace (",", ".");
+		// to_string uses g_ascii_dtostr, it does not depend on the locale
+		return n.to_string ();
 	}
 
 	/** Get control points in BirdFont format. This function is uses a
@@ -534,12 +570,18 @@ class BirdFontFile : GLib.Object {
 	 */
 	public static string get_point_data (Path pl) {
 		StringBuilder data = new StringBuilder ();
+		append_point_data (pl, data);
+		return data.str;
+	}
+
+	/** Append control points in BirdFont format to a buffer. */
+	public static void append_point_data (Path pl, StringBuilder data) {
 		EditPoint? n = null;
 		EditPoint m;
 		int i = 0;
 		
 		if (pl.points.size == 0) {
-			return data.str;
+			return;
 		}
 		
 		if (pl.points.size == 1) {
@@ -551,7 +593,7 @@ class BirdFontFile : GLib.Object {
 				data.append (" O");
 			}
 			
-			return data.str;
+			return;
 		}
 		
 		if (pl.points.size == 2) {
@@ -565,7 +607,7 @@ class BirdFontFile : GLib.Object {
 				data.append (" O");
 			}
 			
-			return data.str;
+			return;
 		}
 		
 		pl.create_list ();
@@ -593,8 +635,6 @@ class BirdFontFile : GLib.Object {
 		if (pl.is_open ()) {
 			data.append (" O");
 		}
-		
-		return data.str;
 	}
 	
 	private static void add_start_point (EditPoint e, StringBuilder data) {
@@ -610,63 +650,39 @@ class BirdFontFile : GLib.Object {
 	}
 
 	private static void add_quadratic_start (EditPoint p, StringBuilder data) {
-		string x, y;
-		
-		x = round (p.x);
-		y = round (p.y);
-		
-		data.append (@"R $(x),$(y)");
+		data.append ("R ");
+		append_coordinate (data, p.x, p.y);
 	}
 		
 	private static void add_double_start (EditPoint p, StringBuilder data) {
-		double x, y;
-		
-		x = p.x;
-		y = p.y;
-		
-		data.append (@"S $(round (x)),$(round (y))");
+		data.append ("S ");
+		append_coordinate (data, p.x, p.y);
 	}
 
 	private static void add_cubic_start (EditPoint p, StringBuilder data) {
-		double x, y;
-		
-		x = p.x;
-		y = p.y;
-		
-		data.append (@"B $(round (x)),$(round (y))");
+		data.append ("B ");
+		append_coordinate (data, p.x, p.y);
 	}
 
 	private static void add_quadratic_line_to (EditPoint p, StringBuilder data) {
-		string x, y;
-		
-		x = round (p.x);
-		y = round (p.y);
-		
-		data.append (@"K $(x),$(y)");
+		data.append ("K ");
+		append_coordinate (data, p.x, p.y);
 	}
 
 	private static void add_line_to (EditPoint p, StringBuilder data) {
-		double x, y;
-		
-		x = p.x;
-		y = p.y;
-		
-		data.append (@"L $(round (x)),$(round (y))");
+		data.append ("L ");
+		append_coordinate (data, p.x, p.y);
 	}
 
 	private static void add_cubic_line_to (EditPoint p, StringBuilder data) {
-		double x, y;
-		
-		x = p.x;
-		y = p.y;
-		
-		data.append (@"M $(round (x)),$(round (y))");
+		data.append ("M ");
+		append_coordinate (data, p.x, p.y);
 	}
 
-	private static void quadratic_line (Path path, string px, string py) {
+	private static void quadratic_line (Path path, double x, double y) {
 		EditPoint ep;
 		
-		path.add (parse_double (px), parse_double (py));
+		path.add (x, y);
 		ep = path.get_last_point ();
 		ep.get_right_handle ().type = PointType.LINE_QUADRATIC;
 		ep.get_left_handle ().type = PointType.LINE_QUADRATIC;
@@ -683,7 +699,10 @@ class BirdFontFile : GLib.Object {
 		x1 = end.x;
 		y1 = end.y;
 	
-		data.append (@"Q $(round (x0)),$(round (y0)) $(round (x1)),$(round (y1))");
+		data.append ("Q ");
+		append_coordinate (data, x0, y0);
+		data.append_c (' ');
+		append_coordinate (data, x1, y1);
 	}
 
 	private static void add_double (EditPoint start, EditPoint end, StringBuilder data) {
@@ -698,7 +717,12 @@ class BirdFontFile : GLib.Object {
 		x2 = end.x;
 		y2 = end.y;
 
-		data.append (@"D $(round (x0)),$(round (y0)) $(round (x1)),$(round (y1)) $(round (x2)),$(round (y2))");
+		data.append ("D ");
+		append_coordinate (data, x0, y0);
+		data.append_c (' ');
+		append_coordinate (data, x1, y1);
+		data.append_c (' ');
+		append_coordinate (data, x2, y2);
 	}
 
 	private static void add_cubic (EditPoint start, EditPoint end, StringBuilder data) {
@@ -713,7 +737,12 @@ class BirdFontFile : GLib.Object {
 		x2 = end.x;
 		y2 = end.y;
 
-		data.append (@"C $(round (x0)),$(round (y0)) $(round (x1)),$(round (y1)) $(round (x2)),$(round (y2))");
+		data.append ("C ");
+		append_coordinate (data, x0, y0);
+		data.append_c (' ');
+		append_coordinate (data, x1, y1);
+		data.append_c (' ');
+		append_coordinate (data, x2, y2);
 	}
 
 	private static void add_next_point (EditPoint start, EditPoint end, StringBuilder data) {
@@ -739,8 +768,7 @@ class BirdFontFile : GLib.Object {
 		}
 
 		if (end.tie_handles) {
-			data.append (" ");
-			data.append (@"T");
+			data.append (" T");
 		}	
 	}
 	
@@ -1016,7 +1044,10 @@ class BirdFontFile : GLib.Object {
 					img = (!) new_img;
 					img.name = name;
 					
-					Toolbox.background_tools.add_image (img);
+					if (!is_null (Toolbox.background_tools)) {
+						Toolbox.background_tools.add_image (img);
+					}
+					
 					parse_image_selections (img, t);
 					
 					img.img_x = x;
@@ -1327,16 +1358,45 @@ class BirdFontFile : GLib.Object {
 
 	/** Parse the new glyph format */
 	private void parse_glyph_collection (Tag tag) {
-		unichar unicode = 0;
+		unichar unicode;
 		GlyphCollection gc;
 		GlyphCollection? current_gc;
 		bool new_glyph_collection;
+		string name;
+		bool unassigned;
+		string master_id;
+		
+		parse_collection_attributes (tag, out unicode, out name, 
+			out unassigned, out master_id);
+
+		current_gc = font.get_glyph_collection_by_name (name);
+		new_glyph_collection = (current_gc == null);
+		
+		if (!new_glyph_collection) {
+			gc =  (!) current_gc;
+		} else {
+			gc = new GlyphCollection (unicode, name);
+		}
+		
+		parse_glyph_collection_content (tag, gc, name, unicode, 
+			unassigned, master_id);
+		
+		if (new_glyph_collection) {
+			font.add_glyph_collection (gc);
+		}
+	}
+
+	/** Obtain name, unicode value and master from a collection tag. */
+	public static void parse_collection_attributes (Tag tag, 
+		out unichar unicode, out string name, out bool unassigned,
+		out string master_id) {
+			
 		StringBuilder b;
-		string name = "";
-		int selected_id = -1;
-		bool unassigned = false;
-		string master_id = "";
-		GlyphMaster master;
+		
+		unicode = 0;
+		name = "";
+		unassigned = false;
+		master_id = "";
 		
 		foreach (Attribute attribute in tag.get_attributes ()) {			
 			if (attribute.get_name () == "unicode") {
@@ -1363,15 +1423,14 @@ class BirdFontFile : GLib.Object {
 				master_id = attribute.get_content ();
 			}
 		}
-
-		current_gc = font.get_glyph_collection_by_name (name);
-		new_glyph_collection = (current_gc == null);
-		
-		if (!new_glyph_collection) {
-			gc =  (!) current_gc;
-		} else {
-			gc = new GlyphCollection (unicode, name);
-		}
+	}
+	
+	/** Add the glyphs in a collection tag to a glyph collection. */
+	public void parse_glyph_collection_content (Tag tag, GlyphCollection gc,
+		string name, unichar unicode, bool unassigned, string master_id) {
+			
+		int selected_id = -1;
+		GlyphMaster master;
 		
 		if (gc.has_master (master_id)) {
 			master = gc.get_master (master_id);
@@ -1392,10 +1451,6 @@ class BirdFontFile : GLib.Object {
 				parse_glyph (t, gc, master, name, unicode, selected_id, unassigned);
 			}
 		}
-		
-		if (new_glyph_collection) {
-			font.add_glyph_collection (gc);
-		}
 	}
 
 	private int parse_selected (Tag tag) {
@@ -1537,10 +1592,10 @@ class BirdFontFile : GLib.Object {
 		return path;	
 	}
 	
-	private static void line (Path path, string px, string py) {
+	private static void line (Path path, double x, double y) {
 		EditPoint ep;
 		
-		path.add (parse_double (px), parse_double (py));
+		path.add (x, y);
 		ep = path.get_last_point ();
 		ep.get_right_handle ().type = PointType.LINE_DOUBLE_CURVE;
 		ep.get_left_handle ().type = PointType.LINE_DOUBLE_CURVE;
@@ -1548,23 +1603,18 @@ class BirdFontFile : GLib.Object {
 		path.recalculate_linear_handles_for_point (ep);
 	}
 
-	private static void cubic_line (Path path, string px, string py) {
+	private static void cubic_line (Path path, double x, double y) {
 		EditPoint ep;
 		
-		path.add (parse_double (px), parse_double (py));
+		path.add (x, y);
 		ep = path.points.get (path.points.size - 1);
 		ep.get_right_handle ().type = PointType.LINE_CUBIC;
 		ep.type = PointType.LINE_CUBIC;
 		path.recalculate_linear_handles_for_point (ep);
 	}
 
-	private static void quadratic (Path path, string px0, string py0, string px1, string py1) {
+	private static void quadratic (Path path, double x0, double y0, double x1, double y1) {
 		EditPoint ep1, ep2;
-		
-		double x0 = parse_double (px0);
-		double y0 = parse_double (py0);
-		double x1 = parse_double (px1);
-		double y1 = parse_double (py1);
 
 		if (path.points.size == 0) {
 			warning ("No point.");
@@ -1586,16 +1636,8 @@ class BirdFontFile : GLib.Object {
 		ep2.type = PointType.QUADRATIC;
 	}
 
-	private static void cubic (Path path, string px0, string py0, string px1, string py1, string px2, string py2) {
+	private static void cubic (Path path, double x0, double y0, double x1, double y1, double x2, double y2) {
 		EditPoint ep1, ep2;
-		
-		double x0 = parse_double (px0);
-		double y0 = parse_double (py0);
-		double x1 = parse_double (px1);
-		double y1 = parse_double (py1);
-		double x2 = parse_double (px2);
-		double y2 = parse_double (py2);
-		
 		double lx, ly;
 				
 		if (path.points.size == 0) {
@@ -1632,16 +1674,8 @@ class BirdFontFile : GLib.Object {
 	}
 	
 	/** Two quadratic off curve points. */
-	private static void double_curve (Path path, string px0, string py0, string px1, string py1, string px2, string py2) {
+	private static void double_curve (Path path, double x0, double y0, double x1, double y1, double x2, double y2) {
 		EditPoint ep1, ep2;
-		
-		double x0 = parse_double (px0);
-		double y0 = parse_double (py0);
-		double x1 = parse_double (px1);
-		double y1 = parse_double (py1);
-		double x2 = parse_double (px2);
-		double y2 = parse_double (py2);
-		
 		double lx, ly;
 				
 		if (path.points.size == 0) {
@@ -1699,104 +1733,72 @@ class BirdFontFile : GLib.Object {
 		path.close ();
 	}
 	
+	/** Parse path data in a single pass. Instructions and coordinates are
+	 * read directly from the string, numbers are parsed with 
+	 * g_ascii_strtod which is locale independent.
+	 */
 	public static void parse_path_data (string data, Path path) {
-		string[] d = data.split (" ");
-		string[] p, p1, p2;
+		char* d = (char*) data;
 		int i = 0;
-		string instruction = "";
+		char instruction;
 		bool open = false;
+		double x0, y0, x1, y1, x2, y2;
 
 		if (data == "") {
 			return;
 		}
 		
-		return_if_fail (d.length > 1);
+		instruction = read_instruction (d, ref i);
 		
-		if (!(d[0] == "R" || d[0] == "S" || d[0] == "B")) {
+		if (!(instruction == 'R' || instruction == 'S' || instruction == 'B')) {
 			warning ("No start point.");
 			return;
 		}
 		
-		instruction = d[i++];
-
-		if (instruction == "R") {
-			p = d[i++].split (",");
-			return_if_fail (p.length == 2);
-			quadratic_line (path, p[0], p[1]);
-		}
-	
-		if (instruction == "S") {
-			p = d[i++].split (",");
-			return_if_fail (p.length == 2);
-			line (path, p[0], p[1]);
-		}
-
-		if (instruction == "B") {
-			p = d[i++].split (",");
-			return_if_fail (p.length == 2);
-			cubic_line (path, p[0], p[1]);
+		return_if_fail (read_coordinate (d, ref i, out x0, out y0));
+		
+		if (instruction == 'R') {
+			quadratic_line (path, x0, y0);
+		} else if (instruction == 'S') {
+			line (path, x0, y0);
+		} else {
+			cubic_line (path, x0, y0);
 		}
 		
-		while (i < d.length) {
-			instruction = d[i++];
+		while (d[i] != '\0') {
+			instruction = read_instruction (d, ref i);
 			
-			if (instruction == "") {
+			if (instruction == '\0') {
 				warning (@"No instruction at index $i.");
 				return;
 			}
 
-			if (instruction == "K") {
-				return_if_fail (i < d.length);
-				p = d[i++].split (",");
-				return_if_fail (p.length == 2);
-				quadratic_line (path, p[0], p[1]);
-			} else if (instruction == "L") {
-				return_if_fail (i < d.length);
-				p = d[i++].split (",");
-				return_if_fail (p.length == 2);
-				line (path, p[0], p[1]);
-			}else if (instruction == "M") {
-				return_if_fail (i < d.length);
-				p = d[i++].split (",");
-				return_if_fail (p.length == 2);
-				cubic_line (path, p[0], p[1]);
-			} else if (instruction == "Q") {
-				return_if_fail (i + 1 < d.length);
-				
-				p = d[i++].split (",");
-				p1 = d[i++].split (",");
-				
-				return_if_fail (p.length == 2);
-				return_if_fail (p1.length == 2);
-				
-				quadratic (path, p[0], p[1], p1[0], p1[1]);
-			} else if (instruction == "D") {
-				return_if_fail (i + 2 < d.length);
-				
-				p = d[i++].split (",");
-				p1 = d[i++].split (",");
-				p2 = d[i++].split (",");
-
-				return_if_fail (p.length == 2);
-				return_if_fail (p1.length == 2);
-				return_if_fail (p2.length == 2);
-				
-				double_curve (path, p[0], p[1], p1[0], p1[1], p2[0], p2[1]);
-			} else if (instruction == "C") {
-				return_if_fail (i + 2 < d.length);
-				
-				p = d[i++].split (",");
-				p1 = d[i++].split (",");
-				p2 = d[i++].split (",");
-
-				return_if_fail (p.length == 2);
-				return_if_fail (p1.length == 2);
-				return_if_fail (p2.length == 2);
-				
-				cubic (path, p[0], p[1], p1[0], p1[1], p2[0], p2[1]);
-			} else if (instruction == "T") {
+			if (instruction == 'K') {
+				return_if_fail (read_coordinate (d, ref i, out x0, out y0));
+				quadratic_line (path, x0, y0);
+			} else if (instruction == 'L') {
+				return_if_fail (read_coordinate (d, ref i, out x0, out y0));
+				line (path, x0, y0);
+			} else if (instruction == 'M') {
+				return_if_fail (read_coordinate (d, ref i, out x0, out y0));
+				cubic_line (path, x0, y0);
+			} else if (instruction == 'Q') {
+				return_if_fail (read_coordinate (d, ref i, out x0, out y0));
+				return_if_fail (read_coordinate (d, ref i, out x1, out y1));
+				quadratic (path, x0, y0, x1, y1);
+			} else if (instruction == 'D') {
+				return_if_fail (read_coordinate (d, ref i, out x0, out y0));
+				return_if_fail (read_coordinate (d, ref i, out x1, out y1));
+				return_if_fail (read_coordinate (d, ref i, out x2, out y2));
+				double_curve (path, x0, y0, x1, y1, x2, y2);
+			} else if (instruction == 'C') {
+				return_if_fail (read_coordinate (d, ref i, out x0, out y0));
+				return_if_fail (read_coordinate (d, ref i, out x1, out y1));
+				return_if_fail (read_coordinate (d, ref i, out x2, out y2));
+				cubic (path, x0, y0, x1, y1, x2, y2);
+			} else if (instruction == 'T') {
 				path.points.get (path.points.size - 1).tie_handles = true;
-			} else if (instruction == "O") {
+			} else if (instruction == 'O') {
 				open = true;
 			} else {
 				warning (@"invalid instruction $instruction");
@@ -1817,6 +1819,70 @@ class BirdFontFile : GLib.Object {
 		path.update_region_boundaries (); 
 	}
 	
+	/** Read a one letter instruction and the space after it.
+	 * @return the instruction or \0 if there is no instruction at index 
+	 */
+	public static char read_instruction (char* data, ref int index) {
+		char instruction = data[index];
+		char next;
+		
+		if (instruction == '\0' || instruction == ' ') {
+			return '\0';
+		}
+
+		next = data[index + 1];
+		
+		if (next == ' ') {
+			index += 2;
+		} else if (next == '\0') {
+			index += 1;
+		} else {
+			return '\0';
+		}
+		
+		return instruction;
+	}
+	
+	/** Read a coordinate on the form x,y and the space after it. */
+	public static bool read_coordinate (char* data, ref int index, out double x, out double y) {
+		y = 0;
+		
+		if (!read_number (data, ref index, out x) || data[index] != ',') {
+			warning (@"failed to parse coordinate at index $index");
+			return false;
+		}
+		
+		index++;
+		
+		if (!read_number (data, ref index, out y)) {
+			warning (@"failed to parse coordinate at index $index");
+			return false;
+		}
+		
+		if (data[index] == ' ') {
+			index++;
+		} else if (data[index] != '\0') {
+			warning (@"failed to parse coordinate at index $index");
+			return false;
+		}
+		
+		return true;
+	}
+	
+	static bool read_number (char* data, ref int index, out double number) {
+		unowned string end;
+		char* start = data + index;
+		
+		number = ((string) start).to_double (out end);
+		
+		if ((char*) end == start) {
+			return false;
+		}
+		
+		index += (int) ((char*) end - start);
+		return true;
+	}
+	
 	private static double parse_double (string p) {
 		double d;
 		if (double.try_parse (p, out d)) {
@@ -1953,21 +2019,68 @@ class BirdFontFile : GLib.Object {
 	}
 
 	public static string round (double p, int decimals = 5) {
-		string v = "";
-		char[] c = new char [501];
+		StringBuilder v = new StringBuilder ();
+		append_number (v, p, decimals);
+		return v.str;
+	}
+
+	static void append_coordinate (StringBuilder data, double x, double y) {
+		append_number (data, x);
+		data.append_c (',');
+		append_number (data, y);
+	}
+
+	/** Append a number with a fixed number of decimals, without trailing
+	 * zeros and without sign for negative zero. The number is formatted
+	 * in a buffer on the stack, independent of the locale. The buffer
+	 * is large enough for all digits of the largest double.
+	 */
+	public static void append_number (StringBuilder data, double p, int decimals = 5) {
+		char buffer[512];
+		unowned string v;
+		int length;
+		bool zero;
+		
+		if (decimals == 5) {
+			v = p.format (buffer, "%.5f");
+		} else {
+			v = p.format (buffer, @"%.$(decimals)f");
+		}
 		
-		v = p.format (c, @"%.$(decimals)f");
-		v = v.replace (",", ".");
+		length = v.length;
 		
-		if (v.index_of ("e") != -1) {	
-			v = "0.0";
+		if (v.index_of_char ('e') != -1) {
+			data.append_c ('0');
+			return;
 		}
-
-		if (v.index_of ("-") == 0 && double.parse (v) == -0) {
-			v = "0";
+		
+		if (v[0] == '-') {
+			zero = true;
+			
+			for (int i = 1; i < length; i++) {
+				if (v[i] != '0' && v[i] != '.') {
+					zero = false;
+					break;
+				}
+			}
+			
+			if (zero) {
+				data.append_c ('0');
+				return;
+			}
 		}
-
-		return remove_last_zeros (v);
+		
+		if (v.index_of_char ('.') != -1) {
+			while (v[length - 1] == '0') {
+				length--;
+			}
+			
+			if (v[length - 1] == '.') {
+				length--;
+			}
+		}
+		
+		data.append_len (v, length);
 	}
 	
 	public static string remove_last_zeros (string value) {	
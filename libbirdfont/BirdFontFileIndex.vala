@@ -0,0 +1,367 @@
+/*
+	Copyright (C) 2026 Johan Mattsson
+
+	This library is free software; you can redistribute it and/or modify
+	it under the terms of the GNU Lesser General Public License as
+	published by the Free Software Foundation; either version 3 of the
+	License, or (at your option) any later version.
+
+	This library is distributed in the hope that it will be useful, but
+	WITHOUT ANY WARRANTY; without even the implied warranty of
+	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+	Lesser General Public License for more details.
+*/
+using B;
+
+namespace BirdFont {
+
+/** Byte offsets of all collection tags in a .bf file. The index is
+ * stored next to the font and reused as long as the font is unchanged.
+ */
+public class BirdFontFileIndex : GLib.Object {
+	const string MAGIC = "BirdFont index 1";
+	const string COLLECTION_START = "<collection";
+	const string COLLECTION_END = "</collection>";
+
+	string path;
+	File index_file;
+	MappedFile? mapped_file = null;
+
+	uint64 file_size = 0;
+	uint64 modification_time = 0;
+
+	Gee.ArrayList<IndexedCollection> entries;
+
+	/** Entries for glyph collections that have not been parsed yet. */
+	Gee.HashMap<string, Gee.ArrayList<IndexedCollection>> unparsed;
+
+	public BirdFontFileIndex (string path) {
+		File file = File.new_for_path (path);
+		File folder = (!) file.get_parent ();
+
+		this.path = path;
+		index_file = get_child (folder, @".$((!) file.get_basename ()).index");
+		entries = new Gee.ArrayList<IndexedCollection> ();
+		unparsed = new Gee.HashMap<string, Gee.ArrayList<IndexedCollection>> ();
+	}
+
+	/** Read the index from disk or create it if the font has changed. */
+	public bool load () {
+		File file = File.new_for_path (path);
+		FileInfo info;
+
+		try {
+			info = file.query_info (FileAttribute.STANDARD_SIZE + ","
+				+ FileAttribute.TIME_MODIFIED + ","
+				+ FileAttribute.TIME_MODIFIED_USEC, FileQueryInfoFlags.NONE);
+
+			file_size = info.get_size ();
+			modification_time = info.get_attribute_uint64 (FileAttribute.TIME_MODIFIED) * 1000000
+				+ info.get_attribute_uint32 (FileAttribute.TIME_MODIFIED_USEC);
+		} catch (GLib.Error e) {
+			warning (e.message);
+			return false;
+		}
+
+		if (!load_index ()) {
+			entries.clear ();
+
+			if (!scan ()) {
+				return false;
+			}
+
+			save_index ();
+		}
+
+		try {
+			mapped_file = new MappedFile (path, false);
+		} catch (GLib.FileError e) {
+			warning (e.message);
+			return false;
+		}
+
+		if (((!) mapped_file).get_length () != file_size) {
+			warning (@"$path was changed while it was loaded.");
+			return false;
+		}
+
+		foreach (IndexedCollection entry in entries) {
+			if (!unparsed.has_key (entry.name)) {
+				unparsed.set (entry.name, new Gee.ArrayList<IndexedCollection> ());
+			}
+
+			unparsed.get (entry.name).add (entry);
+		}
+
+		return true;
+	}
+
+	/** Find all collection tags in the file. */
+	bool scan () {
+		string data;
+		IndexedCollection entry;
+		int position = 0;
+		int start;
+		int tag_end;
+		int end;
+		int embedded;
+		char next;
+
+		try {
+			FileUtils.get_contents (path, out data);
+		} catch (GLib.FileError e) {
+			warning (e.message);
+			return false;
+		}
+
+		embedded = data.index_of ("<embedded");
+
+		while ((start = data.index_of (COLLECTION_START, position)) != -1) {
+			next = data[start + COLLECTION_START.length];
+
+			if (next != ' ' && next != '>' && next != '\t' && next != '\n') {
+				position = start + COLLECTION_START.length;
+				continue;
+			}
+
+			tag_end = data.index_of (">", start);
+
+			if (tag_end == -1) {
+				warning ("Incomplete collection tag.");
+				return false;
+			}
+
+			if (data[tag_end - 1] == '/') {
+				end = tag_end + 1;
+			} else {
+				end = data.index_of (COLLECTION_END, tag_end);
+
+				if (end == -1) {
+					warning ("Collection tag is not closed.");
+					return false;
+				}
+
+				end += COLLECTION_END.length;
+			}
+
+			if (embedded != -1 && embedded < start) {
+				embedded = data.index_of ("<embedded", start);
+			}
+
+			entry = new IndexedCollection.for_tag (data.substring (start, tag_end + 1 - start));
+			entry.offset = start;
+			entry.length = end - start;
+			entry.embedded = embedded != -1 && embedded < end;
+			entries.add (entry);
+
+			position = end;
+		}
+
+		return true;
+	}
+
+	/** Font-wide data, everything in the file except the glyphs. */
+	public string get_metadata () {
+		StringBuilder metadata = new StringBuilder ();
+		char* data = ((!) mapped_file).get_contents ();
+		uint64 position = 0;
+
+		foreach (IndexedCollection entry in entries) {
+			metadata.append_len ((string) (data + position), (ssize_t) (entry.offset - position));
+			position = entry.offset + entry.length;
+		}
+
+		metadata.append_len ((string) (data + position), (ssize_t) (file_size - position));
+
+		return metadata.str;
+	}
+
+	/** Add a glyph collection without glyphs for each entry in the index. */
+	public void add_glyph_collections (Font font) {
+		GlyphCollection gc;
+
+		foreach (Gee.ArrayList<IndexedCollection> collections in unparsed.values) {
+			IndexedCollection entry = collections.get (0);
+
+			gc = new GlyphCollection (entry.unicode, entry.name);
+			gc.set_unassigned (entry.unassigned);
+			font.add_glyph_collection (gc);
+
+			foreach (IndexedCollection e in collections) {
+				if (e.embedded) {
+					font.has_svg = true;
+				}
+			}
+		}
+	}
+
+	/** Parse the glyphs for a collection unless it is done already. */
+	public void parse_glyph_collection (Font font, GlyphCollection gc) {
+		Gee.ArrayList<IndexedCollection>? collections = null;
+		BirdFontFile bf;
+		XmlParser parser;
+		string data;
+
+		lock (unparsed) {
+			if (unparsed.size == 0) {
+				return;
+			}
+
+			if (unparsed.unset (gc.get_name (), out collections)) {
+				bf = new BirdFontFile (font);
+
+				foreach (IndexedCollection entry in (!) collections) {
+					data = ((string) (((!) mapped_file).get_contents () + entry.offset)).ndup ((size_t) entry.length);
+					parser = new XmlParser (data);
+					bf.parse_glyph_collection_content (parser.get_root_tag (), gc,
+						entry.name, entry.unicode, entry.unassigned, entry.master_id);
+				}
+			}
+
+			if (unparsed.size == 0) {
+				mapped_file = null;
+			}
+		}
+	}
+
+	public void parse_all (Font font) {
+		Gee.ArrayList<string> names;
+		GlyphCollection? gc;
+
+		lock (unparsed) {
+			names = new Gee.ArrayList<string> ();
+			names.add_all (unparsed.keys);
+		}
+
+		foreach (string name in names) {
+			gc = font.glyph_name.get (name);
+
+			if (gc != null) {
+				parse_glyph_collection (font, (!) gc);
+			}
+		}
+	}
+
+	bool load_index () {
+		DataInputStream dis;
+		IndexedCollection entry;
+		uint32 count;
+
+		if (!index_file.query_exists ()) {
+			return false;
+		}
+
+		try {
+			dis = new DataInputStream (index_file.read ());
+
+			if (dis.read_line (null) != MAGIC
+				|| dis.read_uint64 () != file_size
+				|| dis.read_uint64 () != modification_time) {
+				return false;
+			}
+
+			count = dis.read_uint32 ();
+			for (uint32 i = 0; i < count; i++) {
+				entry = new IndexedCollection ();
+				entry.name = read_string (dis);
+				entry.master_id = read_string (dis);
+				entry.unicode = (unichar) dis.read_uint32 ();
+				entry.unassigned = dis.read_byte () != 0;
+				entry.embedded = dis.read_byte () != 0;
+				entry.offset = dis.read_uint64 ();
+				entry.length = dis.read_uint64 ();
+
+				if (entry.offset + entry.length > file_size) {
+					warning ("Bad offset in font index.");
+					return false;
+				}
+
+				entries.add (entry);
+			}
+		} catch (GLib.Error e) {
+			warning (e.message);
+			return false;
+		}
+
+		return true;
+	}
+
+	void save_index () {
+		File temp_file = get_child ((!) index_file.get_parent (), (!) index_file.get_basename () + ".tmp");
+		DataOutputStream os;
+
+		try {
+			os = new DataOutputStream (temp_file.replace (null, false, FileCreateFlags.PRIVATE));
+			os.put_string (MAGIC + "\n");
+			os.put_uint64 (file_size);
+			os.put_uint64 (modification_time);
+			os.put_uint32 (entries.size);
+
+			foreach (IndexedCollection entry in entries) {
+				write_string (os, entry.name);
+				write_string (os, entry.master_id);
+				os.put_uint32 ((uint32) entry.unicode);
+				os.put_byte (entry.unassigned ? 1 : 0);
+				os.put_byte (entry.embedded ? 1 : 0);
+				os.put_uint64 (entry.offset);
+				os.put_uint64 (entry.length);
+			}
+
+			os.close ();
+			temp_file.move (index_file, FileCopyFlags.OVERWRITE);
+		} catch (GLib.Error e) {
+			printd (@"Can't write font index: $(e.message)\n");
+		}
+	}
+
+	static void write_string (DataOutputStream os, string s) throws GLib.Error {
+		size_t written;
+		os.put_uint32 (s.length);
+		os.write_all (s.data, out written);
+	}
+
+	static string read_string (DataInputStream dis) throws GLib.Error {
+		uint32 length = dis.read_uint32 ();
+		uint8[] data = new uint8[length];
+		StringBuilder s = new StringBuilder ();
+		size_t read;
+
+		dis.read_all (data, out read);
+
+		if (read != length) {
+			throw new IOError.FAILED ("Font index is truncated.");
+		}
+
+		s.append_len ((string) data, length);
+		return s.str;
+	}
+}
+
+/** Location and name of one collection tag in a .bf file. */
+public class IndexedCollection : GLib.Object {
+	public string name = "";
+	public string master_id = "";
+	public unichar unicode = '\0';
+	public bool unassigned = false;
+	public bool embedded = false;
+	public uint64 offset = 0;
+	public uint64 length = 0;
+
+	public IndexedCollection () {
+	}
+
+	public IndexedCollection.for_tag (string start_tag) {
+		XmlParser parser;
+		string tag = start_tag;
+
+		if (!tag.has_suffix ("/>")) {
+			tag += "</collection>";
+		}
+
+		parser = new XmlParser (tag);
+		BirdFontFile.parse_collection_attributes (parser.get_root_tag (),
+			out unicode, out name, out unassigned, out master_id);
+	}
+}
+
+}
@@ -12,6 +12,8 @@
 	Lesser General Public License for more details.
 */
 
+using B;
+
 namespace BirdFont {
 
 /** BirdFontPart is a class for parsing .bfp files. The file format is 
@@ -25,6 +27,22 @@ public class BirdFontPart : GLib.Object{
 	unowned Font font;
 	Gee.ArrayList<string> parts;
 	string root_directory;
+	
+	/** Checksums for the content of all parts, as they are on disk. The
+	 * key is the path relative to the root directory. */
+	Gee.HashMap<string, string> saved_parts;
+	
+	/** Parts that will be written in the next call to save. */
+	Gee.ArrayList<ModifiedPart> modified_parts;
+	int next_part = 0;
+	
+	/** Write files in parallel if more than this many parts are modified. */
+	const int PARALLEL_WRITES = 64;
+	
+	/** Glyph files that are parsed in the current call to load. */
+	Gee.ArrayList<GlyphPart> glyph_parts;
+	int64 loaded_bytes = 0;
+	double load_time = 0;
 
 	static string FILE_ATTRIBUTES = "standard::*";
 
@@ -37,14 +55,21 @@ public class BirdFontPart : GLib.Object{
 		
 		parts = new Gee.ArrayList<string> ();
 		root_directory = "";
+		saved_parts = new Gee.HashMap<string, string> ();
+		modified_parts = new Gee.ArrayList<ModifiedPart> ();
+		glyph_parts = new Gee.ArrayList<GlyphPart> ();
 	}
 	
 	public bool load (string bfp_file) {
 		BirdFontFile bf = new BirdFontFile (font);
 		File bfp_dir;
 		File image_dir;
+		string xml_data;
+		double start;
 		
 		try {
+			start = GLib.get_real_time ();
+			
 			find_all_parts (bfp_file);
 			font.set_bfp (true);
 			
@@ -54,9 +79,20 @@ public class BirdFontPart : GLib.Object{
 			image_dir = get_child (bfp_dir, "images");
 			copy_backgrounds ((!) image_dir.get_path ());
 
+			saved_parts.clear ();
+			loaded_bytes = 0;
+			
+			load_glyph_parts ();
+			
 			foreach (string fn in parts) {
-				bf.load_part (fn);
+				FileUtils.get_contents (fn, out xml_data);
+				saved_parts.set (get_relative_path (fn), get_checksum (xml_data.data));
+				loaded_bytes += xml_data.length;
+				bf.load_part_data (xml_data);
 			}
+			
+			load_time = (GLib.get_real_time () - start) / 1000000.0;
+			printd (get_load_statistics () + "\n");
 		} catch (GLib.Error e) {
 			warning (e.message);
 			return false;
@@ -65,6 +101,141 @@ public class BirdFontPart : GLib.Object{
 		return true;
 	}
 	
+	/** Number of files, throughput and time for the last call to load. */
+	public string get_load_statistics () {
+		double files_per_second = 0;
+		double megabytes_per_second = 0;
+		
+		if (load_time > 0) {
+			files_per_second = saved_parts.size / load_time;
+			megabytes_per_second = loaded_bytes / load_time / (1024 * 1024);
+		}
+		
+		return @"Loaded $(saved_parts.size) parts, $loaded_bytes bytes in "
+			+ "%.3fs (%.0f files/s, %.2f MB/s)".printf (load_time,
+				files_per_second, megabytes_per_second);
+	}
+	
+	/** Parse all glyph files on a thread pool and add the glyphs to the font.
+	 * The glyphs are parsed into collections that are not attached to the
+	 * font, they are merged in the order of the file names once all files
+	 * have been parsed. Files with the selected version are left in the
+	 * list of parts and parsed after the glyphs. 
+	 */
+	void load_glyph_parts () {
+		Gee.ArrayList<Thread<void*>> threads = new Gee.ArrayList<Thread<void*>> ();
+		Gee.ArrayList<string> other_parts = new Gee.ArrayList<string> ();
+		string glyph_dir = (!) get_child (File.new_for_path (root_directory), "glyphs").get_path ();
+		int workers = 1;
+		
+		glyph_parts = new Gee.ArrayList<GlyphPart> ();
+		
+		foreach (string fn in parts) {
+			File f = File.new_for_path (fn);
+			
+			if (fn.has_prefix (glyph_dir + "/") 
+				&& !((!) f.get_basename ()).has_prefix ("selected_")) {
+				glyph_parts.add (new GlyphPart (fn, get_relative_path (fn)));
+			} else {
+				other_parts.add (fn);
+			}
+		}
+		
+		glyph_parts.sort ((a, b) => {
+			return strcmp (((GlyphPart) a).relative_path, ((GlyphPart) b).relative_path);
+		});
+		
+		other_parts.sort ((a, b) => {
+			return strcmp ((string) a, (string) b);
+		});
+		
+		parts = other_parts;
+		next_part = 0;
+		
+		if (glyph_parts.size > PARALLEL_WRITES) {
+			workers = (int) get_num_processors ();
+		}
+		
+		for (int i = 1; i < workers; i++) {
+			try {
+				threads.add (new Thread<void*>.try ("bfp loader", parse_glyph_parts));
+			} catch (GLib.Error e) {
+				warning (e.message);
+				break;
+			}
+		}
+		
+		parse_glyph_parts ();
+		
+		foreach (Thread<void*> t in threads) {
+			t.join ();
+		}
+		
+		foreach (GlyphPart part in glyph_parts) {
+			if (part.parsed) {
+				saved_parts.set (part.relative_path, part.checksum);
+				loaded_bytes += part.size;
+				merge_glyph_part (part);
+			}
+		}
+		
+		glyph_parts.clear ();
+	}
+
+	void* parse_glyph_parts () {
+		BirdFontFile bf = new BirdFontFile (font);
+		GlyphPart? part;
+		
+		while ((part = get_next_glyph_part ()) != null) {
+			((!) part).parse (bf);
+		}
+		
+		return null;
+	}
+	
+	GlyphPart? get_next_glyph_part () {
+		GlyphPart? part = null;
+		
+		lock (next_part) {
+			if (next_part < glyph_parts.size) {
+				part = glyph_parts.get (next_part);
+				next_part++;
+			}
+		}
+		
+		return part;
+	}
+	
+	/** Move the glyphs from a detached collection to the font. */
+	void merge_glyph_part (GlyphPart part) {
+		GlyphCollection? existing_collection;
+		GlyphCollection gc;
+		GlyphMaster master;
+		
+		existing_collection = font.get_glyph_collection_by_name (part.collection.get_name ());
+		
+		if (existing_collection == null) {
+			font.add_glyph_collection (part.collection);
+			return;
+		}
+		
+		gc = (!) existing_collection;
+		gc.set_unassigned (part.collection.is_unassigned ());
+		
+		foreach (GlyphMaster detached_master in part.collection.glyph_masters) {
+			if (gc.has_master (detached_master.get_id ())) {
+				master = gc.get_master (detached_master.get_id ());
+			} else {
+				master = new GlyphMaster.for_id (detached_master.get_id ());
+				gc.add_master (master);
+			}
+			
+			foreach (Glyph g in detached_master.glyphs) {
+				master.insert_glyph (g, false);
+			}
+		}
+	}
+	
 	public string get_path () {
 		string path = "";
 		
@@ -77,8 +248,13 @@ public class BirdFontPart : GLib.Object{
 		return path;
 	}
 	
+	/** Write the parts that have been modified since the font was loaded 
+	 * or saved. Each part is serialized and compared to the checksum of
+	 * the file on disk, only files with new content are written.
+	 */
 	public bool save () {
 		DataOutputStream os;
+		MemoryOutputStream data;
 		BirdFontFile bf = new BirdFontFile (font);
 		bool error = false;
 		string file_name;
@@ -89,6 +265,9 @@ public class BirdFontPart : GLib.Object{
 			warning ("No directory is created for this birdfont part.");
 			return false;
 		}
+		
+		font.parse_all_glyph_collections ();
+		modified_parts.clear ();
 			
 		try {
 			// remove deleted glyphs
@@ -99,53 +278,59 @@ public class BirdFontPart : GLib.Object{
 				
 				if (glyph_file.query_exists ()) {
 					glyph_file.delete ();
+					print (@"$((!)glyph_file.get_path ())\n");
 				}
 				
-				print (@"$((!)glyph_file.get_path ())\n");
+				saved_parts.unset (get_relative_path ((!) glyph_file.get_path ()));
 			}
 			
-			os = create_file (@"$(font.full_name).bfp");
+			font.deleted_glyphs.clear ();
+			
+			os = create_stream (out data);
 			bf.write_root_tag (os);
 			bf.write_closing_root_tag (os);
-			os.close ();
+			add_part (os, data, @"$(font.full_name).bfp");
 			
-			os = create_file ("description.bfp");
+			os = create_stream (out data);
 			bf.write_root_tag (os);
 			bf.write_description (os);
 			bf.write_closing_root_tag (os);
-			os.close ();
+			add_part (os, data, "description.bfp");
 
-			os = create_file ("lines.bfp");
+			os = create_stream (out data);
 			bf.write_root_tag (os);
 			bf.write_lines (os);
 			bf.write_closing_root_tag (os);
-			os.close ();
+			add_part (os, data, "lines.bfp");
 
-			os = create_file ("settings.bfp");
+			os = create_stream (out data);
 			bf.write_root_tag (os);
 			bf.write_settings (os);
 			bf.write_closing_root_tag (os);
-			os.close ();
+			add_part (os, data, "settings.bfp");
 
-			os = create_file ("spacing.bfp");
+			os = create_stream (out data);
 			bf.write_root_tag (os);
 			bf.write_spacing_classes (os);
 			bf.write_closing_root_tag (os);
-			os.close ();
+			add_part (os, data, "spacing.bfp");
 
-			os = create_file ("ligatures.bfp");
+			os = create_stream (out data);
 			bf.write_root_tag (os);
 			bf.write_ligatures (os);
 			bf.write_closing_root_tag (os);
-			os.close ();
+			add_part (os, data, "ligatures.bfp");
 
-			os = create_file ("alternates.bfp");
+			os = create_stream (out data);
 			bf.write_root_tag (os);
 			bf.write_alternates (os);
 			bf.write_closing_root_tag (os);
-			os.close ();
+			add_part (os, data, "alternates.bfp");
 			
 			font.glyph_cache.for_each ((gc) => {
+				MemoryOutputStream glyph_data;
+				DataOutputStream glyph_stream;
+				
 				try {
 					string selected_file_name;
 					string dir_name;
@@ -159,16 +344,15 @@ public class BirdFontPart : GLib.Object{
 					
 					// selected glyph
 					foreach (GlyphMaster master in gc.glyph_masters) {
-						os = create_file (@"selected_$(selected_file_name)_$(master.get_id ()).bfp", "glyphs", dir_name);
-						bf.write_root_tag (os);
-						bf.write_glyph_collection_start (gc, master, os);
-						bf.write_selected ((!) master, os);
-						bf.write_glyph_collection_end (os);
-						bf.write_closing_root_tag (os);
-						os.close ();
+						glyph_stream = create_stream (out glyph_data);
+						bf.write_root_tag (glyph_stream);
+						bf.write_glyph_collection_start (gc, master, glyph_stream);
+						bf.write_selected ((!) master, glyph_stream);
+						bf.write_glyph_collection_end (glyph_stream);
+						bf.write_closing_root_tag (glyph_stream);
+						add_part (glyph_stream, glyph_data, @"selected_$(selected_file_name)_$(master.get_id ()).bfp", "glyphs", dir_name);
 					}
 					
-					
 					foreach (GlyphMaster master in gc.glyph_masters) {
 						foreach (Glyph g in master.glyphs) {
 							try {
@@ -186,26 +370,151 @@ public class BirdFontPart : GLib.Object{
 				}
 			});
 
-			os = create_file ("kerning.bfp");
+			os = create_stream (out data);
 			bf.write_root_tag (os);
 			bf.write_kerning (os);
 			bf.write_closing_root_tag (os);
-			os.close ();
+			add_part (os, data, "kerning.bfp");
 
-			os = create_file ("images.bfp");
+			os = create_stream (out data);
 			bf.write_root_tag (os);
 			bf.write_images (os);
 			bf.write_closing_root_tag (os);
-			os.close ();
-						
+			add_part (os, data, "images.bfp");
+			
+			if (!write_modified_parts ()) {
+				error = true;
+			}
 		} catch (GLib.Error e) {
 			warning (@"Failed to save bfp files to $root_directory\n");
 			warning (@"$(e.message) \n");
 			error = true;
 		}
 		
+		modified_parts.clear ();
+		
 		return !error;
 	}
+	
+	/** Relative paths to all parts that will be written in the next save. */
+	public Gee.ArrayList<string> get_modified_parts () {
+		Gee.ArrayList<string> modified = new Gee.ArrayList<string> ();
+		
+		foreach (ModifiedPart part in modified_parts) {
+			modified.add (part.relative_path);
+		}
+		
+		return modified;
+	}
+
+	DataOutputStream create_stream (out MemoryOutputStream data) {
+		data = new MemoryOutputStream.resizable ();
+		return new DataOutputStream (data);
+	}
+
+	/** Queue a part for writing if it differs from the file on disk. */
+	void add_part (DataOutputStream os, MemoryOutputStream data, string name, 
+		string subdir1 = "", string subdir2 = "") throws GLib.Error {
+		
+		ModifiedPart part;
+		File file;
+		string relative_path;
+		string checksum;
+		string? saved_checksum;
+		uint8[] content;
+		
+		os.close ();
+		content = data.steal_data ();
+		content.length = (int) data.get_data_size ();
+		
+		file = get_destination_file (name, subdir1, subdir2);
+		relative_path = get_relative_path ((!) file.get_path ());
+		checksum = get_checksum (content);
+		saved_checksum = saved_parts.get (relative_path);
+		
+		if (saved_checksum != null && (!) saved_checksum == checksum && file.query_exists ()) {
+			return;
+		}
+		
+		part = new ModifiedPart (file, relative_path, checksum);
+		part.data = (owned) content;
+		modified_parts.add (part);
+	}
+	
+	bool write_modified_parts () {
+		Gee.ArrayList<Thread<void*>> threads = new Gee.ArrayList<Thread<void*>> ();
+		int workers = 1;
+		bool written = true;
+		
+		next_part = 0;
+		
+		if (modified_parts.size > PARALLEL_WRITES) {
+			workers = (int) get_num_processors ();
+		}
+		
+		for (int i = 1; i < workers; i++) {
+			try {
+				threads.add (new Thread<void*>.try ("bfp writer", write_parts));
+			} catch (GLib.Error e) {
+				warning (e.message);
+				break;
+			}
+		}
+		
+		write_parts ();
+		
+		foreach (Thread<void*> t in threads) {
+			t.join ();
+		}
+		
+		foreach (ModifiedPart part in modified_parts) {
+			if (part.written) {
+				saved_parts.set (part.relative_path, part.checksum);
+			} else {
+				written = false;
+			}
+		}
+		
+		return written;
+	}
+	
+	void* write_parts () {
+		ModifiedPart? part;
+		
+		while ((part = get_next_part ()) != null) {
+			((!) part).write ();
+		}
+		
+		return null;
+	}
+	
+	ModifiedPart? get_next_part () {
+		ModifiedPart? part = null;
+		
+		lock (next_part) {
+			if (next_part < modified_parts.size) {
+				part = modified_parts.get (next_part);
+				next_part++;
+			}
+		}
+		
+		return part;
+	}
+	
+	string get_relative_path (string path) {
+		File root = File.new_for_path (root_directory);
+		string? relative_path = root.get_relative_path (File.new_for_path (path));
+		
+		if (relative_path == null) {
+			return path;
+		}
+		
+		return (!) relative_path;
+	}
+	
+	static string get_checksum (uint8[] data) {
+		return Checksum.compute_for_data (ChecksumType.SHA1, data);
+	}
 
 	void copy_backgrounds (string folder) throws GLib.Error {
 		FileInfo info;
@@ -275,17 +584,18 @@ public class BirdFontPart : GLib.Object{
 		string file_name;
 		string dir_name;
 		DataOutputStream os;
+		MemoryOutputStream data;
 	 
 		file_name = get_glyph_base_file_name (g, master);
 		dir_name = get_subdir_name (file_name);
 					
-		os = create_file (@"$(file_name).bfp", "glyphs", dir_name);
+		os = create_stream (out data);
 		bf.write_root_tag (os);
 		bf.write_glyph_collection_start (gc, master, os);
 		bf.write_glyph (g, os);
 		bf.write_glyph_collection_end (os);
 		bf.write_closing_root_tag (os);
-		os.close ();
+		add_part (os, data, @"$(file_name).bfp", "glyphs", dir_name);
 	}
 
 	void write_glyph_background_image (BirdFontFile bf, GlyphCollection gc, Glyph g) throws GLib.Error {
@@ -444,31 +754,104 @@ public class BirdFontPart : GLib.Object{
 		
 		return file;
 	}
+}
+
+/** A part of a .bfp font with new content. */
+class ModifiedPart : GLib.Object {
+	public File file;
+	public string relative_path;
+	public string checksum;
+	public uint8[] data = new uint8[0];
+	public bool written = false;
 	
-	private DataOutputStream create_file (string name, string subdir1 = "", string subdir2 = "") throws GLib.Error {
-		DataOutputStream os;
-		File file;
-		string git_path;
+	public ModifiedPart (File file, string relative_path, string checksum) {
+		this.file = file;
+		this.relative_path = relative_path;
+		this.checksum = checksum;
+	}
+	
+	/** Write the data to a temporary file and rename it. New files are
+	 * created with the permissions given by the umask and existing files
+	 * keep their permissions.
+	 */
+	public void write () {
+		File temp_file = get_child ((!) file.get_parent (), "." + (!) file.get_basename () + ".tmp");
+		FileOutputStream os;
+		FileInfo info;
+		size_t bytes_written;
 		
-		file = get_destination_file (name, subdir1, subdir2);
+		try {
+			os = temp_file.replace (null, false, FileCreateFlags.NONE);
+			os.write_all (data, out bytes_written);
+			os.close ();
+			
+			if (file.query_exists ()) {
+				info = file.query_info (FileAttribute.UNIX_MODE, FileQueryInfoFlags.NONE);
+				
+				if (info.has_attribute (FileAttribute.UNIX_MODE)) {
+					temp_file.set_attribute_uint32 (FileAttribute.UNIX_MODE, 
+						info.get_attribute_uint32 (FileAttribute.UNIX_MODE), 
+						FileQueryInfoFlags.NONE);
+				}
+			}
+			
+			temp_file.move (file, FileCopyFlags.OVERWRITE);
+			written = true;
+		} catch (GLib.Error e) {
+			warning (@"Can't write $((!) file.get_path ()): $(e.message)");
+		}
+	}
+}
 
-		if (file.query_exists ()) {
-			file.delete ();
+/** A glyph file in a .bfp font, parsed without modifying the font. */
+class GlyphPart : GLib.Object {
+	public string path;
+	public string relative_path;
+	public string checksum = "";
+	public int64 size = 0;
+	public GlyphCollection collection;
+	public bool parsed = false;
+	
+	public GlyphPart (string path, string relative_path) {
+		this.path = path;
+		this.relative_path = relative_path;
+		collection = new GlyphCollection ('\0', "");
+	}
+	
+	public void parse (BirdFontFile bf) {
+		string xml_data;
+		XmlParser parser;
+		unichar unicode;
+		string name;
+		bool unassigned;
+		string master_id;
+		
+		try {
+			FileUtils.get_contents (path, out xml_data);
+		} catch (GLib.FileError e) {
+			warning (e.message);
+			return;
 		}
 		
-		os = new DataOutputStream (file.create (FileCreateFlags.REPLACE_DESTINATION));
+		checksum = Checksum.compute_for_data (ChecksumType.SHA1, xml_data.data);
+		size = xml_data.length;
+		parser = new XmlParser (xml_data);
 		
-		if (subdir2 != "") {
-			git_path = subdir1 + "/" + subdir2 + "/" + name;
-		} else if (subdir1 != "") {
-			git_path = subdir1 + "/" + name;
-		} else {
-			git_path = name;
+		foreach (Tag t in parser.get_root_tag ()) {
+			if (t.get_name () == "collection") {
+				BirdFontFile.parse_collection_attributes (t, out unicode, out name,
+					out unassigned, out master_id);
+				
+				if (collection.get_name () == "") {
+					collection = new GlyphCollection (unicode, name);
+				}
+				
+				bf.parse_glyph_collection_content (t, collection, name, unicode,
+					unassigned, master_id);
+			}
 		}
 		
-		// FIXME: git_index.add_path (git_path);
-		
-		return os;
+		parsed = collection.get_name () != "";
 	}
 }
 
@@ -14,6 +14,15 @@ public class CharDatabase {
 
 	static unowned Database db;
 	static Database? database = null;
+	
+	/** Query for the full text index, null if the database has no index. */
+	static Statement? search_statement = null;
+	static Statement? word_statement = null;
+	
+	/** Ranges for the most recent searches. */
+	static Gee.HashMap<string, string> search_cache;
+	static Gee.ArrayList<string> cached_queries;
+	const int SEARCH_CACHE_SIZE = 64;
 
 	public CharDatabase () {
 		File f;
@@ -34,6 +43,26 @@ public class CharDatabase {
 		if (rc != Sqlite.OK) {
 			stderr.printf ("Can't open database: %d, %s\n", rc, db.errmsg ());
 		}
+		
+		search_cache = new Gee.HashMap<string, string> ();
+		cached_queries = new Gee.ArrayList<string> ();
+		search_statement = prepare ("SELECT rowid FROM WordSearch WHERE WordSearch MATCH ?;");
+		word_statement = prepare ("SELECT unicode FROM Words WHERE word GLOB ?;");
+		
+		if (search_statement == null) {
+			printd ("No full text index in the character database.\n");
+		}
+	}
+	
+	static Statement? prepare (string sql) {
+		Statement statement;
+		int rc = db.prepare_v2 (sql, sql.length, out statement, null);
+		
+		if (rc != Sqlite.OK) {
+			return null;
+		}
+		
+		return (owned) statement;
 	}
 	
 	public static File get_database_file () {
@@ -43,11 +72,22 @@ public class CharDatabase {
 	public static GlyphRange search (string s) {
 		GlyphRange result = new GlyphRange ();
 		GlyphRange ucd_result = new GlyphRange ();
-		int rc, cols;
-		Statement statement;
-		string select;
+		Gee.ArrayList<string> terms = new Gee.ArrayList<string> ();
 		unichar c;
 		string query = s.strip ();
+		string? cached_ranges;
+		
+		cached_ranges = get_cached_search (query);
+		
+		if (cached_ranges != null) {
+			try {
+				result.parse_ranges ((!) cached_ranges);
+			} catch (MarkupError e) {
+				warning (e.message);
+			}
+			
+			return result;
+		}
 		
 		if (query.has_prefix ("U+") || query.has_prefix ("u+")) {
 			c = Font.to_unichar (query.down ());
@@ -61,64 +101,142 @@ public class CharDatabase {
 			result.add_single (s.get_char (0));
 		}
 
-		string[] terms = query.split (" ");
+		foreach (string term in query.split (" ")) {
+			if (term != "") {
+				terms.add (term);
+			}
+		}
 		
-		bool first = true;
-		select = "";
+		if (terms.size > 0) {
+			if (search_statement != null && !has_wildcards (terms)) {
+				search_words (terms, ucd_result);
+			} else {
+				search_patterns (terms, ucd_result);
+			}
+		}
 		
+		try {
+			if (ucd_result.get_length () > 0) {
+				ucd_result.sort ();
+				result.parse_ranges (ucd_result.get_all_ranges ());
+			}
+		} catch (MarkupError e) {
+			warning (e.message);
+		}
+		
+		add_cached_search (query, result.get_all_ranges ());
+		
+		return result;
+	}
+	
+	static bool has_wildcards (Gee.ArrayList<string> terms) {
 		foreach (string term in terms) {
-			if (first) {
-				select = "SELECT unicode FROM Words "
-					 + "WHERE word GLOB '" + term.replace ("'", "''") + "' ";
-			} else {
-				select += "OR word GLOB '" + term.replace ("'", "''") + "' ";
+			if (term.index_of_char ('*') != -1
+				|| term.index_of_char ('?') != -1
+				|| term.index_of_char ('[') != -1) {
+				return true;
+			}
+		}
+		
+		return false;
+	}
+	
+	/** Find characters with all words in the full text index. */
+	static void search_words (Gee.ArrayList<string> terms, GlyphRange ucd_result) {
+		StringBuilder match = new StringBuilder ();
+		unowned Statement statement = (!) search_statement;
+		int rc;
+		
+		foreach (string term in terms) {
+			if (match.len > 0) {
+				match.append (" ");
 			}
 			
-			first = false;
+			match.append ("\"");
+			match.append (term.replace ("\"", "\"\""));
+			match.append ("\"");
 		}
-		select += ";";
 		
-		rc = db.prepare_v2 (select, select.length, out statement, null);
+		statement.reset ();
+		statement.clear_bindings ();
+		statement.bind_text (1, match.str);
 		
-		if (rc == Sqlite.OK) {
-			cols = statement.column_count();
+		while ((rc = statement.step ()) == Sqlite.ROW) {
+			ucd_result.add_single ((unichar) statement.column_int64 (0));
+		}
+		
+		if (rc != Sqlite.DONE) {
+			warning ("Error: %d, %s\n", rc, db.errmsg ());
+		}
+		
+		statement.reset ();
+	}
+	
+	/** Find characters where each GLOB pattern matches a word. This is 
+	 * used if the database has no full text index. */
+	static void search_patterns (Gee.ArrayList<string> terms, GlyphRange ucd_result) {
+		Gee.HashSet<uint> found = new Gee.HashSet<uint> ();
+		Gee.HashSet<uint> matches;
+		unowned Statement statement;
+		bool first = true;
+		int rc;
+		
+		if (word_statement == null) {
+			return;
+		}
+		
+		statement = (!) word_statement;
+		
+		foreach (string term in terms) {
+			matches = new Gee.HashSet<uint> ();
 			
-			if (cols != 1) {
-				warning ("Expecting one column.");
-				return result;
-			}
-
-			while (true) {
-				rc = statement.step ();
+			statement.reset ();
+			statement.clear_bindings ();
+			statement.bind_text (1, term);
+			
+			while ((rc = statement.step ()) == Sqlite.ROW) {
+				uint character = (uint) statement.column_int64 (0);
 				
-				if (rc == Sqlite.DONE) {
-					break;
-				} else if (rc == Sqlite.ROW) {
-					c = (unichar) statement.column_int64 (0);
-					
-					if (has_all_terms (c, query)) {
-						ucd_result.add_single (c);
-					}
-				} else {
-					warning ("Error: %d, %s\n", rc, db.errmsg ());
-					break;
+				if (first || found.contains (character)) {
+					matches.add (character);
 				}
 			}
 			
-			try {
-				if (ucd_result.get_length () > 0) {
-					ucd_result.sort ();
-					result.parse_ranges (ucd_result.get_all_ranges ());
-				}
-			} catch (MarkupError e) {
-				warning (e.message);
+			if (rc != Sqlite.DONE) {
+				warning ("Error: %d, %s\n", rc, db.errmsg ());
 			}
 			
-		} else {
-			warning ("SQL error: %d, %s\n", rc, db.errmsg ());
+			found = matches;
+			first = false;
 		}
 		
-		return result;
+		statement.reset ();
+		
+		foreach (uint character in found) {
+			ucd_result.add_single ((unichar) character);
+		}
+	}
+	
+	static string? get_cached_search (string query) {
+		if (is_null (search_cache)) {
+			return null;
+		}
+		
+		return search_cache.get (query);
+	}
+	
+	static void add_cached_search (string query, string ranges) {
+		if (is_null (search_cache)) {
+			return;
+		}
+		
+		if (cached_queries.size >= SEARCH_CACHE_SIZE) {
+			search_cache.unset (cached_queries.get (0));
+			cached_queries.remove_at (0);
+		}
+		
+		search_cache.set (query, ranges);
+		cached_queries.add (query);
 	}
 	
 	public static bool has_ascender (unichar c) {
@@ -148,43 +266,6 @@ public class CharDatabase {
 		return false;		
 	}
 
-	static bool has_term (unichar c, string term) {
-		Statement statement;
-		string select = "SELECT unicode FROM Words "
-			+ "WHERE word GLOB '" + term.replace ("'", "''") + "' "
-			+ @"AND unicode = $((int64) c);";
-		
-		int rc = db.prepare_v2 (select, select.length, out statement, null);
-
-		if (rc == Sqlite.OK) {
-			rc = statement.step ();
-			
-			if (rc == Sqlite.DONE) {
-				return false;
-			} else if (rc == Sqlite.ROW) {
-				c = (unichar) statement.column_int64 (0);
-				return true;
-			}
-		} else {
-			warning ("Error: %d, %s\n", rc, db.errmsg ());
-			return false;
-		}
-			
-		return false;
-	}
-	
-	static bool has_all_terms (unichar c, string query) {
-		string[] terms = query.split (" ");
-		
-		foreach (string term in terms) {
-			if (!has_term (c, term)) {
-				return false;
-			}
-		}
-		
-		return true;
-	}
-	
 	public static string get_unicode_database_entry (unichar c) {
 		string description = "";
 		int rc, cols;
@@ -20,6 +20,9 @@ namespace BirdFont {
 public class CharDatabaseParser : GLib.Object {
 	static unowned Database db;
 	static Database? database = null;
+	
+	/** Insert statement for the full text index. */
+	Statement? insert_words = null;
 
 	GlyphRange utf8 = new GlyphRange ();
 	
@@ -106,6 +109,58 @@ public class CharDatabaseParser : GLib.Object {
 		if (ec != Sqlite.OK) {
 			warning ("Error: %s\n", (!) errmsg);
 		}
+		
+		create_full_text_index ();
+	}
+	
+	/** Full text index with all words for each character, the row id is 
+	 * the character. Search falls back to the Words table if sqlite is 
+	 * built without FTS5. */
+	void create_full_text_index () {
+		int ec;
+		string? errmsg;
+		Statement statement;
+		string insert = "INSERT INTO WordSearch (rowid, words) VALUES (?, ?);";
+		string search_table = """
+			CREATE VIRTUAL TABLE WordSearch USING fts5 (
+				words, 
+				content = ''
+			);
+		""";
+		
+		ec = db.exec (search_table, null, out errmsg);
+		if (ec != Sqlite.OK) {
+			warning ("Can't create full text index: %s\n", (!) errmsg);
+			return;
+		}
+		
+		ec = db.prepare_v2 (insert, insert.length, out statement, null);
+		if (ec != Sqlite.OK) {
+			warning ("Error: %s\n", db.errmsg ());
+			return;
+		}
+		
+		insert_words = (owned) statement;
+	}
+
+	public void insert_search_words (int64 character, string words) {
+		unowned Statement statement;
+		int ec;
+		
+		if (insert_words == null) {
+			return;
+		}
+		
+		statement = (!) insert_words;
+		statement.reset ();
+		statement.bind_int64 (1, character);
+		statement.bind_text (2, words);
+		ec = statement.step ();
+		
+		if (ec != Sqlite.DONE) {
+			warning ("Error: %s\n", db.errmsg ());
+			warning (@"Can't index words for: $(character)");
+		}
 	}
 
 	public void insert_lookup (int64 character, string word) {
@@ -175,6 +230,7 @@ public class CharDatabaseParser : GLib.Object {
 		string[] e;
 		string[] r;
 		string[] d;
+		StringBuilder words = new StringBuilder ();
 		string index_values;
 		unichar ch;
 		string unicode_hex;
@@ -220,11 +276,15 @@ public class CharDatabaseParser : GLib.Object {
 					foreach (string token in d) {
 						if (token != "") {
 							insert_lookup ((int64) ch, token);
+							words.append (token.down ());
+							words.append (" ");
 						}
 					}
 				}
 			}
 		}
+		
+		insert_search_words ((int64) ch, words.str);
 	}
 
 	private void parse_all_entries () {
@@ -20,6 +20,9 @@ public class ExportTool : GLib.Object {
 
 	public static string? error_message = null;
 	
+	/** Reuse encoded glyphs from previous exports to the same folder. */
+	public static bool use_export_cache = false;
+	
 	public ExportTool (string n) {
 	}
 
@@ -556,8 +559,19 @@ os.put_string (
 				eot_file.delete ();
 			}
 						
+			if (use_export_cache) {
+				GlyfTable.cache = new GlyfCache (folder);
+				((!) GlyfTable.cache).load ();
+			}
+			
 			write_ttf ((!) ttf_file.get_path (), (!) ttf_file_mac.get_path ());
 			
+			if (GlyfTable.cache != null) {
+				((!) GlyfTable.cache).save ();
+				print (((!) GlyfTable.cache).get_statistics () + "\n");
+				GlyfTable.cache = null;
+			}
+			
 			if (!use_export_settings || ExportSettings.export_eot_setting (current_font)) {
 				write_eot ((!) ttf_file.get_path (), (!) eot_file.get_path ());
 			}
@@ -16,26 +16,33 @@ namespace BirdFont {
 static void print_export_help (string[] arg) {
 	stdout.printf (t_("Usage:"));
 	stdout.printf (arg[0]);
-	stdout.printf (" [" + t_("OPTION") + "...] " + t_("FILE") +"\n");
+	stdout.printf (" [" + t_("OPTION") + "...] " + t_("FILE") + "...\n");
+	stdout.printf ("-c, --cache                     " + t_("reuse glyphs from the last export to the same directory") + "\n");
 	stdout.printf ("    --filter [CHARACTERS]       " + t_("include only these characters") + "\n");	
 	stdout.printf ("-h, --help                      " + t_("print this message") + "\n");
+	stdout.printf ("-j, --jobs [NUMBER]             " + t_("number of threads used for encoding glyphs") + "\n");
+	stdout.printf ("-m, --manifest [FILE]           " + t_("export all fonts listed in this file") + "\n");
 	stdout.printf ("-o, --output [DIRECTORY]        " + t_("write files to this directory") + "\n");
 	stdout.printf ("-s, --svg                       " + t_("write svg file") + "\n");
 	stdout.printf ("-t, --ttf                       " + t_("write ttf and eot file") + "\n");
+	stdout.printf ("-w, --workers [NUMBER]          " + t_("number of fonts exported in parallel") + "\n");
 	stdout.printf ("\n");
 }
 
 
 public static int run_export (string[] arg) {
 	string output_directory = ".";
-	string file_name = "";
+	Gee.ArrayList<string> files = new Gee.ArrayList<string> ();
+	Gee.ArrayList<string> worker_options = new Gee.ArrayList<string> ();
+	Gee.ArrayList<ExportResult> results = new Gee.ArrayList<ExportResult> ();
 	string filter_characters = "";
 	bool specific_formats = false;	
 	bool write_ttf = false;
 	bool write_svg = false;	
+	int workers = 1;
+	int failed = 0;
+	double start_time;
 	File directory;
-	Font font;
-	MainWindow main_window;
 
 	stdout.printf ("birdfont-export version %s\n", VERSION);
 
@@ -44,11 +51,6 @@ public static int run_export (string[] arg) {
 		return -1;
 	}
 
-	Theme.set_default_colors ();
-	BirdFont.current_font = BirdFont.new_font ();
-	BirdFont.current_glyph_collection = new GlyphCollection.with_glyph ('\0', "null");
-	main_window = new MainWindow ();
-	
 	// FIXME: create a option for this and add structure the log messages
 	
 	if (BirdFont.has_logging ()) {
@@ -67,26 +69,71 @@ public static int run_export (string[] arg) {
 			return 0;
 		}
 		
+		if ((arg[i] == "-j" || arg[i] == "--jobs") && i + 1 < arg.length) {
+			GlyfTable.jobs = int.parse (arg[i + 1]);
+			
+			if (GlyfTable.jobs <= 0) {
+				GlyfTable.jobs = (int) get_num_processors ();
+			}
+			
+			worker_options.add ("--jobs");
+			worker_options.add (@"$(GlyfTable.jobs)");
+			i++;
+			continue;
+		}
+
+		if ((arg[i] == "-w" || arg[i] == "--workers") && i + 1 < arg.length) {
+			workers = int.parse (arg[i + 1]);
+			
+			if (workers <= 0) {
+				workers = (int) get_num_processors ();
+			}
+			
+			i++;
+			continue;
+		}
+		
+		if ((arg[i] == "-m" || arg[i] == "--manifest") && i + 1 < arg.length) {
+			if (!read_export_manifest (arg[i + 1], files)) {
+				return 1;
+			}
+			
+			i++;
+			continue;
+		}
+		
 		if ((arg[i] == "-o" || arg[i] == "--output") && i + 1 < arg.length) {
 			output_directory = arg[i + 1];
+			worker_options.add ("--output");
+			worker_options.add (build_absoulute_path (output_directory));
 			i++;
 			continue;
 		}
 
+		if (arg[i] == "-c" || arg[i] == "--cache") {
+			ExportTool.use_export_cache = true;
+			worker_options.add ("--cache");
+			continue;
+		}
+		
 		if (arg[i] == "-s" || arg[i] == "--svg") {
 			write_svg = true;
 			specific_formats = true;
+			worker_options.add ("--svg");
 			continue;
 		}
 		
 		if (arg[i] == "-t" || arg[i] == "--ttf") {
 			write_ttf = true;
 			specific_formats = true;
+			worker_options.add ("--ttf");
 			continue;
 		}
 
 		if (arg[i] == "--filter" && i + 1 < arg.length) {
 			filter_characters = arg[i + 1];
+			worker_options.add ("--filter");
+			worker_options.add (filter_characters);
 			i++;
 			continue;
 		}
@@ -96,16 +143,12 @@ public static int run_export (string[] arg) {
 			return 1;
 		}
 		
-		if (!arg[i].has_prefix ("-")) {
-			file_name = arg[i];
-						
-			if (i != arg.length - 1) {
-				print_export_help (arg);
-				return 1;
-			}
-			
-			break;
-		}
+		files.add (arg[i]);
+	}
+	
+	if (files.size == 0) {
+		print_export_help (arg);
+		return 1;
 	}
 
 	if (BirdFont.fatal_wanings) {
@@ -113,24 +156,7 @@ public static int run_export (string[] arg) {
 		Log.set_handler (null, levels, BirdFont.fatal_warning);		
 	}
 	
-	Preferences.load ();
-			
-	BirdFont.args = new Argument ("");
-	BirdFont.current_glyph_collection = new GlyphCollection.with_glyph ('\0', "");
-	
-	file_name = build_absoulute_path (file_name);
-	
-	font = BirdFont.get_current_font ();
-	font.set_file (file_name);
-	if (!font.load ()) {
-		warning (@"Failed to load font $file_name.\n");
-		
-		if (!file_name.has_suffix (".bf")) {
-			warning (@"Is it a .bf file?\n");
-		}
-		
-		return 1;
-	}
+	HeadlessExport.init ();
 
 	if (filter_characters != "") {
 		stdout.printf ("Exporting only  %s\n", filter_characters);
@@ -148,18 +174,209 @@ public static int run_export (string[] arg) {
 		stderr.printf (t_("Can't find output directory") + @"$((!)directory.get_path ())\n");
 		return 1;
 	}
+	
+	if (files.size == 1) {
+		return HeadlessExport.export_file (files.get (0), directory, 
+			!specific_formats || write_svg, !specific_formats || write_ttf) ? 0 : 1;
+	}
+	
+	start_time = GLib.get_real_time ();
+	
+	foreach (string file in files) {
+		results.add (new ExportResult (build_absoulute_path (file)));
+	}
+	
+	if (workers > 1) {
+		// the library has global state, fonts are exported in separate
+		// processes when they run in parallel
+		new ExportQueue (arg[0], worker_options, results).run_workers (workers);
+	} else {
+		foreach (ExportResult result in results) {
+			double t = GLib.get_real_time ();
+			result.success = HeadlessExport.export_file (result.file_name, directory, 
+				!specific_formats || write_svg, !specific_formats || write_ttf);
+			result.time = (GLib.get_real_time () - t) / 1000000.0;
+		}
+	}
+	
+	stdout.printf ("\n");
+	foreach (ExportResult result in results) {
+		stdout.printf ("%-8s %8.2fs  %s\n", result.success ? "OK" : "FAILED", 
+			result.time, result.file_name);
+		
+		if (!result.success) {
+			failed++;
+		}
+	}
+	
+	stdout.printf ("%d fonts, %d failed, %.2fs\n", results.size, failed,
+		(GLib.get_real_time () - start_time) / 1000000.0);
+	
+	return (failed == 0) ? 0 : 1;
+}
+
+/** Read font file names, one on each line. Relative paths are relative to
+ * the manifest and lines starting with # are ignored. */
+static bool read_export_manifest (string manifest, Gee.ArrayList<string> files) {
+	File manifest_file = File.new_for_path (manifest);
+	File folder = (!) manifest_file.get_parent ();
+	string content;
+	string file_name;
+	
+	try {
+		FileUtils.get_contents ((!) manifest_file.get_path (), out content);
+	} catch (GLib.Error e) {
+		stderr.printf (@"$(e.message)\n");
+		return false;
+	}
+	
+	foreach (string line in content.split ("\n")) {
+		file_name = line.strip ();
+		
+		if (file_name == "" || file_name.has_prefix ("#")) {
+			continue;
+		}
+		
+		files.add ((!) folder.resolve_relative_path (file_name).get_path ());
+	}
+	
+	return true;
+}
 
-	if (!specific_formats || write_svg) {
-		print (@"Writing $(ExportSettings.get_file_name (font)).svg to $output_directory\n");
-		ExportTool.export_svg_font_path (File.new_for_path (output_directory));
+class ExportResult : GLib.Object {
+	public string file_name;
+	public bool success = false;
+	public double time = 0;
+	
+	public ExportResult (string file_name) {
+		this.file_name = file_name;
 	}
+}
 
-	if (!specific_formats || write_ttf) {
-		print (@"Writing $(ExportSettings.get_file_name (font)).ttf to $output_directory\n");
-		ExportTool.export_ttf_font_path (File.new_for_path (output_directory));
+/** Export fonts in birdfont-export subprocesses. */
+class ExportQueue : GLib.Object {
+	string program;
+	Gee.ArrayList<string> options;
+	Gee.ArrayList<ExportResult> results;
+	int next = 0;
+	
+	public ExportQueue (string program, Gee.ArrayList<string> options, 
+		Gee.ArrayList<ExportResult> results) {
+		
+		this.program = program;
+		this.options = options;
+		this.results = results;
+	}
+	
+	public void run_workers (int workers) {
+		Gee.ArrayList<Thread<void*>> threads = new Gee.ArrayList<Thread<void*>> ();
+		
+		for (int i = 0; i < int.min (workers, results.size); i++) {
+			try {
+				threads.add (new Thread<void*>.try ("export", run));
+			} catch (GLib.Error e) {
+				warning (e.message);
+				break;
+			}
+		}
+		
+		if (threads.size == 0) {
+			run ();
+		}
+		
+		foreach (Thread<void*> t in threads) {
+			t.join ();
+		}
 	}
 	
-	return 0;
+	ExportResult? get_next () {
+		ExportResult? result = null;
+		
+		lock (next) {
+			if (next < results.size) {
+				result = results.get (next);
+				next++;
+			}
+		}
+		
+		return result;
+	}
+	
+	void* run () {
+		ExportResult? result;
+		
+		while ((result = get_next ()) != null) {
+			export ((!) result);
+		}
+		
+		return null;
+	}
+	
+	void export (ExportResult result) {
+		string[] argv = { program };
+		string? output = null;
+		Bytes? output_data = null;
+		double start = GLib.get_real_time ();
+		Subprocess process;
+		
+		foreach (string option in options) {
+			argv += option;
+		}
+		
+		argv += result.file_name;
+		
+		try {
+			process = new Subprocess.newv (argv, SubprocessFlags.STDOUT_PIPE | SubprocessFlags.STDERR_MERGE);
+			process.communicate (null, null, out output_data, null);
+			result.success = process.get_successful ();
+			output = decode_output (output_data);
+		} catch (GLib.Error e) {
+			output = e.message + "\n";
+			result.success = false;
+		}
+		
+		result.time = (GLib.get_real_time () - start) / 1000000.0;
+		
+		// print the output from one font at the time
+		lock (next) {
+			stdout.printf ("%s", output != null ? (!) output : "");
+			stdout.flush ();
+		}
+	}
+	
+	/** Decode output from a child process, bytes that are not valid 
+	 * UTF-8 (like file names in another encoding) are replaced with 
+	 * U+FFFD instead of failing the export.
+	 */
+	static string decode_output (Bytes? data) {
+		StringBuilder text = new StringBuilder ();
+		unowned uint8[] bytes;
+		char* start;
+		char* end;
+		ssize_t remaining;
+		
+		if (data == null || ((!) data).get_size () == 0) {
+			return "";
+		}
+		
+		bytes = (!) ((!) data).get_data ();
+		start = (char*) bytes;
+		remaining = bytes.length;
+		
+		while (remaining > 0) {
+			if (((string) start).validate (remaining, out end)) {
+				text.append_len ((string) start, remaining);
+				break;
+			}
+			
+			text.append_len ((string) start, (ssize_t) (end - start));
+			text.append_unichar ((unichar) 0xFFFD);
+			remaining -= (ssize_t) (end - start) + 1;
+			start = end + 1;
+		}
+		
+		return text.str;
+	}
 }
 
 }
@@ -35,6 +35,9 @@ public class Font : GLib.Object {
 	/** Table with ligatures. */
 	public GlyphTable ligature;
 	
+	/** Glyph collections that have not been parsed yet. */
+	BirdFontFileIndex? glyph_index = null;
+	
 	/** List of alternate glyphs. */
 	public AlternateSets alternates;
 	
@@ -668,14 +671,14 @@ public class Font : GLib.Object {
 
 	// FIXME: the order of ligature substitutions
 	public GlyphCollection? get_ligature (uint index) {
-		return ligature.nth (index);
+		return parse_glyph_collection (ligature.nth (index));
 	}
 	
 	/** Obtain all versions and alterntes for this glyph. */
 	public GlyphCollection? get_glyph_collection (string unichar_code) {
 		GlyphCollection? gc = null;
 		gc = glyph_cache.get (unichar_code);
-		return gc;
+		return parse_glyph_collection (gc);
 	}
 
 	/** Get glyph collection by name. */
@@ -686,7 +689,7 @@ public class Font : GLib.Object {
 			gc = glyph_name.get ((!) glyph);
 		}
 		
-		return gc;
+		return parse_glyph_collection (gc);
 	}
 
 	/** Get glyph by name. */	
@@ -702,7 +705,7 @@ public class Font : GLib.Object {
 		
 	public Glyph? get_glyph (string name) {
 		GlyphCollection? gc = null;
-		gc = glyph_name.get (name);
+		gc = parse_glyph_collection (glyph_name.get (name));
 
 		if (gc == null || ((!)gc).length () == 0) {
 			return null;
@@ -716,7 +719,7 @@ public class Font : GLib.Object {
 			return null;
 		}
 		
-		return glyph_name.nth (glyph_index);
+		return parse_glyph_collection (glyph_name.nth (glyph_index));
 	}
 	
 	public Glyph? get_glyph_index (unichar glyph_index) {
@@ -731,6 +734,29 @@ public class Font : GLib.Object {
 		return null;
 	}
 	
+	/** Use an index of glyph collections in a .bf file and parse each 
+	 * collection when it is used. */
+	public void set_glyph_index (BirdFontFileIndex index) {
+		glyph_index = index;
+		index.add_glyph_collections (this);
+	}
+	
+	GlyphCollection? parse_glyph_collection (GlyphCollection? gc) {
+		if (glyph_index != null && gc != null) {
+			((!) glyph_index).parse_glyph_collection (this, (!) gc);
+		}
+		
+		return gc;
+	}
+	
+	/** Parse all glyph collections that are left in the index. */
+	public void parse_all_glyph_collections () {
+		if (glyph_index != null) {
+			((!) glyph_index).parse_all (this);
+			glyph_index = null;
+		}
+	}
+	
 	public void add_background_image (BackgroundImage image) {
 		background_images.add (image);
 	}
@@ -782,9 +808,8 @@ public class Font : GLib.Object {
 		
 		if (backups > 0) {
 			string path = (!) font_file;
-			string bf_data = "";
 
-			if (FileUtils.get_contents (path, out bf_data)) {
+			if (FileUtils.test (path, FileTest.IS_REGULAR)) {
 				DateTime now = new DateTime.now_local ();
 				string time_stamp = now.to_string ();
 				
@@ -812,11 +837,11 @@ public class Font : GLib.Object {
 					file_name = file_name.substring (0, file_name.length - ".birdfont".length);
 				}
 				
-				string backup_file_name = file_name + @"-$(time_stamp).bf_backup";
-				File backup_file = get_child (backup_directory_for_font, backup_file_name);
-				printd (@"Saving backup to: $((!) backup_file.get_path ())\n");
+				string backup_name = file_name + @"-$(time_stamp)";
+				BackupStore store = new BackupStore (backup_directory_for_font);
+				printd (@"Saving backup to: $((!) backup_directory_for_font.get_path ())/$(backup_name)\n");
 				
-				FileUtils.set_contents ((!) backup_file.get_path (), bf_data);
+				store.save (path, backup_name);
 			} 			
 		}
 		
@@ -840,9 +865,9 @@ public class Font : GLib.Object {
 				File backup_file = get_child (backup_directory_for_font, file_name);
 				
 				if (FileUtils.test ((!) backup_file.get_path (), FileTest.IS_REGULAR)
-						&& file_name.has_suffix (".bf_backup")) {
+						&& (file_name.has_suffix (".bf_backup") || BackupStore.is_manifest (file_name))) {
 					backups.add ((!) backup_file.get_path ());
-				} else {
+				} else if (file_name != BackupStore.CHUNK_DIRECTORY) {
 					warning (@"$file_name does not seem to be a backup file.");
 				}
 			}
@@ -871,6 +896,13 @@ public class Font : GLib.Object {
 				printd (@"Deleting backup: $(path)\n");
 				File file = File.new_for_path (path);
 				file.delete ();
+				backups.remove (path);
+			}
+			
+			if (old_backups.size > 0) {
+				File backup_directory_for_font = Preferences.get_backup_directory_for_font (file_name);
+				BackupStore store = new BackupStore (backup_directory_for_font);
+				store.delete_unused_chunks (backups);
 			}
 		} catch (GLib.Error error) {
 			warning (error.message);
@@ -950,6 +982,7 @@ public class Font : GLib.Object {
 		grid_width.clear ();
 	
 		// empty cache and fill it with new glyphs from disk
+		glyph_index = null;
 		glyph_cache.remove_all ();
 		glyph_name.remove_all ();
 		ligature.remove_all ();
@@ -1038,6 +1071,12 @@ public class Font : GLib.Object {
 	
 	private bool parse_bf_file (string path) {
 		BirdFontFile font = new BirdFontFile (this);
+		
+		if (Preferences.get ("lazy_loading") == "true" 
+			&& !path.has_suffix (".ffi")) {
+			return font.load_lazy (path);
+		}
+		
 		return font.load (path);
 	}
 
@@ -101,8 +101,8 @@ public class Glyph : FontDisplay {
 	bool margin_boundaries_visible = false;
 	string new_guide_name = "";
 
-	Gee.ArrayList<Glyph> undo_list = new Gee.ArrayList<Glyph> ();
-	Gee.ArrayList<Glyph> redo_list = new Gee.ArrayList<Glyph> ();
+	GlyphUndoList undo_list = new GlyphUndoList ();
+	GlyphUndoList redo_list = new GlyphUndoList ();
 
 	string glyph_sequence = "";
 	bool open = true;
@@ -212,16 +212,29 @@ public class Glyph : FontDisplay {
 		return (!) ttf_data;
 	}
 
+	/** Create quadratic copies of all visible paths, empty paths are
+	 * ignored and the paths in this glyph are left unchanged.
+	 * 
+	 * Strokes are created from copies of the paths and are not cached
+	 * in the glyph since export runs on other threads than the one 
+	 * drawing the glyph.
+	 */
 	public PathList get_quadratic_paths () {
 		PointConverter pc;
 		PathList pl;
 		PathList stroke;
+		StrokeTool stroke_tool;
 
 		pl = new PathList ();
 
 		foreach (Path p in get_visible_paths ()) {
+			if (p.points.size < 2) {
+				continue;
+			}
+			
 			if (p.stroke > 0) {
-				stroke = p.get_completed_stroke ();
+				stroke_tool = new StrokeTool ();
+				stroke = stroke_tool.get_stroke (p, p.stroke);
 				foreach (Path stroke_part in stroke.paths) {
 					pc = new PointConverter (stroke_part);
 					pl.add (pc.get_quadratic_path ());
@@ -260,7 +273,8 @@ public class Glyph : FontDisplay {
 		if (p != null) {
 			path = (!) p;
 
-			if (Toolbox.get_move_tool ().is_selected ()) {
+			if (!is_null (DrawingTools.move_tool) 
+				&& Toolbox.get_move_tool ().is_selected ()) {
 				if (path.stroke > 0) {
 					Toolbox.set_object_stroke (path.stroke);
 				}
@@ -1883,8 +1897,7 @@ public class Glyph : FontDisplay {
 	}
 
 	public void store_undo_state (bool clear_redo = false) {
-		Glyph g = copy ();
-		undo_list.add (g);
+		undo_list.add (this);
 
 		if (clear_redo) {
 			redo_list.clear ();
@@ -1892,11 +1905,17 @@ public class Glyph : FontDisplay {
 	}
 
 	public void store_redo_state () {
-		Glyph g = copy ();
-		redo_list.add (g);
+		redo_list.add (this);
 	}
 
 	public Glyph copy () {
+		return copy_with_layers (layers.copy ());
+	}
+
+	/** Copy everything in the glyph except for the layers.
+	 * @param layers the layers for the new glyph
+	 */
+	public Glyph copy_with_layers (Layer layers) {
 		Glyph g = new Glyph.no_lines (name, unichar_code);
 
 		g.current_layer = current_layer;
@@ -1910,7 +1929,7 @@ public class Glyph : FontDisplay {
 			g.add_line (line.copy ());
 		}
 
-		g.layers = layers.copy ();
+		g.layers = layers;
 
 		foreach (Path p in active_paths) {
 			g.active_paths.add (p);
@@ -1946,12 +1965,12 @@ public class Glyph : FontDisplay {
 		tool = MainWindow.get_toolbox ().get_current_tool ();
 		tool.before_undo ();
 
-		g = undo_list.get (undo_list.size - 1);
+		g = undo_list.get_last ();
 
 		store_redo_state ();
 		set_glyph_data (g);
 
-		undo_list.remove_at (undo_list.size - 1);
+		undo_list.remove_last ();
 
 		DrawingTools.update_layers ();
 		PenTool.update_selected_points ();
@@ -1968,12 +1987,12 @@ public class Glyph : FontDisplay {
 			return;
 		}
 
-		g = redo_list.get (redo_list.size - 1);
+		g = redo_list.get_last ();
 
 		store_undo_state (false);
 		set_glyph_data (g);
 
-		redo_list.remove_at (redo_list.size - 1);
+		redo_list.remove_last ();
 
 		DrawingTools.update_layers ();
 		PenTool.update_selected_points ();
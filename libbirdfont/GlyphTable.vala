@@ -21,12 +21,18 @@ public class GlyphTable : GLib.Object {
 	
 	TreeMap<string, GlyphCollection> map;
 	
+	/** Glyphs in key order, rebuilt lazily after the table has changed. */
+	ArrayList<GlyphCollection>? index = null;
+	
 	public GlyphTable () {
 		map = new TreeMap<string, GlyphCollection> ();
 	}
 
 	public void remove_all () {
-		map.clear ();
+		lock (index) {
+			map.clear ();
+			index = null;
+		}
 	}
 
 	public void @for_each (Func<GlyphCollection> func) {
@@ -45,7 +51,11 @@ public class GlyphTable : GLib.Object {
 	}
 		
 	public void remove (string name) {
-		map.unset (name);
+		lock (index) {
+			if (map.unset (name)) {
+				index = null;
+			}
+		}
 	}
 
 	public uint length () {
@@ -56,23 +66,45 @@ public class GlyphTable : GLib.Object {
 		return map.get (name);
 	}
 
-	public new GlyphCollection? nth (uint index) {
-		uint i = 0;
-
-		foreach (var k in map.keys) {
-			if (i == index) {
-				return map.get (k);
-			}
-			i++;
+	public new GlyphCollection? nth (uint i) {
+		ArrayList<GlyphCollection> sorted = get_index ();
+		
+		if (i >= sorted.size) {
+			return null;
 		}
-
-		return null;
+		
+		return sorted.get ((int) i);
 	}
 
 	public bool insert (string key, GlyphCollection g) {
-		map.set (key, g);
+		lock (index) {
+			map.set (key, g);
+			index = null;
+		}
 		return true;
 	}
+	
+	/** The index is rebuilt under a lock since the export thread, the
+	 * thumbnail renderer and the main window can all read the table.
+	 */
+	ArrayList<GlyphCollection> get_index () {
+		ArrayList<GlyphCollection> sorted;
+		
+		lock (index) {
+			if (index != null) {
+				return (!) index;
+			}
+			
+			sorted = new ArrayList<GlyphCollection> ();
+			foreach (GlyphCollection gc in map.values) {
+				sorted.add (gc);
+			}
+			
+			index = sorted;
+		}
+		
+		return sorted;
+	}
 }
 
 }
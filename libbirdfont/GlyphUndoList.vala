@@ -0,0 +1,251 @@
+/*
+	Copyright (C) 2026 Johan Mattsson
+
+	This library is free software; you can redistribute it and/or modify
+	it under the terms of the GNU Lesser General Public License as
+	published by the Free Software Foundation; either version 3 of the
+	License, or (at your option) any later version.
+
+	This library is distributed in the hope that it will be useful, but
+	WITHOUT ANY WARRANTY; without even the implied warranty of
+	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+	Lesser General Public License for more details.
+*/
+
+namespace BirdFont {
+
+/** Undo states for a glyph. Paths that have not changed since the
+ * previous state are shared with that state, only new and modified
+ * paths are copied. States that are identical to the previous state are
+ * not added. The memory used by the list is limited by the preference
+ * undo_memory_limit (in megabytes), the oldest states are removed first.
+ */
+public class GlyphUndoList : GLib.Object {
+	const int DEFAULT_MEMORY_LIMIT = 64;
+
+	/** Estimated size of a path and of a point with its handles. */
+	const int PATH_SIZE = 300;
+	const int POINT_SIZE = 300;
+
+	Gee.ArrayList<UndoState> states;
+
+	/** Paths in the glyph and their copies in the last state. */
+	Gee.HashMap<Path, Path> copies;
+
+	/** Number of states that use each copy of a path. */
+	Gee.HashMap<Path, int> references;
+
+	int64 memory = 0;
+
+	public int size {
+		get {
+			return states.size;
+		}
+	}
+
+	public GlyphUndoList () {
+		states = new Gee.ArrayList<UndoState> ();
+		copies = new Gee.HashMap<Path, Path> ();
+		references = new Gee.HashMap<Path, int> ();
+	}
+
+	/** Store the current state of a glyph. */
+	public void add (Glyph glyph) {
+		Gee.HashMap<Path, Path> new_copies = new Gee.HashMap<Path, Path> ();
+		UndoState state = new UndoState ();
+		Layer layers = copy_layer (glyph.layers, state, new_copies);
+
+		copies = new_copies;
+		state.glyph = glyph.copy_with_layers (layers);
+
+		if (states.size > 0 && is_unchanged (states.get (states.size - 1), state)) {
+			return;
+		}
+
+		foreach (Path p in state.paths) {
+			int n = references.has_key (p) ? references.get (p) : 0;
+
+			if (n == 0) {
+				memory += get_size (p);
+			}
+
+			references.set (p, n + 1);
+		}
+
+		states.add (state);
+		remove_old_states ();
+	}
+
+	public Glyph get_last () {
+		return states.get (states.size - 1).glyph;
+	}
+
+	public void remove_last () {
+		remove_state (states.size - 1);
+	}
+
+	public void clear () {
+		states.clear ();
+		copies.clear ();
+		references.clear ();
+		memory = 0;
+	}
+
+	/** Estimated number of bytes used by all paths in the list. */
+	public int64 get_memory_usage () {
+		return memory;
+	}
+
+	void remove_state (int index) {
+		UndoState state = states.get (index);
+
+		foreach (Path p in state.paths) {
+			int n = references.get (p) - 1;
+
+			if (n == 0) {
+				references.unset (p);
+				memory -= get_size (p);
+			} else {
+				references.set (p, n);
+			}
+		}
+
+		states.remove_at (index);
+	}
+
+	/** Remove the oldest states until the list fits in the memory limit,
+	 * the last state is always kept. */
+	void remove_old_states () {
+		int64 limit = get_memory_limit ();
+
+		while (memory > limit && states.size > 1) {
+			remove_state (0);
+		}
+	}
+
+	static int64 get_memory_limit () {
+		string limit = Preferences.get ("undo_memory_limit");
+		int megabytes = DEFAULT_MEMORY_LIMIT;
+
+		if (limit != "") {
+			megabytes = int.parse (limit);
+		}
+
+		return (int64) megabytes * 1024 * 1024;
+	}
+
+	static int64 get_size (Path p) {
+		return PATH_SIZE + (int64) p.points.size * POINT_SIZE;
+	}
+
+	/** Copy the layer but reuse copies of paths from the last state if
+	 * the path has not been modified. */
+	Layer copy_layer (Layer layer, UndoState state, Gee.HashMap<Path, Path> new_copies) {
+		Layer copy = new Layer ();
+		Path path_copy;
+		Path? previous_copy;
+
+		copy.name = layer.name;
+		copy.visible = layer.visible;
+		copy.single_path = layer.single_path;
+
+		if (layer.gradient != null) {
+			copy.gradient = ((!) layer.gradient).copy ();
+		}
+
+		foreach (Path p in layer.paths.paths) {
+			previous_copy = copies.get (p);
+
+			if (previous_copy != null && p.has_same_data ((!) previous_copy)) {
+				path_copy = (!) previous_copy;
+			} else {
+				path_copy = p.copy ();
+			}
+
+			new_copies.set (p, path_copy);
+			copy.paths.add (path_copy);
+			state.paths.add (path_copy);
+		}
+
+		foreach (Layer sublayer in layer.subgroups) {
+			copy.subgroups.add (copy_layer (sublayer, state, new_copies));
+		}
+
+		return copy;
+	}
+
+	/** Two states are identical if they share all paths and have the
+	 * same layers and metrics. */
+	static bool is_unchanged (UndoState previous, UndoState state) {
+		Glyph a = previous.glyph;
+		Glyph b = state.glyph;
+
+		if (previous.paths.size != state.paths.size
+			|| a.left_limit != b.left_limit
+			|| a.right_limit != b.right_limit
+			|| a.get_background_image () != null
+			|| b.get_background_image () != null
+			|| a.current_layer != b.current_layer
+			|| !has_same_lines (a, b)) {
+			return false;
+		}
+
+		for (int i = 0; i < state.paths.size; i++) {
+			if (previous.paths.get (i) != state.paths.get (i)) {
+				return false;
+			}
+		}
+
+		return has_same_layers (a.layers, b.layers);
+	}
+
+	static bool has_same_layers (Layer a, Layer b) {
+		if (a.name != b.name
+			|| a.visible != b.visible
+			|| a.single_path != b.single_path
+			|| a.gradient != null
+			|| b.gradient != null
+			|| a.paths.paths.size != b.paths.paths.size
+			|| a.subgroups.size != b.subgroups.size) {
+			return false;
+		}
+
+		for (int i = 0; i < a.subgroups.size; i++) {
+			if (!has_same_layers (a.subgroups.get (i), b.subgroups.get (i))) {
+				return false;
+			}
+		}
+
+		return true;
+	}
+
+	static bool has_same_lines (Glyph a, Glyph b) {
+		return has_same_positions (a.vertical_help_lines, b.vertical_help_lines)
+			&& has_same_positions (a.horizontal_help_lines, b.horizontal_help_lines);
+	}
+
+	static bool has_same_positions (Gee.ArrayList<Line> a, Gee.ArrayList<Line> b) {
+		if (a.size != b.size) {
+			return false;
+		}
+
+		for (int i = 0; i < a.size; i++) {
+			if (a.get (i).label != b.get (i).label || a.get (i).pos != b.get (i).pos) {
+				return false;
+			}
+		}
+
+		return true;
+	}
+}
+
+/** A copy of a glyph and the paths in it. */
+class UndoState : GLib.Object {
+	public Glyph glyph;
+	public Gee.ArrayList<Path> paths = new Gee.ArrayList<Path> ();
+
+	public UndoState () {
+	}
+}
+
+}
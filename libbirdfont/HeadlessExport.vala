@@ -0,0 +1,104 @@
+/*
+	Copyright (C) 2026 Johan Mattsson
+
+	This library is free software; you can redistribute it and/or modify
+	it under the terms of the GNU Lesser General Public License as
+	published by the Free Software Foundation; either version 3 of the
+	License, or (at your option) any later version.
+
+	This library is distributed in the hope that it will be useful, but
+	WITHOUT ANY WARRANTY; without even the implied warranty of
+	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+	Lesser General Public License for more details.
+*/
+
+namespace BirdFont {
+
+/** Load, validate and export fonts without creating the main window,
+ * the toolbox or the theme. Used by the command line tools.
+ */
+public class HeadlessExport : GLib.Object {
+
+	/** Set up the global state that the font code needs. */
+	public static void init () {
+		if (is_null (BirdFont.args)) {
+			BirdFont.args = new Argument ("");
+		}
+
+		Preferences.load ();
+
+		BirdFont.current_font = new Font ();
+		BirdFont.current_glyph_collection = new GlyphCollection.with_glyph ('\0', "");
+	}
+
+	/** Load a font and make it the current font.
+	 * @return the font or null if it can't be loaded
+	 */
+	public static Font? load_font (string path) {
+		string file_name = build_absoulute_path (path);
+		Font font = new Font ();
+
+		BirdFont.current_font = font;
+
+		font.set_file (file_name);
+		if (!font.load ()) {
+			warning (@"Failed to load font $file_name.\n");
+
+			if (!file_name.has_suffix (".bf") && !file_name.has_suffix (".birdfont")) {
+				warning (@"Is it a .bf file?\n");
+			}
+
+			return null;
+		}
+
+		return font;
+	}
+
+	/** Check that the font can be exported. */
+	public static bool validate (Font font) {
+		if (font.length () == 0) {
+			warning (@"$(font.get_path ()) does not have any glyphs.");
+			return false;
+		}
+
+		if (ExportSettings.get_file_name (font) == "") {
+			warning (@"No file name for $(font.get_path ()).");
+			return false;
+		}
+
+		return true;
+	}
+
+	/** Write SVG and TTF files for the current font to a folder. */
+	public static bool export (Font font, File folder, bool write_svg, bool write_ttf) {
+		bool exported = true;
+		string output_directory = (!) folder.get_path ();
+
+		return_val_if_fail (font == BirdFont.current_font, false);
+
+		if (write_svg) {
+			print (@"Writing $(ExportSettings.get_file_name (font)).svg to $output_directory\n");
+			exported = ExportTool.export_svg_font_path (folder) && exported;
+		}
+
+		if (write_ttf) {
+			print (@"Writing $(ExportSettings.get_file_name (font)).ttf to $output_directory\n");
+			exported = ExportTool.export_ttf_font_path (folder) && exported;
+		}
+
+		return exported;
+	}
+
+	/** Load, validate and export one font. */
+	public static bool export_file (string path, File folder, bool write_svg, bool write_ttf) {
+		Font? font = load_font (path);
+
+		if (font == null || !validate ((!) font)) {
+			return false;
+		}
+
+		return export ((!) font, folder, write_svg, write_ttf);
+	}
+}
+
+}
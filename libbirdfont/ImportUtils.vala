@@ -26,14 +26,10 @@ public static int run_import (string[] arg) {
 	File bf;
 	File svg;
 	Font font;
+	Font? loaded_font;
 	bool imported;
 	
-	Theme.set_default_colors ();
-	Preferences.load ();
-	BirdFont.args = new Argument ("");
-	BirdFont.current_font = new Font ();
-	BirdFont.current_glyph_collection = new GlyphCollection.with_glyph ('\0', "");
-	MainWindow.init ();
+	HeadlessExport.init ();
 
 	if (arg.length < 3) {
 		print_import_help (arg);
@@ -63,16 +59,13 @@ public static int run_import (string[] arg) {
 		stdout.printf (t_("A new font will be created.") + "\n");
 		font.set_file (bf_file);
 	} else {
-		font.set_file (bf_file);
-		if (!font.load ()) {
-			warning (@"Failed to load font $bf_file.\n");
-			
-			if (!bf_file.has_suffix (".bf") && !bf_file.has_suffix (".birdfont")) {
-				warning (@"Is it a .bf file?\n");
-			}
-			
+		loaded_font = HeadlessExport.load_font (bf_file);
+		
+		if (loaded_font == null) {
 			return -1;
 		}
+		
+		font = (!) loaded_font;
 	}
 
 	foreach (string f in svg_files) {
@@ -99,7 +92,6 @@ public static bool import_svg_file (Font font, File svg_file) {
 	GlyphCollection? gc = null;
 	GlyphCollection glyph_collection;
 	unichar character;
-	GlyphCanvas canvas;
 	
 	glyph_name = file_name.replace (".svg", "");
 	glyph_name = glyph_name.replace (".SVG", "");
@@ -138,8 +130,7 @@ public static bool import_svg_file (Font font, File svg_file) {
 		font.add_glyph_collection (glyph_collection);
 	}
 
-	canvas = MainWindow.get_glyph_canvas ();
-	canvas.set_current_glyph_collection (glyph_collection);
+	BirdFont.current_glyph_collection = glyph_collection;
 
 	stdout.printf (t_("Adding"));
 	stdout.printf (" ");
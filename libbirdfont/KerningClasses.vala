@@ -502,35 +502,49 @@ public class KerningClasses : GLib.Object {
 	
 	public void all_pairs (KerningIterator kerningIterator) {
 		Gee.ArrayList<Glyph> left_glyphs = new Gee.ArrayList<Glyph> ();
+		Gee.HashSet<Glyph> added = new Gee.HashSet<Glyph> ();
 		Gee.ArrayList<KerningPair> pairs = new Gee.ArrayList<KerningPair> ();
+		Gee.HashMap<string, Gee.ArrayList<Glyph>> expanded_ranges;
+		Gee.ArrayList<Gee.ArrayList<Glyph>> right_classes;
+		Gee.HashMap<Glyph, Gee.ArrayList<int>> left_classes;
+		Gee.ArrayList<int> class_indices;
 		double kerning;
-		string right;
-		string name;
+		double? single_value;
+		string left_name;
 		Glyph? g;
+		int len;
 		
-		// Create a list of first glyph in all pairs
-		foreach (GlyphRange r in classes_first) {
-			foreach (UniRange u in r.ranges) {
-				for (unichar c = u.start; c <= u.stop; c++) {
-					name = (!)c.to_string ();
-					g = font.get_glyph (name);
-					if (g != null && !left_glyphs.contains ((!) g)) {
-						left_glyphs.add ((!) g);
-					}
+		len = classes_first.size;
+		return_if_fail (len == classes_last.size);
+		return_if_fail (len == classes_kerning.size);
+		
+		expanded_ranges = new Gee.HashMap<string, Gee.ArrayList<Glyph>> ();
+		right_classes = new Gee.ArrayList<Gee.ArrayList<Glyph>> ();
+		left_classes = new Gee.HashMap<Glyph, Gee.ArrayList<int>> ();
+		
+		foreach (GlyphRange r in classes_last) {
+			right_classes.add (get_glyphs_in_range (r, expanded_ranges));
+		}
+		
+		// Create a list of first glyph in all pairs and the classes
+		// where each glyph is the first glyph
+		for (int i = 0; i < len; i++) {
+			foreach (Glyph left in get_glyphs_in_range (classes_first.get (i), expanded_ranges)) {
+				if (added.add (left)) {
+					left_glyphs.add (left);
+					left_classes.set (left, new Gee.ArrayList<int> ());
 				}
-			}
-			
-			foreach (string n in r.unassigned) {
-				g = font.get_glyph (n);
-				if (g != null && !left_glyphs.contains ((!) g)) {
-					left_glyphs.add ((!) g);
+				
+				class_indices = left_classes.get (left);
+				if (class_indices.size == 0 || class_indices.get (class_indices.size - 1) != i) {
+					class_indices.add (i);
 				}
 			}
 		}
 		
 		foreach (string n in single_kerning_letters_left) {
 			g = font.get_glyph (n);
-			if (g != null && !left_glyphs.contains ((!) g)) {
+			if (g != null && added.add ((!) g)) {
 				left_glyphs.add ((!) g);
 			}
 		}
@@ -538,33 +552,42 @@ public class KerningClasses : GLib.Object {
 		// add the right hand glyph and the kerning value
 		foreach (Glyph character in left_glyphs) {
 			KerningPair kl = new KerningPair (character);
+			left_name = character.get_name ();
 
-			foreach (GlyphRange r in classes_last) {
-				foreach (UniRange u in r.ranges) {
-					for (unichar c = u.start; c <= u.stop; c++) {
-						right = (!)c.to_string ();
+			// last class is applied first
+			if (left_classes.has_key (character)) {
+				class_indices = left_classes.get (character);
+				
+				for (int i = class_indices.size - 1; i >= 0; i--) {
+					int class_index = class_indices.get (i);
+					
+					foreach (Glyph right in right_classes.get (class_index)) {
+						if (kl.has_right (right)) {
+							continue;
+						}
 						
-						if (font.has_glyph (right) && has_kerning (character.get_name (), right)) {
-							kerning = get_kerning (character.get_name (), right);
-							kl.add_unique ((!) font.get_glyph (right), kerning);
+						single_value = get_kerning_for_single_glyphs (left_name, right.get_name ());
+						
+						if (single_value != null) {
+							kerning = (!) single_value;
+						} else {
+							kerning = classes_kerning.get (class_index).val;
 						}
-					}
-				}
-
-				foreach (string n in r.unassigned) {
-					if (font.has_glyph (n) && has_kerning (character.get_name (), n)) {
-						kerning = get_kerning (character.get_name (), n);
-						kl.add_unique ((!) font.get_glyph (n), kerning);
+						
+						kl.add_unique (right, kerning);
 					}
 				}
 			}
 
-			// TODO: The get_kerning () function is still slow. Optimize it.
 			foreach (string right_glyph_name in single_kerning_letters_right) {
 				Glyph? gl = font.get_glyph (right_glyph_name);
-				if (gl != null && has_kerning (character.get_name (), right_glyph_name)) {
-					kerning = get_kerning (character.get_name (), right_glyph_name);
-					kl.add_unique ((!) gl , kerning);
+				
+				if (gl != null && !kl.has_right ((!) gl)) {
+					single_value = get_kerning_for_single_glyphs (left_name, right_glyph_name);
+					
+					if (single_value != null) {
+						kl.add_unique ((!) gl, (!) single_value);
+					}
 				}
 			}
 			
@@ -585,6 +608,46 @@ public class KerningClasses : GLib.Object {
 		}
 	}
 
+	/** Find all glyphs in a range, the result is cached in expanded_ranges
+	 * since many kerning classes share the same range.
+	 */
+	Gee.ArrayList<Glyph> get_glyphs_in_range (GlyphRange r, 
+		Gee.HashMap<string, Gee.ArrayList<Glyph>> expanded_ranges) {
+		
+		Gee.ArrayList<Glyph> glyphs;
+		Gee.HashSet<Glyph> added;
+		string key = r.get_all_ranges ();
+		string name;
+		Glyph? g;
+		
+		if (expanded_ranges.has_key (key)) {
+			return expanded_ranges.get (key);
+		}
+		
+		glyphs = new Gee.ArrayList<Glyph> ();
+		added = new Gee.HashSet<Glyph> ();
+		
+		foreach (UniRange u in r.ranges) {
+			for (unichar c = u.start; c <= u.stop; c++) {
+				name = (!) c.to_string ();
+				g = font.get_glyph (name);
+				if (g != null && added.add ((!) g)) {
+					glyphs.add ((!) g);
+				}
+			}
+		}
+		
+		foreach (string n in r.unassigned) {
+			g = font.get_glyph (n);
+			if (g != null && added.add ((!) g)) {
+				glyphs.add ((!) g);
+			}
+		}
+		
+		expanded_ranges.set (key, glyphs);
+		return glyphs;
+	}
+
 	private bool set_protect_map (bool p) {
 		if (unlikely (p && protect_map)) {
 			warning ("Map is already protected.");
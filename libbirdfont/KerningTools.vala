@@ -228,8 +228,9 @@ public class KerningTools : ToolCollection  {
 	public static void add_unique_class (KerningRange kerning_class) {
 		KerningRange k;
 		
-		if (is_null (classes)) { // FIXME: export without tools
-			init ();
+		if (is_null (classes)) {
+			// no toolbox, init will add the classes from the font
+			return;
 		}
 		
 		foreach (Tool t in classes.tool) {
@@ -263,6 +264,10 @@ public class KerningTools : ToolCollection  {
 		GlyphRange r;
 		int i;
 		
+		if (is_null (classes)) {
+			return;
+		}
+		
 		remove_all_kerning_classes ();
 		
 		for (i = 0; i < k.classes_first.size; i++) {
@@ -286,10 +291,6 @@ public class KerningTools : ToolCollection  {
 	}
 
 	private static void remove_all_kerning_classes () {
-		if (is_null (classes)) { // FIXME: export without tools
-			init ();
-		}
-		
 		classes.tool.clear ();
 		
 		if (!is_null (MainWindow.get_toolbox ())) {
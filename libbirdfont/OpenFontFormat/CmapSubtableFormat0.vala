@@ -49,14 +49,8 @@ public class CmapSubtableFormat0 : CmapSubtable {
 	}
 	
 	uint8 get_gid_for_unichar (unichar c, GlyfTable glyf_table) {
-		uint32 index = 0;
-		foreach (GlyphCollection g in glyf_table.glyphs) {
-			if (g.get_unicode_character () == c && !g.is_unassigned ()) {
-				return (index <= uint8.MAX) ? (uint8) index : 0;
-			}
-			index++;
-		}
-		return 0;		
+		int index = glyf_table.get_gid_for_unichar (c);
+		return (0 <= index <= uint8.MAX) ? (uint8) index : 0;
 	}
 }
 
@@ -50,6 +50,7 @@ public class CmapSubtableFormat12 : CmapSubtable {
 		}
 		
 		ranges = glyph_range.get_ranges ();
+		fd.reserve (16 + ranges.size * 12);
 		
 		fd.add_u16 (12); // Format
 		fd.add_u16 (0); // Reserved
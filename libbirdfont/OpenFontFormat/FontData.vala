@@ -293,18 +293,35 @@ public class FontData : Object {
 	}
 
 	public void add_32 (int32 i) throws GLib.Error {
-		uint32 s = (uint16) (i >> 16);
-		
-		add_u16 ((uint16) s);
-		add_u16 ((uint16) (i - (s << 16)));
+		add_u32 ((uint32) i);
 	}
 				
 	public void add_byte (uint8 b) throws Error {
 		add (b);
 	}
 	
+	/** Allocate memory for at least size bytes in this table. */
+	public void reserve (uint32 size) {
+		if (size > capacity) {
+			resize (size);
+		}
+	}
+	
+	/** Grow the buffer geometrically in order to avoid a reallocation
+	 * for every kilobyte added to large tables.
+	 */
 	private void expand (uint extra_bytes = 1024) {
-		capacity += extra_bytes;
+		uint32 new_capacity = capacity * 2;
+		
+		if (new_capacity < capacity + extra_bytes) {
+			new_capacity = capacity + extra_bytes;
+		}
+		
+		resize (new_capacity);
+	}
+	
+	private void resize (uint32 new_capacity) {
+		capacity = new_capacity;
 		table_data = (uint8*) try_realloc (table_data, capacity);
 		
 		if (table_data == null) {
@@ -313,6 +330,21 @@ public class FontData : Object {
 		}		
 	}
 	
+	/** Make room for n bytes at the end of the table.
+	 * @return true if the bytes can be written directly to the buffer
+	 */
+	private bool reserve_append (uint n) {
+		if (unlikely (wp != len)) {
+			return false;
+		}
+		
+		if (unlikely (len + n > capacity)) {
+			expand (n);
+		}
+		
+		return likely (table_data != null);
+	}
+	
 	public void add (uint8 d) {
 		if (unlikely (len == capacity)) {
 			expand ();
@@ -333,16 +365,21 @@ public class FontData : Object {
 	}
 		
 	public void add_u16 (uint16 d) {
+		if (likely (reserve_append (2))) {
+			table_data[wp] = (uint8) (d >> 8);
+			table_data[wp + 1] = (uint8) (d & 0xFF);
+			wp += 2;
+			len += 2;
+			return;
+		}
+		
 		uint16 n = d >> 8;
 		add ((uint8)n);
 		add ((uint8)(d - (n << 8)));
 	}
 
 	public void add_16 (int16 i) {
-		uint8 s = (uint8) (i >> 8);
-		
-		add ((uint8) s);
-		add ((uint8) (i - (s << 8)));
+		add_u16 ((uint16) i);
 	}
 
 	public void add_littleendian_u32 (uint32 i) {
@@ -353,6 +390,16 @@ public class FontData : Object {
 	}
 		
 	public void add_u32 (uint32 i) {
+		if (likely (reserve_append (4))) {
+			table_data[wp] = (uint8) (i >> 24);
+			table_data[wp + 1] = (uint8) ((i >> 16) & 0xFF);
+			table_data[wp + 2] = (uint8) ((i >> 8) & 0xFF);
+			table_data[wp + 3] = (uint8) (i & 0xFF);
+			wp += 4;
+			len += 4;
+			return;
+		}
+		
 		uint32 s = (uint16) (i >> 16);
 		
 		add_u16 ((uint16) s);
@@ -623,9 +670,32 @@ public class FontData : Object {
 		}
 	}
 	
+	public void add_bytes (uint8[] data) {
+		if (likely (reserve_append (data.length))) {
+			Memory.copy (table_data + wp, data, data.length);
+			wp += data.length;
+			len += data.length;
+			return;
+		}
+		
+		foreach (uint8 b in data) {
+			add (b);
+		}
+	}
+	
 	public void append (FontData fd) {
+		uint n = fd.length ();
+		
 		fd.seek (0);
-		for (int i = 0; i < fd.length (); i++) {
+		
+		if (likely (reserve_append (n))) {
+			Memory.copy (table_data + wp, fd.table_data, n);
+			wp += n;
+			len += n;
+			return;
+		}
+		
+		for (int i = 0; i < n; i++) {
 			add (fd.read ());
 		}
 	}
@@ -0,0 +1,216 @@
+/*
+	Copyright (C) 2026 Johan Mattsson
+
+	This library is free software; you can redistribute it and/or modify
+	it under the terms of the GNU Lesser General Public License as
+	published by the Free Software Foundation; either version 3 of the
+	License, or (at your option) any later version.
+
+	This library is distributed in the hope that it will be useful, but
+	WITHOUT ANY WARRANTY; without even the implied warranty of
+	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+	Lesser General Public License for more details.
+*/
+
+namespace BirdFont {
+
+/** Encoded glyf table entries from previous exports. The entries are
+ * stored on disk and keyed by a hash of everything that affects the
+ * encoding of the glyph.
+ */
+public class GlyfCache : GLib.Object {
+	const string MAGIC = "BirdFont glyf cache 1";
+
+	File file;
+
+	Gee.HashMap<string, GlyfCacheEntry> entries;
+
+	/** Entries used in this export, only these are saved. */
+	Gee.HashMap<string, GlyfCacheEntry> used;
+
+	int hits = 0;
+	int misses = 0;
+	double encoding_time = 0;
+
+	public GlyfCache (File directory) {
+		file = get_child (directory, ".birdfont-cache");
+		entries = new Gee.HashMap<string, GlyfCacheEntry> ();
+		used = new Gee.HashMap<string, GlyfCacheEntry> ();
+	}
+
+	public static string get_key (Glyph g) {
+		Font font = OpenFontFormatWriter.get_current_font ();
+		StringBuilder data = new StringBuilder ();
+
+		data.append (MAGIC);
+		data.append (@" $(HeadTable.UNITS) $(font.base_line) $(g.left_limit)\n");
+
+		foreach (Path p in g.get_visible_paths ()) {
+			data.append (@"$(p.stroke) $((int) p.line_cap) $(p.skew) ");
+			data.append (BirdFontFile.get_point_data (p));
+			data.append ("\n");
+		}
+
+		return Checksum.compute_for_string (ChecksumType.SHA256, data.str);
+	}
+
+	public GlyfCacheEntry? get_entry (string key) {
+		GlyfCacheEntry? entry = null;
+
+		lock (entries) {
+			if (entries.has_key (key)) {
+				entry = entries.get (key);
+				used.set (key, (!) entry);
+				hits++;
+			}
+		}
+
+		return entry;
+	}
+
+	/** Add a new entry.
+	 * @param time seconds spent on encoding the glyph
+	 */
+	public void add_entry (string key, GlyfCacheEntry entry, double time) {
+		lock (entries) {
+			entries.set (key, entry);
+			used.set (key, entry);
+			misses++;
+			encoding_time += time;
+		}
+	}
+
+	public string get_statistics () {
+		double saved = 0;
+
+		if (misses > 0) {
+			saved = hits * encoding_time / misses;
+		}
+
+		return @"Glyph cache: $hits hits, $misses misses, "
+			+ "%.2fs saved".printf (saved);
+	}
+
+	public void load () {
+		DataInputStream dis;
+		GlyfCacheEntry entry;
+		string? magic;
+		string key;
+		uint32 count;
+		uint32 length;
+		size_t read;
+
+		if (!file.query_exists ()) {
+			return;
+		}
+
+		try {
+			dis = new DataInputStream (file.read ());
+			magic = dis.read_line (null);
+
+			if (magic != MAGIC) {
+				warning ("Ignoring glyf cache in unknown format.");
+				return;
+			}
+
+			count = dis.read_uint32 ();
+			for (uint32 i = 0; i < count; i++) {
+				key = (!) dis.read_line (null);
+				entry = new GlyfCacheEntry ();
+				entry.xmin = dis.read_int16 ();
+				entry.ymin = dis.read_int16 ();
+				entry.xmax = dis.read_int16 ();
+				entry.ymax = dis.read_int16 ();
+				entry.end_point = dis.read_uint16 ();
+				entry.ncontours = dis.read_int16 ();
+				entry.empty = dis.read_byte () != 0;
+
+				length = dis.read_uint32 ();
+				entry.data = new uint8[length];
+				dis.read_all (entry.data, out read);
+
+				if (read != length) {
+					warning ("Glyf cache is truncated.");
+					entries.clear ();
+					return;
+				}
+
+				entries.set (key, entry);
+			}
+		} catch (GLib.Error e) {
+			warning (e.message);
+			entries.clear ();
+		}
+	}
+
+	/** Write the entries used in this export to a temporary file and
+	 * replace the old cache. */
+	public void save () {
+		File temp_file = get_child ((!) file.get_parent (), ".birdfont-cache.tmp");
+		DataOutputStream os;
+		GlyfCacheEntry entry;
+		size_t written;
+
+		try {
+			os = new DataOutputStream (temp_file.replace (null, false, FileCreateFlags.PRIVATE));
+			os.put_string (MAGIC + "\n");
+			os.put_uint32 (used.size);
+
+			foreach (string key in used.keys) {
+				entry = used.get (key);
+				os.put_string (key + "\n");
+				os.put_int16 (entry.xmin);
+				os.put_int16 (entry.ymin);
+				os.put_int16 (entry.xmax);
+				os.put_int16 (entry.ymax);
+				os.put_uint16 (entry.end_point);
+				os.put_int16 (entry.ncontours);
+				os.put_byte (entry.empty ? 1 : 0);
+				os.put_uint32 (entry.data.length);
+				os.write_all (entry.data, out written);
+			}
+
+			os.close ();
+			temp_file.move (file, FileCopyFlags.OVERWRITE);
+		} catch (GLib.Error e) {
+			warning (e.message);
+		}
+	}
+}
+
+/** Encoded data and metrics for one glyph in the glyf table. */
+public class GlyfCacheEntry : GLib.Object {
+	public uint8[] data = new uint8[0];
+
+	public int16 xmin = 0;
+	public int16 ymin = 0;
+	public int16 xmax = 0;
+	public int16 ymax = 0;
+
+	public uint16 end_point = 0;
+	public int16 ncontours = 0;
+	public bool empty = true;
+
+	public GlyfCacheEntry () {
+	}
+
+	public GlyfCacheEntry.for_glyph (GlyfData glyf_data, bool empty, FontData fd, uint start) {
+		uint length = fd.length () - start;
+
+		xmin = glyf_data.bounding_box_xmin;
+		ymin = glyf_data.bounding_box_ymin;
+		xmax = glyf_data.bounding_box_xmax;
+		ymax = glyf_data.bounding_box_ymax;
+		end_point = glyf_data.get_end_point ();
+		ncontours = glyf_data.get_ncontours ();
+		this.empty = empty;
+
+		data = new uint8[length];
+
+		if (length > 0) {
+			Memory.copy (data, fd.table_data + start, length);
+		}
+	}
+}
+
+}
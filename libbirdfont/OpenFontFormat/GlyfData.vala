@@ -52,10 +52,24 @@ public class GlyfData : GLib.Object {
 	public int16 bounding_box_xmax = 0;
 	public int16 bounding_box_ymax = 0;
 	
+	/** True if the glyph has no outline in the glyf table. The flag is
+	 * kept here instead of in the glyph since the glyph is shared with
+	 * the rest of the program during export. */
+	public bool empty = false;
+	
 	private static double UNITS {
 		get { return HeadTable.UNITS; }
 	}
 		
+	/** Create glyf data with metrics only, for glyphs found in GlyfCache. */
+	public GlyfData.with_bounding_box (Glyph g, int16 xmin, int16 ymin, int16 xmax, int16 ymax) {
+		glyph = g;
+		bounding_box_xmin = xmin;
+		bounding_box_ymin = ymin;
+		bounding_box_xmax = xmax;
+		bounding_box_ymax = ymax;
+	}
+	
 	public GlyfData (Glyph g) {
 		PathList all_quadratic = g.get_quadratic_paths (); 
 		PathList qp = new PathList ();
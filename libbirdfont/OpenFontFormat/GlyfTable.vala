@@ -45,8 +45,21 @@ public class GlyfTable : OtfTable {
 	public Gee.ArrayList<GlyphCollection> glyphs;
 	public Gee.ArrayList<GlyfData> glyf_data;
 	
+	// glyph id lookup tables, created when the glyphs are sorted
+	Gee.HashMap<string, int> gid_by_name;
+	Gee.HashMap<unichar, int> gid_by_unichar;
+	
 	uint16 max_points = 0;
 	uint16 max_contours = 0;
+	
+	/** Number of threads used for encoding glyphs. */
+	public static int jobs = 1;
+	
+	/** Encoded glyphs from previous exports or null if no cache is used. */
+	public static GlyfCache? cache = null;
+	
+	const int GLYPHS_PER_CHUNK = 64;
+	int next_chunk = 0;
 
 	public GlyfTable (LocaTable l) {
 		id = "glyf";
@@ -54,20 +67,50 @@ public class GlyfTable : OtfTable {
 		location_offsets = new Gee.ArrayList<uint32> ();
 		glyphs = new Gee.ArrayList<GlyphCollection> ();
 		glyf_data = new Gee.ArrayList<GlyfData> ();
+		gid_by_name = new Gee.HashMap<string, int> ();
+		gid_by_unichar = new Gee.HashMap<unichar, int> ();
 	}	
 
 	public int get_gid (string name) {
-		int i = 0;
+		if (unlikely (!gid_by_name.has_key (name))) {
+			warning (@"Glyph $name not found in font.");
+			return -1;
+		}
 		
-		foreach (GlyphCollection g in glyphs) {
-			if (g.get_name () == name) {
-				return i;
-			}
-			i++;
+		return gid_by_name.get (name);
+	}
+
+	/** @return glyph id for an assigned character or -1 if the character
+	 * is not in the font.
+	 */
+	public int get_gid_for_unichar (unichar c) {
+		if (!gid_by_unichar.has_key (c)) {
+			return -1;
 		}
 		
-		warning (@"Glyph $name not found in font.");
-		return -1;
+		return gid_by_unichar.get (c);
+	}
+	
+	void create_gid_index () {
+		int gid = 0;
+		
+		gid_by_name.clear ();
+		gid_by_unichar.clear ();
+		
+		foreach (GlyphCollection gc in glyphs) {
+			string name = gc.get_name ();
+			unichar c = gc.get_unicode_character ();
+			
+			if (!gid_by_name.has_key (name)) {
+				gid_by_name.set (name, gid);
+			}
+			
+			if (!gc.is_unassigned () && !gid_by_unichar.has_key (c)) {
+				gid_by_unichar.set (c, gid);
+			}
+			
+			gid++;
+		}
 	}
 
 	public uint16 get_max_contours () {
@@ -99,22 +142,58 @@ public class GlyfTable : OtfTable {
 
 	public void process () throws GLib.Error {
 		FontData fd = new FontData ();
-		uint last_len = 0;
-		uint num_glyphs;
-		Glyph g;
+		Gee.ArrayList<Glyph> current_glyphs;
 		
 		create_glyph_table ();
-		
-		num_glyphs = glyphs.size;
+		fd.reserve (estimate_size ());
 		
 		if (glyphs.size == 0) {
 			warning ("No glyphs in glyf table.");
 		}
 		
+		current_glyphs = get_current_glyphs ();
+		
+		if (jobs > 1 && glyphs.size > GLYPHS_PER_CHUNK) {
+			process_parallel (current_glyphs, fd);
+		} else {
+			process_glyphs (current_glyphs, 0, current_glyphs.size, fd);
+		}
+
+		location_offsets.add (fd.length ()); // last entry in loca table is special
+		
+		// every glyph is padded, no padding to be done here
+		assert (fd.length () % 4 == 0);
+
+		font_data = fd;	
+	}
+	
+	/** The glyph to export for each collection, in GID order. The list is
+	 * created before any worker starts, the workers never look up the 
+	 * current glyph in a collection that the main window can change.
+	 */
+	Gee.ArrayList<Glyph> get_current_glyphs () {
+		Gee.ArrayList<Glyph> current_glyphs = new Gee.ArrayList<Glyph> ();
+		
 		foreach (GlyphCollection gc in glyphs) {
-			g = gc.get_current ();
+			current_glyphs.add (gc.get_current ());
+		}
+		
+		return current_glyphs;
+	}
+	
+	/** Encode glyphs from start to stop (exclusive) and add them to fd. 
+	 * Encoding only reads the glyphs, strokes and quadratic paths are
+	 * created from copies.
+	 */
+	void process_glyphs (Gee.ArrayList<Glyph> glyph_list, int start, int stop, FontData fd) 
+	throws GLib.Error {
+		uint last_len = fd.length ();
+		Glyph g;
+		
+		for (int i = start; i < stop; i++) {
+			g = glyph_list.get (i);
 
-			printd (@"adding glyph: $(gc.get_name ())\n");
+			printd (@"adding glyph: $(g.get_name ())\n");
 						
 			// set values for loca table
 			assert (fd.length () % 4 == 0);
@@ -126,15 +205,121 @@ public class GlyfTable : OtfTable {
 			
 			last_len = fd.length ();
 		}
-
-		location_offsets.add (fd.length ()); // last entry in loca table is special
+	}
+	
+	/** Encode chunks of glyphs in separate buffers on several threads and
+	 * concatenate them in GID order. The result is identical to the 
+	 * output from process_glyphs.
+	 */
+	void process_parallel (Gee.ArrayList<Glyph> current_glyphs, FontData fd) throws GLib.Error {
+		Gee.ArrayList<GlyfChunk> chunks = new Gee.ArrayList<GlyfChunk> ();
+		Gee.ArrayList<Thread<void*>> threads = new Gee.ArrayList<Thread<void*>> ();
+		int stop;
+		
+		for (int i = 0; i < current_glyphs.size; i += GLYPHS_PER_CHUNK) {
+			stop = int.min (i + GLYPHS_PER_CHUNK, current_glyphs.size);
+			chunks.add (new GlyfChunk (new GlyfTable (loca_table), i, stop));
+		}
 		
-		// every glyph is padded, no padding to be done here
-		assert (fd.length () % 4 == 0);
-
-		font_data = fd;	
+		next_chunk = 0;
+		
+		// this thread is one of the workers
+		for (int i = 1; i < int.min (jobs, chunks.size); i++) {
+			try {
+				threads.add (new Thread<void*>.try ("glyf", () => {
+					process_chunks (current_glyphs, chunks);
+					return null;
+				}));
+			} catch (GLib.Error e) {
+				warning (e.message);
+				break;
+			}
+		}
+		
+		process_chunks (current_glyphs, chunks);
+		
+		foreach (Thread<void*> t in threads) {
+			t.join ();
+		}
+		
+		foreach (GlyfChunk chunk in chunks) {
+			if (chunk.error != null) {
+				throw ((!) chunk.error).copy ();
+			}
+			
+			append_chunk (chunk, fd);
+		}
+	}
+	
+	void process_chunks (Gee.ArrayList<Glyph> current_glyphs, Gee.ArrayList<GlyfChunk> chunks) {
+		GlyfChunk chunk;
+		int i;
+		
+		while ((i = AtomicInt.add (ref next_chunk, 1)) < chunks.size) {
+			chunk = chunks.get (i);
+			
+			try {
+				chunk.table.process_glyphs (current_glyphs, chunk.start, chunk.stop, chunk.data);
+			} catch (GLib.Error e) {
+				chunk.error = e.copy ();
+			}
+		}
+	}
+	
+	void append_chunk (GlyfChunk chunk, FontData fd) {
+		GlyfTable t = chunk.table;
+		uint offset = fd.length ();
+		
+		foreach (uint32 location in t.location_offsets) {
+			location_offsets.add (offset + location);
+		}
+		
+		glyf_data.add_all (t.glyf_data);
+		fd.append (chunk.data);
+		
+		if (t.max_points > max_points) {
+			max_points = t.max_points;
+		}
+		
+		if (t.max_contours > max_contours) {
+			max_contours = t.max_contours;
+		}
+		
+		if (t.xmin < xmin) {
+			xmin = t.xmin;
+		}
+		
+		if (t.ymin < ymin) {
+			ymin = t.ymin;
+		}
+		
+		if (t.xmax > xmax) {
+			xmax = t.xmax;
+		}
+		
+		if (t.ymax > ymax) {
+			ymax = t.ymax;
+		}
 	}
 
+	/** A rough estimate of the table size, the quadratic conversion adds 
+	 * about one point for each point in the cubic path and each point 
+	 * needs one byte for flags and two bytes for each coordinate.
+	 */
+	uint32 estimate_size () {
+		uint32 size = 0;
+		
+		foreach (GlyphCollection gc in glyphs) {
+			size += 12;
+			
+			foreach (Path p in gc.get_current ().get_visible_paths ()) {
+				size += 2 + 10 * p.points.size;
+			}
+		}
+		
+		return size;
+	}
+	
 	// necessary in order to have glyphs sorted according to ttf specification
 	public void create_glyph_table () {
 		Glyph g;
@@ -159,10 +344,10 @@ public class GlyfTable : OtfTable {
 			
 		// add glyphs
 		for (index = 0; (gcn = font.get_glyph_collection_index (index)) != null; index++) {		
+			// the glyphs are not copied and not modified, GlyfData converts 
+			// copies of the paths to quadratic form and skips empty paths
 			gc = (!) gcn;
-			gc = gc.copy_deep ();
 			g = gc.get_current ();
-			g.remove_empty_paths ();
 			unassigned = gc.is_unassigned ();
 
 			if (unassigned) {
@@ -197,6 +382,7 @@ public class GlyfTable : OtfTable {
 			glyphs.add (ug);
 		}
 		
+		create_gid_index ();
 		
 		int gid = 0;
 		foreach (GlyphCollection ug in glyphs) {
@@ -206,6 +392,80 @@ public class GlyfTable : OtfTable {
 	}
 
 	public void process_glyph (Glyph g, FontData fd) throws GLib.Error {
+		GlyfCacheEntry? cached;
+		GlyfData glyf_data;
+		string key;
+		uint start;
+		double time;
+		
+		if (cache == null) {
+			encode_glyph (g, fd);
+			return;
+		}
+		
+		key = GlyfCache.get_key (g);
+		cached = ((!) cache).get_entry (key);
+		
+		if (cached != null) {
+			add_cached_glyph (g, (!) cached, fd);
+			return;
+		}
+
+		fd.seek_end ();
+		start = fd.length ();
+		time = GLib.get_real_time ();
+		
+		encode_glyph (g, fd);
+		
+		time = (GLib.get_real_time () - time) / 1000000.0;
+		glyf_data = this.glyf_data.get (this.glyf_data.size - 1);
+		((!) cache).add_entry (key, new GlyfCacheEntry.for_glyph (glyf_data, glyf_data.empty, fd, start), time);
+	}
+	
+	void add_cached_glyph (Glyph g, GlyfCacheEntry entry, FontData fd) {
+		GlyfData glyf_data;
+		uint16 npoints;
+		
+		fd.seek_end ();
+		
+		glyf_data = new GlyfData.with_bounding_box (g, entry.xmin, entry.ymin, entry.xmax, entry.ymax);
+		glyf_data.empty = entry.empty;
+		this.glyf_data.add (glyf_data);
+		
+		if (entry.empty) {
+			return;
+		}
+		
+		fd.add_bytes (entry.data);
+		
+		npoints = (entry.ncontours > 0) ? entry.end_point : 0;
+		
+		if (npoints > max_points) {
+			max_points = npoints;
+		}
+		
+		if (entry.ncontours > max_contours) {
+			max_contours = entry.ncontours;
+		}
+		
+		if (entry.xmin < xmin) {
+			xmin = entry.xmin;
+		}
+		
+		if (entry.ymin < ymin) {
+			ymin = entry.ymin;
+		}
+		
+		if (entry.xmax > xmax) {
+			xmax = entry.xmax;
+		}
+		
+		if (entry.ymax > ymax) {
+			ymax = entry.ymax;
+		}
+	}
+	
+	void encode_glyph (Glyph g, FontData fd) throws GLib.Error {
 		uint16 end_point;
 		uint16 npoints;
 		int16 ncontours;
@@ -221,8 +481,7 @@ public class GlyfTable : OtfTable {
 		
 		printd (@"glyph_offset: $(glyph_offset)\n");
 		
-		g.remove_empty_paths ();
-		glyf_data = g.get_ttf_data ();
+		glyf_data = new GlyfData (g);
 	
 		int points = glyf_data.get_num_points ();
 		if (unlikely (points >= uint16.MAX)) {
@@ -235,11 +494,9 @@ public class GlyfTable : OtfTable {
 		if (g.get_visible_paths ().size == 0 || glyf_data.paths.size == 0 || glyf_data.get_ncontours () == 0) {
 			// location_offsets will be equal to location_offset + 1 for
 			// all empty glyphs
-			g.set_empty_ttf (true);
+			glyf_data.empty = true;
 			return;
 		}
-		
-		g.set_empty_ttf (false);
 
 		if (glyf_data.get_ncontours () == 0) {
 			warning (@"No paths in $(g.get_name ()) ($(g.get_hex ())) can be exported.");
@@ -790,4 +1047,20 @@ public class GlyfTable : OtfTable {
 	}
 }
 
+/** Glyphs encoded by one worker thread. */
+class GlyfChunk : GLib.Object {
+	public GlyfTable table;
+	public FontData data;
+	public int start;
+	public int stop;
+	public GLib.Error? error = null;
+	
+	public GlyfChunk (GlyfTable table, int start, int stop) {
+		this.table = table;
+		this.start = start;
+		this.stop = stop;
+		data = new FontData ();
+	}
+}
+
 }
@@ -121,6 +121,8 @@ public class GposTable : OtfTable {
 			}
 		}
 	
+		fd.reserve ((uint32) (fd.length () + 6 + 10 * pair_set_data.size + pair_set_data_length + 4));
+		
 		fd.add_ushort (9); // lookup type 
 		fd.add_ushort (0); // lookup flags
 		fd.add_ushort ((uint16) pair_set_data.size); // number of subtables
@@ -190,6 +192,8 @@ public class GposTable : OtfTable {
 			num_pairs = 0;
 			coverage_offset = 10;
 		}
+		
+		fd.reserve (coverage_offset + 4 + 2 * pair_set_count);
 			
 		fd.add_ushort (1); // position format
 		// offset to coverage table from beginning of kern pair table
@@ -142,7 +142,7 @@ public class HmtxTable : OtfTable {
 			fd.add_u16 (advance);
 			fd.add_16 (lsb);
 			
-			if (!g.is_empty_ttf ()) {
+			if (!gd.empty) {
 				if (advance > max_advance) {
 					max_advance = advance;
 				}
@@ -43,7 +43,7 @@ public class KernList : GLib.Object {
 		
 		classes = BirdFont.get_current_font ().get_kerning_classes ();
 		classes.all_pairs ((kp) => {
-			uint16 gid_left, gid_right;
+			int gid_left, gid_right;
 			KerningPair kerning_pair = kp;
 			int i;
 			
@@ -54,14 +54,14 @@ public class KernList : GLib.Object {
 			
 			string glyph_name = kerning_pair.character.get_name ();
 			current_pairs = new PairFormat1 ();
-			gid_left = (uint16) glyf_table.get_gid (glyph_name);
+			gid_left = glyf_table.get_gid (glyph_name);
 
 			if (unlikely (gid_left == -1)) {
 				warning("Ignoring kerning for missing character: $(glyph_name)");			
 				return;
 			}		
 			
-			current_pairs.left = gid_left;
+			current_pairs.left = (uint16) gid_left;
 			pairs.add (current_pairs);
 			
 			if (unlikely (kerning_pair.kerning.size == 0)) {
@@ -72,13 +72,13 @@ public class KernList : GLib.Object {
 			num_pairs += kerning_pair.kerning.size;
 			foreach (Kerning k in kerning_pair.kerning) {
 				string right_name = k.get_glyph ().get_name ();
-				gid_right = (uint16) glyf_table.get_gid (right_name);
+				gid_right = glyf_table.get_gid (right_name);
 
 				if (unlikely (gid_right == -1)) {
 					warning("Ignoring kerning for missing character (right): $(right_name)");
 				} else {
 					int16 kerning_value = (int16) Math.rint (k.val * HeadTable.UNITS);
-					Kern kern = new Kern (gid_left, gid_right, kerning_value);
+					Kern kern = new Kern ((uint16) gid_left, (uint16) gid_right, kerning_value);
 					current_pairs.pairs.add (kern);
 				}							
 			}
@@ -22,16 +22,22 @@ public class KerningPair : GLib.Object {
 	public Glyph character;
 	public Gee.ArrayList<Kerning> kerning;
 	public Gee.ArrayList<Glyph> right;
+	Gee.HashSet<Glyph> right_glyphs;
 	
 	public KerningPair (Glyph left) {
 		character = left;
 		right = new Gee.ArrayList<Glyph> ();
+		right_glyphs = new Gee.HashSet<Glyph> ();
 		kerning = new Gee.ArrayList<Kerning> ();
 	}
 	
+	public bool has_right (Glyph g) {
+		return right_glyphs.contains (g);
+	}
+	
 	public void add_unique (Glyph g, double k) {
-		if (!right.contains ((!) g)) {
-			right.add ((!) g);
+		if (right_glyphs.add (g)) {
+			right.add (g);
 			kerning.add (new Kerning.for_glyph (g, k));
 		}
 	}
@@ -43,10 +43,7 @@ public class OpenFontFormatWriter : Object  {
 	
 	public void write_ttf_font (Font nfont) throws Error {
 		long dl;
-		uint8* data;
 		Gee.ArrayList<OtfTable> tables;
-		FontData fd;
-		uint l;
 		
 		font = nfont;
 				
@@ -61,28 +58,34 @@ public class OpenFontFormatWriter : Object  {
 		}
 		
 		foreach (OtfTable t in tables) {
-			fd = t.get_font_data ();
-			data = fd.table_data;
-			l = fd.length_with_padding ();
-			
-			for (int j = 0; j < l; j++) {
-				os.put_byte (data[j]);
-			}
+			write_table (os, t.get_font_data ());
 		}
 		
+		// only the offset table, the directory and the OS/2 table are
+		// different in the Mac version, all other tables are reused
 		directory_table.process_mac ();
 
 		foreach (OtfTable t in tables) {
-			fd = t.get_font_data ();
-			data = fd.table_data;
-			l = fd.length_with_padding ();
-			
-			for (int j = 0; j < l; j++) {
-				os_mac.put_byte (data[j]);
-			}
+			write_table (os_mac, t.get_font_data ());
 		}
 	}
 	
+	/** Write the table, including its padding, in one call. */
+	static void write_table (OutputStream output, FontData fd) throws Error {
+		unowned uint8[] data;
+		size_t written;
+		
+		if (unlikely (fd.table_data == null)) {
+			warning ("No data in table.");
+			return;
+		}
+		
+		data = (uint8[]) fd.table_data;
+		data.length = (int) fd.length_with_padding ();
+		
+		output.write_all (data, out written);
+	}
+	
 	public void close () throws Error {
 		os.close ();
 		os_mac.close ();
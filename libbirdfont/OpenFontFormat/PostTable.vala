@@ -1106,6 +1106,9 @@ public class PostTable : OtfTable {
 		fd.add_ulong (0); // max mem for Type1
 
 		fd.add_ushort ((uint16) glyf_table.glyphs.size);
+		
+		// glyph name index and a short name for most glyphs
+		fd.reserve (fd.length () + 10 * glyf_table.glyphs.size);
 
 		// this part of the spec is so weird
 		
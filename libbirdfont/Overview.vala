@@ -577,6 +577,9 @@ public class Overview : FontDisplay {
 		item_list_length = items_per_row * rows;
 		visible_items.clear ();
 		
+		// render thumbnails for the items on screen first
+		ThumbnailRenderer.get_default ().clear_queue ();
+		
 		index = (uint32) first_visible;
 		x = OverviewItem.margin;
 		y = OverviewItem.margin;
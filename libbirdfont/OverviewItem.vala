@@ -43,6 +43,9 @@ public class OverviewItem : GLib.Object {
 	
 	private Surface? cache = null;
 	
+	/** Thumbnail that is being rendered for this item. */
+	string thumbnail_key = "";
+	
 	public static Surface? label_background = null;
 	public static Surface? selected_label_background = null;
 	public static Surface? label_background_no_menu = null;
@@ -91,6 +94,7 @@ public class OverviewItem : GLib.Object {
 
 	public void clear_cache () {
 		cache = null;
+		thumbnail_key = "";
 		
 		if (glyphs != null) {
 			Glyph g = ((!) glyphs).get_current ();
@@ -108,10 +112,8 @@ public class OverviewItem : GLib.Object {
 		double x1, x2, y1, y2;
 		double scale_box;
 		double w, h;
-		double glyph_width, glyph_height;
-		Surface s;
-		Context c;
-		Color color = Color.black ();
+		double glyph_width;
+		ThumbnailRequest request;
 		
 		g = ((!) glyphs).get_current ();
 		
@@ -125,31 +127,29 @@ public class OverviewItem : GLib.Object {
 
 		scale_box = (height / DEFAULT_HEIGHT) * 0.65;
 
-		s = Screen.create_background_surface ((int) width, (int) height - 20);
-		c = new Context (s);
-		
-		c.save ();
 		g.boundaries (out x1, out y1, out x2, out y2);
-	
 		glyph_width = x2 - x1;
-		glyph_height = y2 - y1;
-		
-		c.save ();
-		c.scale (scale_box * Screen.get_scale (), scale_box * Screen.get_scale ());
 
 		g.add_help_lines ();
 		
 		gx = ((w / scale_box) - glyph_width) / 2 - g.get_left_side_bearing ();
 		gy = h / scale_box + g.get_baseline () - 20 / scale_box - 20;
 
-		c.translate (gx - Glyph.xc () - g.get_lsb (), gy - Glyph.yc ());
-
-		g.draw_paths (c, color);
-		c.restore ();
+		request = new ThumbnailRequest (this, g, (int) width, (int) height - 20, scale_box,
+			gx - Glyph.xc () - g.get_lsb (), gy - Glyph.yc ());
 		
-		cache = s;
-		g.overview_thumbnail = s;
+		thumbnail_key = request.key;
+		ThumbnailRenderer.get_default ().render (request);
+	}
+
+	/** Show a thumbnail that was rendered in the background. */
+	public void set_thumbnail (string key, Surface thumbnail) {
+		if (key != thumbnail_key || glyphs == null) {
+			return;
+		}
 		
+		cache = thumbnail;
+		((!) glyphs).get_current ().overview_thumbnail = thumbnail;
 		GlyphCanvas.redraw ();
 	}
 
@@ -315,9 +315,22 @@ public class OverviewItem : GLib.Object {
 			cr.set_source_surface ((!) cache, (int) (x * Screen.get_scale ()), (int) ((y - height)) * Screen.get_scale ());
 			cr.paint ();
 			cr.restore ();
+		} else if (thumbnail_key != "") {
+			draw_placeholder (cr, x, y - height);
 		}
 	}
 
+	/** Shown until the thumbnail has been rendered. */
+	void draw_placeholder (Context cr, double x, double y) {
+		double size = (height - 20) / 3;
+		
+		cr.save ();
+		Theme.color_opacity (cr, "Overview Glyph", 0.1);
+		cr.rectangle (x + (width - size) / 2, y + (height - 20 - size) / 2, size, size);
+		cr.fill ();
+		cr.restore ();
+	}
+
 	public bool has_icons () {
 		return width > 50;
 	}
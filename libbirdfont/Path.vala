@@ -824,6 +824,60 @@ public class Path : GLib.Object {
 		
 		return new_path;
 	}	
+
+	/** @return true if a copy of this path would be identical to the other path */
+	public bool has_same_data (Path other) {
+		EditPoint a, b;
+		
+		if (points.size != other.points.size
+			|| gradient != null
+			|| other.gradient != null
+			|| !has_same_color (color, other.color)
+			|| !has_same_color (stroke_color, other.stroke_color)
+			|| fill != other.fill
+			|| edit != other.edit
+			|| open != other.open
+			|| stroke != other.stroke
+			|| line_cap != other.line_cap
+			|| skew != other.skew
+			|| direction_is_set != other.direction_is_set
+			|| hide_end_handle != other.hide_end_handle
+			|| highlight_last_segment != other.highlight_last_segment) {
+			return false;
+		}
+		
+		for (int i = 0; i < points.size; i++) {
+			a = points.get (i);
+			b = other.points.get (i);
+			
+			if (a.x != b.x
+				|| a.y != b.y
+				|| a.type != b.type
+				|| a.flags != b.flags
+				|| a.color != b.color
+				|| a.right_handle.angle != b.right_handle.angle
+				|| a.right_handle.length != b.right_handle.length
+				|| a.right_handle.type != b.right_handle.type
+				|| a.left_handle.angle != b.left_handle.angle
+				|| a.left_handle.length != b.left_handle.length
+				|| a.left_handle.type != b.left_handle.type) {
+				return false;
+			}
+		}
+		
+		return true;
+	}
+	
+	static bool has_same_color (Color? a, Color? b) {
+		if (a == null || b == null) {
+			return a == b;
+		}
+		
+		return ((!) a).r == ((!) b).r
+			&& ((!) a).g == ((!) b).g
+			&& ((!) a).b == ((!) b).b
+			&& ((!) a).a == ((!) b).a;
+	}
 	
 	public bool is_over (double x, double y) {
 		Glyph g = MainWindow.get_current_glyph ();
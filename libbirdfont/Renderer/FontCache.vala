@@ -16,59 +16,154 @@ using Gee;
 
 namespace BirdFont {
 
-/** Thread specific font cache. */	
+/** Fonts loaded for rendering text. The cache can be used from several
+ * threads, a font that is requested from more than one thread at the same
+ * time is only loaded once. The least recently used fonts are removed
+ * when the cache has more than max_fonts fonts.
+ */	
 public class FontCache {	
 	public static FallbackFont fallback_font;
 	
 	static FontCache? default_cache = null;
-	Gee.HashMap<string, CachedFont> fonts;
+	Gee.HashMap<string, FontCacheEntry> fonts;
 	CachedFont fallback;
 	
-	public FontCache () {
+	public const int DEFAULT_MAX_FONTS = 32;
+	int max_fonts;
+	uint64 clock = 0;
+	
+	int hits = 0;
+	int misses = 0;
+	int evictions = 0;
+	
+	public FontCache (int max_fonts = DEFAULT_MAX_FONTS) {
 		if (is_null (fallback_font)) {
 			fallback_font = new FallbackFont ();
 		}
 		
+		this.max_fonts = max_fonts;
 		fallback = new CachedFont (null);
-		fonts = new Gee.HashMap<string, CachedFont> ();
+		fonts = new Gee.HashMap<string, FontCacheEntry> ();
 	}
 	
 	public CachedFont get_font (string file_name) {
-		CachedFont c;
-		Font f;
-		bool ok;
+		FontCacheEntry entry;
+		CachedFont? c;
 
 		if (file_name == "") {
 			return fallback;
 		}
 		
-		if (fonts.has_key (file_name)) {
-			c = fonts.get (file_name);
-			return c;
+		lock (fonts) {
+			if (fonts.has_key (file_name)) {
+				entry = fonts.get (file_name);
+				hits++;
+			} else {
+				entry = new FontCacheEntry (file_name);
+				fonts.set (file_name, entry);
+				misses++;
+			}
+			
+			clock++;
+			entry.last_used = clock;
+		}
+		
+		c = entry.get_font ();
+		
+		lock (fonts) {
+			if (c == null) {
+				if (fonts.get (file_name) == entry) {
+					fonts.unset (file_name);
+				}
+			} else {
+				remove_old_fonts ();
+			}
 		}
 		
-		f = new Font ();
-		f.set_file (file_name);
-		ok = f.load ();
-		if (!ok) {
-			stderr.printf ("Can't load %s\n", file_name);
+		if (c == null) {
 			return new CachedFont (null);
 		}
 		
-		c = new CachedFont (f);
+		return (!) c;
+	}
+	
+	/** Set the maximum number of fonts in the cache. */
+	public void set_max_fonts (int max_fonts) {
+		lock (fonts) {
+			this.max_fonts = max_fonts;
+			remove_old_fonts ();
+		}
+	}
+	
+	public string get_statistics () {
+		string statistics;
 		
-		if (file_name == "") {
-			warning ("No file.");
-			return c;
+		lock (fonts) {
+			statistics = @"Font cache: $(fonts.size) fonts, $hits hits, "
+				+ @"$misses misses, $evictions evictions";
+		}
+		
+		return statistics;
+	}
+	
+	public int get_hits () {
+		int n;
+		
+		lock (fonts) {
+			n = hits;
+		}
+		
+		return n;
+	}
+	
+	public int get_misses () {
+		int n;
+		
+		lock (fonts) {
+			n = misses;
+		}
+		
+		return n;
+	}
+	
+	public int get_evictions () {
+		int n;
+		
+		lock (fonts) {
+			n = evictions;
 		}
 		
-		fonts.set (file_name, c);
-		return c;
+		return n;
+	}
+	
+	/** Remove the least recently used fonts, fonts that are being loaded
+	 * are kept. Call this method while fonts is locked. */
+	void remove_old_fonts () {
+		FontCacheEntry? oldest;
+		
+		while (fonts.size > max_fonts) {
+			oldest = null;
+			
+			foreach (FontCacheEntry entry in fonts.values) {
+				if (entry.loaded && (oldest == null || entry.last_used < ((!) oldest).last_used)) {
+					oldest = entry;
+				}
+			}
+			
+			if (oldest == null) {
+				break;
+			}
+			
+			fonts.unset (((!) oldest).file_name);
+			evictions++;
+		}
 	}
 
 	public static FontCache get_default_cache () {
-		if (default_cache == null) {
-			default_cache = new FontCache ();
+		lock (default_cache) {
+			if (default_cache == null) {
+				default_cache = new FontCache ();
+			}
 		}
 		
 		return (!) default_cache;
@@ -80,4 +175,42 @@ public class FontCache {
 
 }
 
+/** A font in the cache, it is loaded by the first thread that needs it. */
+class FontCacheEntry : GLib.Object {
+	public string file_name;
+	public uint64 last_used = 0;
+	public bool loaded = false;
+	
+	CachedFont? font = null;
+	
+	public FontCacheEntry (string file_name) {
+		this.file_name = file_name;
+	}
+	
+	/** Load the font unless it is loaded already. Other threads wait 
+	 * for the font while it is loaded.
+	 * @return the font or null if it can't be loaded
+	 */
+	public CachedFont? get_font () {
+		Font f;
+		
+		lock (font) {
+			if (!loaded) {
+				f = new Font ();
+				f.set_file (file_name);
+				
+				if (f.load ()) {
+					font = new CachedFont (f);
+				} else {
+					stderr.printf ("Can't load %s\n", file_name);
+				}
+				
+				loaded = true;
+			}
+		}
+		
+		return font;
+	}
+}
+
 }
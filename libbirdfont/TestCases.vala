@@ -49,8 +49,19 @@ class TestCases {
 		add (test_raster_path, "Raster path");
 		add (test_file_path, "File path");
 		add (test_xml, "XML");
+		add (test_undo, "Undo");
+		add (test_number_format, "Number format");
+		add (test_font_cache, "Font cache");
 
 		add_bechmark (benchmark_stroke, "Stroke");
+		add_bechmark (benchmark_glyph_table, "Glyph table");
+		add_bechmark (benchmark_kerning_classes, "Kerning classes");
+		add_bechmark (benchmark_parallel_glyf_table, "Parallel glyf table");
+		add_bechmark (benchmark_export_memory, "Export memory");
+		add_bechmark (benchmark_headless_export, "Headless export");
+		add_bechmark (benchmark_parse_path_data, "Parse path data");
+		add_bechmark (benchmark_save, "Save");
+		add_bechmark (benchmark_character_search, "Character search");
 	}
 	
 	private void add_bechmark (Callback callback, string name) {
@@ -179,6 +190,385 @@ class TestCases {
 		}
 	}
 	
+	/** Create a font with one square in each glyph for the benchmarks. */
+	public static Font create_benchmark_font (uint glyphs) {
+		Font font = BirdFont.new_font ();
+		GlyphCollection gc;
+		Glyph g;
+		Path p;
+		unichar c;
+		
+		font.set_name (@"Benchmark$glyphs");
+		
+		for (uint i = 0; i < glyphs; i++) {
+			c = (unichar) (0x20000 + i);
+			gc = new GlyphCollection.with_glyph (c, Font.get_name_for_character (c));
+			g = gc.get_current ();
+			
+			p = new Path ();
+			p.add (0, 0);
+			p.add (0, 10 + i % 50);
+			p.add (10 + i % 70, 10 + i % 50);
+			p.add (10 + i % 70, 0);
+			p.close ();
+			g.add_path (p);
+			
+			font.add_glyph_collection (gc);
+		}
+		
+		return font;
+	}
+	
+	public static void benchmark_glyph_table () {
+		uint[] sizes = { 10000, 30000, 65000 };
+		
+		foreach (uint size in sizes) {
+			benchmark_export_loop (size);
+		}
+	}
+	
+	static void benchmark_export_loop (uint size) {
+		Font font = create_benchmark_font (size);
+		GlyphCollection? gc;
+		uint index;
+		uint paths = 0;
+		Test loop_time;
+		Test export_time;
+		File folder;
+		
+		loop_time = new Test.time (@"Glyph index loop $size glyphs");
+		for (index = 0; (gc = font.get_glyph_collection_index (index)) != null; index++) {
+			paths += ((!) gc).get_current ().get_visible_paths ().size;
+		}
+		loop_time.print ();
+		
+		if (paths == 0 || index != size) {
+			warning (@"Expecting $size glyphs, got $index.");
+		}
+		
+		folder = BirdFont.get_settings_directory ();
+		export_time = new Test.time (@"TTF export $size glyphs");
+		if (!ExportTool.export_ttf_font_path (folder, false)) {
+			warning ("TTF export failed.");
+		}
+		export_time.print ();
+	}
+	
+	/** Encode the same glyphs with one and several threads and compare 
+	 * the output. */
+	public static void benchmark_parallel_glyf_table () {
+		Font font = create_benchmark_font (40000);
+		GlyfTable serial = new GlyfTable (new LocaTable ());
+		GlyfTable parallel = new GlyfTable (new LocaTable ());
+		FontData serial_data;
+		FontData parallel_data;
+		Test test_time;
+		
+		OpenFontFormatWriter.font = font;
+		HeadTable.init (font.units_per_em);
+		
+		try {
+			GlyfTable.jobs = 1;
+			test_time = new Test.time ("Glyf table, one thread");
+			serial.process ();
+			test_time.print ();
+			
+			GlyfTable.jobs = (int) get_num_processors ();
+			test_time = new Test.time (@"Glyf table, $(GlyfTable.jobs) threads");
+			parallel.process ();
+			test_time.print ();
+			
+			GlyfTable.jobs = 1;
+		} catch (GLib.Error e) {
+			warning (e.message);
+			return;
+		}
+		
+		serial_data = serial.get_font_data ();
+		parallel_data = parallel.get_font_data ();
+		
+		if (serial_data.length_with_padding () != parallel_data.length_with_padding ()
+			|| Memory.cmp (serial_data.table_data, parallel_data.table_data, serial_data.length_with_padding ()) != 0) {
+			warning ("The parallel glyf table is not identical to the serial table.");
+		}
+		
+		if (serial.location_offsets.size != parallel.location_offsets.size) {
+			warning ("Different number of glyphs in the parallel glyf table.");
+			return;
+		}
+		
+		for (int i = 0; i < serial.location_offsets.size; i++) {
+			if (serial.location_offsets.get (i) != parallel.location_offsets.get (i)) {
+				warning (@"Different location offset for GID $i in the parallel glyf table.");
+				return;
+			}
+		}
+	}
+
+	/** Print peak memory usage (resident set size) before and after TTF
+	 * export of a font with 30k glyphs. */
+	public static void benchmark_export_memory () {
+		Font font = create_benchmark_font (30000);
+		File folder = BirdFont.get_settings_directory ();
+		
+		print (@"Peak RSS for $(font.length ()) glyphs before export: $(get_peak_rss ())\n");
+		
+		if (!ExportTool.export_ttf_font_path (folder, false)) {
+			warning ("TTF export failed.");
+		}
+		
+		print (@"Peak RSS after export: $(get_peak_rss ())\n");
+	}
+	
+	/** Time from start of the headless export until the TTF file for a 
+	 * small font is written. */
+	public static void benchmark_headless_export () {
+		Font font = create_benchmark_font (100);
+		File folder = BirdFont.get_settings_directory ();
+		string bf_file = (!) get_child (folder, "Benchmark100.bf").get_path ();
+		BirdFontFile birdfont_file = new BirdFontFile (font);
+		File ttf_file;
+		Test test_time;
+		
+		if (!birdfont_file.write_font_file (bf_file)) {
+			warning (@"Can't write $bf_file");
+			return;
+		}
+		
+		ttf_file = get_child (folder, ExportSettings.get_file_name (font) + ".ttf");
+		
+		test_time = new Test.time ("Time to first byte, headless TTF export of 100 glyphs");
+		HeadlessExport.init ();
+		
+		if (!HeadlessExport.export_file (bf_file, folder, false, true)) {
+			warning ("Headless export failed.");
+		}
+		
+		test_time.print ();
+		
+		if (!ttf_file.query_exists ()) {
+			warning (@"No TTF file in $((!) folder.get_path ())");
+		}
+	}
+	
+	/** Search the character database, each query is run twice to show
+	 * the time for a cached result. */
+	public static void benchmark_character_search () {
+		string[] queries = { "latin", "latin small letter", "arrow", "digit", "greek capital", "cjk*" };
+		GlyphRange result;
+		Test test_time;
+		
+		foreach (string query in queries) {
+			for (int i = 0; i < 2; i++) {
+				test_time = new Test.time (@"Search for \"$query\"");
+				result = CharDatabase.search (query);
+				test_time.print ();
+				print (@"$(result.get_length ()) characters\n");
+			}
+		}
+	}
+	
+	/** Time to write a .bf file with 30000 glyphs. */
+	public static void benchmark_save () {
+		Font font = create_benchmark_font (30000);
+		File folder = BirdFont.get_settings_directory ();
+		string bf_file = (!) get_child (folder, "Benchmark30000.bf").get_path ();
+		BirdFontFile birdfont_file = new BirdFontFile (font);
+		Test test_time;
+		FileInfo info;
+		double megabytes;
+		
+		test_time = new Test.time ("Save 30000 glyphs");
+		
+		if (!birdfont_file.write_font_file (bf_file)) {
+			warning (@"Can't write $bf_file");
+			return;
+		}
+		
+		test_time.print ();
+		
+		try {
+			info = File.new_for_path (bf_file).query_info (FileAttribute.STANDARD_SIZE, FileQueryInfoFlags.NONE);
+			megabytes = info.get_size () / (1024.0 * 1024.0);
+			print ("%.2f MB, %.2f MB/s\n".printf (megabytes, megabytes / test_time.get_time ()));
+		} catch (GLib.Error e) {
+			warning (e.message);
+		}
+	}
+	
+	/** Compare the old tokenizer, which split the path data into arrays,
+	 * with the single pass parser on path data from real fonts. */
+	public static void benchmark_parse_path_data () {
+		string[] files = { 
+			"./fonts/Decibel.bf", 
+			"./resources/icons.birdfont", 
+			"./fixed-kerning-example/fk-example.birdfont" 
+		};
+		Gee.ArrayList<string> corpus = new Gee.ArrayList<string> ();
+		string content;
+		int start, end;
+		uint coordinates;
+		uint points;
+		double x, y;
+		double elapsed;
+		Path path;
+		
+		foreach (string f in files) {
+			if (!FileUtils.test (f, FileTest.EXISTS)) {
+				continue;
+			}
+			
+			try {
+				FileUtils.get_contents (f, out content);
+			} catch (GLib.Error e) {
+				warning (e.message);
+				continue;
+			}
+			
+			start = 0;
+			while ((start = content.index_of ("<path ", start)) != -1) {
+				end = content.index_of (">", start);
+				start = content.index_of (" data=\"", start);
+				
+				if (start == -1 || end == -1) {
+					break;
+				}
+				
+				if (start > end) {
+					start = end;
+					continue;
+				}
+				
+				start += " data=\"".length;
+				end = content.index_of ("\"", start);
+				corpus.add (content.substring (start, end - start));
+				start = end;
+			}
+		}
+		
+		if (corpus.size == 0) {
+			warning ("No path data found.");
+			return;
+		}
+		
+		elapsed = GLib.get_real_time ();
+		coordinates = 0;
+		for (int r = 0; r < 100; r++) {
+			foreach (string data in corpus) {
+				foreach (string token in data.split (" ")) {
+					string[] p = token.split (",");
+					
+					if (p.length == 2) {
+						x = double.parse (p[0]);
+						y = double.parse (p[1]);
+						coordinates++;
+					}
+				}
+			}
+		}
+		elapsed = (GLib.get_real_time () - elapsed) / 1000000.0;
+		print ("Split tokenizer: %.0f coordinates per second\n", coordinates / elapsed);
+		
+		elapsed = GLib.get_real_time ();
+		coordinates = 0;
+		for (int r = 0; r < 100; r++) {
+			foreach (string data in corpus) {
+				char* d = (char*) data;
+				int i = 0;
+				
+				while (d[i] != '\0') {
+					if (BirdFontFile.read_instruction (d, ref i) == '\0') {
+						break;
+					}
+					
+					while (d[i] != '\0' && !d[i].isalpha ()) {
+						if (!BirdFontFile.read_coordinate (d, ref i, out x, out y)) {
+							break;
+						}
+						
+						coordinates++;
+					}
+				}
+			}
+		}
+		elapsed = (GLib.get_real_time () - elapsed) / 1000000.0;
+		print ("Single pass tokenizer: %.0f coordinates per second\n", coordinates / elapsed);
+		
+		elapsed = GLib.get_real_time ();
+		points = 0;
+		for (int r = 0; r < 10; r++) {
+			foreach (string data in corpus) {
+				path = new Path ();
+				BirdFontFile.parse_path_data (data, path);
+				points += path.points.size;
+			}
+		}
+		elapsed = (GLib.get_real_time () - elapsed) / 1000000.0;
+		print ("parse_path_data: %.0f points per second\n", points / elapsed);
+	}
+	
+	static string get_peak_rss () {
+		string status;
+		
+		try {
+			FileUtils.get_contents ("/proc/self/status", out status);
+			
+			foreach (string line in status.split ("\n")) {
+				if (line.has_prefix ("VmHWM:")) {
+					return line.substring ("VmHWM:".length).strip ();
+				}
+			}
+		} catch (GLib.Error e) {
+			warning (e.message);
+		}
+		
+		return "unknown";
+	}
+
+	/** Kern 500 left classes against 500 right classes. */
+	public static void benchmark_kerning_classes () {
+		int num_classes = 500;
+		Font font = create_benchmark_font (4 * num_classes);
+		KerningClasses classes = font.get_kerning_classes ();
+		Gee.ArrayList<GlyphRange> left = new Gee.ArrayList<GlyphRange> ();
+		Gee.ArrayList<GlyphRange> right = new Gee.ArrayList<GlyphRange> ();
+		GlyphRange range;
+		unichar first = 0x20000;
+		Test test_time;
+		int num_pairs = 0;
+		
+		for (int i = 0; i < num_classes; i++) {
+			range = new GlyphRange ();
+			range.add_range ((unichar) (first + 2 * i), (unichar) (first + 2 * i + 1));
+			range.set_class (true);
+			left.add (range);
+			
+			range = new GlyphRange ();
+			range.add_range ((unichar) (first + 2 * (num_classes + i)), (unichar) (first + 2 * (num_classes + i) + 1));
+			range.set_class (true);
+			right.add (range);
+		}
+		
+		// set_kerning searches for duplicates, add the classes directly
+		foreach (GlyphRange l in left) {
+			foreach (GlyphRange r in right) {
+				classes.classes_first.add (l);
+				classes.classes_last.add (r);
+				classes.classes_kerning.add (new Kerning (Random.int_range (-50, 50)));
+			}
+		}
+		
+		test_time = new Test.time (@"Kerning pairs for $num_classes × $num_classes classes");
+		classes.all_pairs ((pair) => {
+			num_pairs += pair.kerning.size;
+		});
+		test_time.print ();
+		
+		if (num_pairs != 4 * num_classes * num_classes) {
+			warning (@"Expecting $(4 * num_classes * num_classes) kerning pairs, got $num_pairs.");
+		}
+	}
+	
 	public static void test_freetype () {
 		StringBuilder? data;
 		int error;
@@ -1111,6 +1501,165 @@ class TestCases {
 		return pen_tool;
 	}
 	
+	public static void test_undo () {
+		Glyph g = new Glyph.no_lines ("undo");
+		GlyphUndoList undo_list = new GlyphUndoList ();
+		Path moved = new Path ();
+		Path unchanged = new Path ();
+		int64 memory;
+		
+		for (int i = 0; i < 100; i++) {
+			moved.add (i, 0);
+			unchanged.add (i, 10);
+		}
+		
+		g.add_path (moved);
+		g.add_path (unchanged);
+		
+		undo_list.add (g);
+		memory = undo_list.get_memory_usage ();
+		
+		moved.points.get (0).x = 50;
+		undo_list.add (g);
+		
+		if (undo_list.get_memory_usage () > 3 * memory / 2) {
+			warning ("Unchanged paths are copied in undo states.");
+		}
+		
+		undo_list.add (g);
+		
+		if (undo_list.size != 2) {
+			warning ("Identical undo states were not merged.");
+		}
+		
+		if (undo_list.get_last ().get_all_paths ().get (0).points.get (0).x != 50) {
+			warning ("Wrong point in last undo state.");
+		}
+		
+		undo_list.remove_last ();
+		
+		if (undo_list.get_last ().get_all_paths ().get (0).points.get (0).x != 0) {
+			warning ("Wrong point in first undo state.");
+		}
+		
+		if (undo_list.get_memory_usage () != memory) {
+			warning ("Memory for removed undo states is not released.");
+		}
+	}
+
+	public static void test_font_cache () {
+		FontCache cache = new FontCache (2);
+		File folder = BirdFont.get_settings_directory ();
+		Gee.ArrayList<string> files = new Gee.ArrayList<string> ();
+		Gee.ArrayList<Thread<void*>> threads = new Gee.ArrayList<Thread<void*>> ();
+		BirdFontFile birdfont_file;
+		string path;
+		
+		for (uint i = 1; i <= 3; i++) {
+			path = (!) get_child (folder, @"FontCache$(i).bf").get_path ();
+			birdfont_file = new BirdFontFile (create_benchmark_font (i));
+			
+			if (!birdfont_file.write_font_file (path)) {
+				warning (@"Can't write $path");
+				return;
+			}
+			
+			files.add (path);
+		}
+		
+		cache.get_font (files.get (0));
+		cache.get_font (files.get (1));
+		cache.get_font (files.get (0));
+		cache.get_font (files.get (2));
+		
+		if (cache.get_evictions () != 1) {
+			warning (@"Expecting one eviction. $(cache.get_statistics ())");
+		}
+
+		cache.get_font (files.get (0));
+		
+		if (cache.get_hits () != 2 || cache.get_misses () != 3) {
+			warning (@"The least recently used font was not evicted. $(cache.get_statistics ())");
+		}
+		
+		cache = new FontCache ();
+		
+		for (int i = 0; i < 4; i++) {
+			try {
+				threads.add (new Thread<void*>.try ("font cache test", () => {
+					cache.get_font (files.get (1));
+					return null;
+				}));
+			} catch (GLib.Error e) {
+				warning (e.message);
+			}
+		}
+		
+		foreach (Thread<void*> t in threads) {
+			t.join ();
+		}
+		
+		if (cache.get_misses () != 1) {
+			warning (@"The same font was loaded more than once. $(cache.get_statistics ())");
+		}
+	}
+	
+	/** The number format in .bf files must not change. */
+	public static void test_number_format () {
+		double[] numbers = { 0, -0.0, 1, -1, 0.5, -0.000001, 0.000005, 
+			123456789.123456, -2.5e-6, 1e20, 1.0 / 3.0, 10, 100.10,
+			1e58, -1e100, double.MAX, -double.MAX };
+		double[] large_numbers = { 1e58, -1e100, 1e300, double.MAX, -double.MAX };
+		StringBuilder formatted = new StringBuilder ();
+		string expected;
+		double n;
+		
+		foreach (double large in large_numbers) {
+			formatted.truncate (0);
+			BirdFontFile.append_number (formatted, large);
+			
+			if (double.parse (formatted.str) != large) {
+				warning (@"$large was written as $(formatted.str)");
+			}
+		}
+		
+		for (int i = 0; i < numbers.length + 10000; i++) {
+			if (i < numbers.length) {
+				n = numbers[i];
+			} else {
+				n = Random.double_range (-2000, 2000);
+				n = Math.round (n * Math.pow (10, i % 8)) / Math.pow (10, i % 8);
+			}
+			
+			formatted.truncate (0);
+			BirdFontFile.append_number (formatted, n);
+			expected = round_with_interpolation (n);
+			
+			if (formatted.str != expected) {
+				warning (@"Expected $expected for $n, got $(formatted.str)");
+			}
+		}
+	}
+	
+	/** The number format that was used before append_number. */
+	static string round_with_interpolation (double p) {
+		string v = "";
+		char[] c = new char [501];
+		
+		v = p.format (c, "%.5f");
+		v = v.replace (",", ".");
+		
+		if (v.index_of ("e") != -1) {	
+			v = "0.0";
+		}
+
+		if (v.index_of ("-") == 0 && double.parse (v) == -0) {
+			v = "0";
+		}
+
+		return BirdFontFile.remove_last_zeros (v);
+	}
+	
 	public static void test_delete_points () {
 		PenTool pen;
 
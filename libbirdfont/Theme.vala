@@ -36,6 +36,12 @@ public class Theme : GLib.Object {
 		text.set_source_rgba (c.r, c.g, c.b, c.a);
 	}
 
+	/** @return false if no theme has been loaded or if the theme does
+	 * not have a color with this name. */
+	public static bool has_color (string name) {
+		return !is_null (colors) && colors.has_key (name);
+	}
+
 	public static void color (Context cr, string name) {
 		Color c;
 		
@@ -0,0 +1,342 @@
+/*
+	Copyright (C) 2026 Johan Mattsson
+
+	This library is free software; you can redistribute it and/or modify
+	it under the terms of the GNU Lesser General Public License as
+	published by the Free Software Foundation; either version 3 of the
+	License, or (at your option) any later version.
+
+	This library is distributed in the hope that it will be useful, but
+	WITHOUT ANY WARRANTY; without even the implied warranty of
+	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+	Lesser General Public License for more details.
+*/
+
+using Cairo;
+
+namespace BirdFont {
+
+/** Render glyph thumbnails for the overview on worker threads.
+ *
+ * Requests are rendered in the order they are added, the overview clears
+ * the queue before it adds the items on screen. Rendered thumbnails are
+ * kept in memory, keyed by the content of the glyph and the size of the
+ * thumbnail, until the preference thumbnail_memory_limit (in megabytes)
+ * is exceeded. If the preference persistent_thumbnails is true, the
+ * thumbnails are also stored as PNG files in the settings directory.
+ */
+public class ThumbnailRenderer : GLib.Object {
+	const int DEFAULT_MEMORY_LIMIT = 64;
+	const string DIRECTORY = "thumbnails";
+
+	static ThumbnailRenderer? default_renderer = null;
+
+	/** Requests that have not been rendered yet. */
+	Gee.ArrayList<ThumbnailRequest> queue;
+	int running_threads = 0;
+	int max_threads;
+
+	/** Rendered thumbnails, only used from the main thread. */
+	Gee.HashMap<string, CachedThumbnail> thumbnails;
+	int64 memory = 0;
+	uint64 clock = 0;
+
+	File? directory = null;
+
+	int hits = 0;
+	int misses = 0;
+	int disk_hits = 0;
+
+	public ThumbnailRenderer () {
+		queue = new Gee.ArrayList<ThumbnailRequest> ();
+		thumbnails = new Gee.HashMap<string, CachedThumbnail> ();
+		max_threads = int.max (1, (int) get_num_processors () - 1);
+
+		if (Preferences.get ("persistent_thumbnails") == "true") {
+			directory = get_child (BirdFont.get_settings_directory (), DIRECTORY);
+		}
+	}
+
+	public static ThumbnailRenderer get_default () {
+		if (default_renderer == null) {
+			default_renderer = new ThumbnailRenderer ();
+		}
+
+		return (!) default_renderer;
+	}
+
+	/** Show a cached thumbnail for the item at once or render it in
+	 * the background. */
+	public void render (ThumbnailRequest request) {
+		CachedThumbnail? thumbnail = thumbnails.get (request.key);
+
+		if (thumbnail != null) {
+			hits++;
+			((!) thumbnail).last_used = ++clock;
+			request.item.set_thumbnail (request.key, ((!) thumbnail).surface);
+			return;
+		}
+
+		misses++;
+
+		lock (queue) {
+			queue.add (request);
+
+			if (running_threads < max_threads) {
+				try {
+					new Thread<void*>.try ("thumbnails", render_requests);
+					running_threads++;
+				} catch (GLib.Error e) {
+					warning (e.message);
+				}
+			}
+		}
+	}
+
+	/** Remove all requests that no thread has started to render. */
+	public void clear_queue () {
+		lock (queue) {
+			queue.clear ();
+		}
+	}
+
+	public string get_statistics () {
+		return @"Thumbnails: $hits hits, $misses misses, $disk_hits loaded from disk, "
+			+ @"$(thumbnails.size) in memory ($(memory / 1024) kB)";
+	}
+
+	ThumbnailRequest? get_next_request () {
+		ThumbnailRequest? request = null;
+
+		lock (queue) {
+			if (queue.size > 0) {
+				request = queue.remove_at (0);
+			} else {
+				running_threads--;
+			}
+		}
+
+		return request;
+	}
+
+	void* render_requests () {
+		ThumbnailRequest? request;
+		ImageSurface? surface;
+
+		while ((request = get_next_request ()) != null) {
+			ThumbnailRequest r = (!) request;
+			surface = load_thumbnail (r.key);
+
+			if (surface == null) {
+				surface = r.render ();
+				save_thumbnail (r.key, (!) surface);
+			} else {
+				AtomicInt.inc (ref disk_hits);
+			}
+
+			add_thumbnail (r, (!) surface);
+		}
+
+		return null;
+	}
+
+	/** Hand over a rendered thumbnail to the main thread. */
+	void add_thumbnail (ThumbnailRequest request, ImageSurface surface) {
+		IdleSource idle = new IdleSource ();
+
+		idle.set_callback (() => {
+			CachedThumbnail thumbnail = new CachedThumbnail (surface);
+
+			if (!thumbnails.has_key (request.key)) {
+				thumbnail.last_used = ++clock;
+				thumbnails.set (request.key, thumbnail);
+				memory += thumbnail.size;
+				remove_old_thumbnails ();
+			}
+
+			request.item.set_thumbnail (request.key, surface);
+			return false;
+		});
+
+		idle.attach (null);
+	}
+
+	void remove_old_thumbnails () {
+		int64 limit = get_memory_limit ();
+		string? oldest;
+		uint64 oldest_time;
+
+		while (memory > limit && thumbnails.size > 1) {
+			oldest = null;
+			oldest_time = uint64.MAX;
+
+			foreach (Gee.Map.Entry<string, CachedThumbnail> e in thumbnails.entries) {
+				if (e.value.last_used < oldest_time) {
+					oldest = e.key;
+					oldest_time = e.value.last_used;
+				}
+			}
+
+			memory -= thumbnails.get ((!) oldest).size;
+			thumbnails.unset ((!) oldest);
+		}
+	}
+
+	static int64 get_memory_limit () {
+		string limit = Preferences.get ("thumbnail_memory_limit");
+		int megabytes = DEFAULT_MEMORY_LIMIT;
+
+		if (limit != "") {
+			megabytes = int.parse (limit);
+		}
+
+		return (int64) megabytes * 1024 * 1024;
+	}
+
+	File? get_thumbnail_file (string key) {
+		File subdirectory;
+
+		if (directory == null) {
+			return null;
+		}
+
+		subdirectory = get_child ((!) directory, key.substring (0, 2));
+		return get_child (subdirectory, key + ".png");
+	}
+
+	ImageSurface? load_thumbnail (string key) {
+		File? file = get_thumbnail_file (key);
+		ImageSurface surface;
+
+		if (file == null || !((!) file).query_exists ()) {
+			return null;
+		}
+
+		surface = new ImageSurface.from_png ((!) ((!) file).get_path ());
+
+		if (surface.status () != Status.SUCCESS) {
+			printd (@"Can't read thumbnail $key: $(surface.status ())\n");
+			return null;
+		}
+
+		return surface;
+	}
+
+	void save_thumbnail (string key, ImageSurface surface) {
+		File? file = get_thumbnail_file (key);
+		File folder;
+		File temp_file;
+
+		if (file == null) {
+			return;
+		}
+
+		folder = (!) ((!) file).get_parent ();
+		temp_file = get_child (folder, "." + key + ".png.tmp");
+
+		try {
+			if (!folder.query_exists ()) {
+				folder.make_directory_with_parents ();
+			}
+
+			if (surface.write_to_png ((!) temp_file.get_path ()) != Status.SUCCESS) {
+				warning (@"Can't write thumbnail $key.");
+				return;
+			}
+
+			temp_file.move ((!) file, FileCopyFlags.OVERWRITE);
+		} catch (GLib.Error e) {
+			printd (@"Can't write thumbnail: $(e.message)\n");
+		}
+	}
+}
+
+/** A thumbnail for one item in the overview. Everything that depends on
+ * the main window is computed when the request is created, the glyph is
+ * copied so that it can be rendered on another thread.
+ */
+public class ThumbnailRequest : GLib.Object {
+	const string MAGIC = "BirdFont thumbnail 2";
+
+	public OverviewItem item;
+	public string key;
+
+	Glyph glyph;
+	int width;
+	int height;
+	double screen_scale;
+	double scale;
+	double offset_x;
+	double offset_y;
+
+	/** @param width thumbnail width without the screen scale
+	 * @param height thumbnail height without the screen scale
+	 * @param scale the size of the glyph in the thumbnail
+	 * @param offset_x position of the glyph after it has been scaled
+	 * @param offset_y position of the glyph after it has been scaled
+	 */
+	public ThumbnailRequest (OverviewItem item, Glyph g, int width, int height,
+		double scale, double offset_x, double offset_y) {
+
+		this.item = item;
+		this.width = width;
+		this.height = height;
+		this.scale = scale;
+		this.offset_x = offset_x;
+		this.offset_y = offset_y;
+
+		screen_scale = Screen.get_scale ();
+		glyph = g.copy ();
+		glyph.allocation = g.allocation;
+		key = get_key ();
+	}
+
+	/** Hash of everything that changes how the glyph is drawn in the 
+	 * thumbnail. */
+	string get_key () {
+		StringBuilder data = new StringBuilder ();
+		string color;
+
+		data.append (MAGIC);
+		data.append (@" $width $height $screen_scale $scale $offset_x $offset_y ");
+		data.append (@"$(glyph.allocation.width) $(glyph.allocation.height)\n");
+
+		foreach (Path p in glyph.get_visible_paths ()) {
+			color = (p.color != null) ? ((!) p.color).to_string () : "none";
+			data.append (@"$(p.stroke) $((int) p.line_cap) $(p.skew) $(p.is_open ()) $color ");
+			BirdFontFile.append_point_data (p, data);
+			data.append ("\n");
+		}
+
+		return Checksum.compute_for_string (ChecksumType.SHA1, data.str);
+	}
+
+	public ImageSurface render () {
+		ImageSurface s;
+		Context c;
+
+		s = new ImageSurface (Format.ARGB32, (int) (screen_scale * width), (int) (screen_scale * height));
+		c = new Context (s);
+
+		c.save ();
+		c.scale (scale * screen_scale, scale * screen_scale);
+		c.translate (offset_x, offset_y);
+		glyph.draw_paths (c, Color.black ());
+		c.restore ();
+
+		return s;
+	}
+}
+
+class CachedThumbnail : GLib.Object {
+	public ImageSurface surface;
+	public int64 size;
+	public uint64 last_used = 0;
+
+	public CachedThumbnail (ImageSurface surface) {
+		this.surface = surface;
+		size = (int64) surface.get_stride () * surface.get_height ();
+	}
+}
+
+}
@@ -3,8 +3,13 @@ import fnmatch
 import glob
 import types
 import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from os import path
+from scripts import buildreport
+from scripts.buildreport import BuildReport
+from scripts.buildstate import BuildState
 from scripts.run import run
+from scripts.run import run_output
 
 def get_sources_path(directory, pattern):
     """obtain path of all source files for a matching pattern"""
@@ -128,6 +133,15 @@ class Builder(object):
                 'targets': [path.join('build', 'bin', self.link)]
             }
 
+def check_dependencies(task):
+    for dep in task['file_dep']:
+        if not path.isfile(dep):
+            targets = " ".join(str(x) for x in task['targets'])
+            print('Build failed because dependency is not created yet: ' + dep)
+            print()
+            print('Targetes depending on ' + dep + ":\n" + targets)
+            exit(1)
+
 def is_up_to_date(task):
     for target in task['targets']:
         if not path.isfile(target):
@@ -136,13 +150,7 @@ def is_up_to_date(task):
     if not 'file_dep' in task.keys():
         return False
 
-    for dep in task['file_dep']:
-        if not path.isfile(dep):
-            targets = " ".join(str(x) for x in task['targets'])
-            print('Build failed because dependency is not created yet: ' + dep)
-            print()
-            print('Targetes depending on ' + dep + ":\n" + targets)
-            exit(1)
+    check_dependencies(task)
 
     target_times = []
     for target in task['targets']:
@@ -167,18 +175,219 @@ def get_name(task):
     except KeyError:
         return task['basename']
 
-def execute_task(task):
-    if is_up_to_date(task):
-        print(get_name(task) + ' - up to date.')
+def is_task_up_to_date(task, state):
+    """compare content hashes with the last build, modification times
+    are only used for tasks that have not been done before"""
+    if not 'file_dep' in task.keys():
+        return False
+
+    check_dependencies(task)
+
+    name = get_name(task)
+    if state.has_signature(name):
+        return state.is_unchanged(name, task)
+
+    return is_up_to_date(task)
+
+def skip_task(task, state):
+    """returns the status if the task is up to date or its target
+    could be copied from the object cache, None otherwise"""
+    name = get_name(task)
+
+    if is_task_up_to_date(task, state):
+        print(name + ' - up to date.')
+        status = buildreport.UP_TO_DATE
+    elif state.is_cacheable(task) and state.copy_from_cache(task):
+        print(name + ' - copied from object cache.')
+        status = buildreport.CACHED
     else:
+        return None
+
+    state.task_done(name, task)
+    return status
+
+def finish_task(task, state):
+    state.task_done(get_name(task), task)
+
+    if state.is_cacheable(task):
+        state.add_to_cache(task)
+
+def is_python_action(action):
+    return callable(action) or isinstance(action, tuple)
+
+def run_python_action(action):
+    """run a function or a tuple with a function and its arguments,
+    the same actions as doit supports"""
+    if isinstance(action, tuple):
+        function = action[0]
+        args = action[1] if len(action) > 1 else []
+        kwargs = action[2] if len(action) > 2 else {}
+        function(*args, **kwargs)
+    else:
+        action()
+
+def execute_task(task, state):
+    status = skip_task(task, state)
+
+    if status == None:
         for action in task['actions']:
-            print(action)
-            run(action)
+            if is_python_action(action):
+                run_python_action(action)
+            else:
+                print(action)
+                run(action)
+        finish_task(task, state)
+        status = buildreport.DONE
+
+    return status
+
+def run_actions(task):
+    """run all actions in a task and collect the output, returns
+    True and the output if all actions succeeded and the time when
+    the task started and ended"""
+    start = time.time()
+    output = []
+    for action in task['actions']:
+        if is_python_action(action):
+            run_python_action(action)
+            continue
+
+        output.append(action + '\n')
+        (status, printed) = run_output(action)
+        output.append(printed)
+
+        if not status == 0:
+            output.append('Error: ' + action + '\n')
+            return (False, ''.join(output), start, time.time())
+
+    return (True, ''.join(output), start, time.time())
+
+def get_tasks(generator):
+    """all tasks in a generator, list or nested generators"""
+    tasks = []
+    for task in generator:
+        if isinstance(task, types.GeneratorType) or isinstance(task, list):
+            tasks += get_tasks(task)
+        else:
+            tasks.append(task)
+    return tasks
+
+def get_dependencies(tasks):
+    """set of task indices that each task depends on, a task depends
+    on the tasks that create the files in its file_dep list"""
+    producers = {}
+    for index, task in enumerate(tasks):
+        for target in task.get('targets', []):
+            producers[target] = index
+
+    dependencies = []
+    for index, task in enumerate(tasks):
+        task_dependencies = set()
+        for dependency in task.get('file_dep', []):
+            producer = producers.get(dependency, index)
+            if not producer == index:
+                task_dependencies.add(producer)
+        dependencies.append(task_dependencies)
+
+    return dependencies
+
+def get_default_jobs():
+    return os.cpu_count() or 1
+
+def process_tasks(generator, jobs = None, object_cache = None):
+    """run the tasks in dependency order, up to jobs tasks at the same
+    time, the output of each task is printed when it is done
+
+    object_cache is an optional directory where objects are shared
+    between builds, the time spent on each task is written to a
+    report in build/reports"""
+    if jobs == None:
+        jobs = get_default_jobs()
+
+    tasks = get_tasks(generator)
+    dependencies = get_dependencies(tasks)
+    state = BuildState(object_cache)
+    report = BuildReport([get_name(task) for task in tasks], dependencies, jobs)
+
+    try:
+        if jobs <= 1:
+            process_tasks_serial(tasks, state, report)
+        else:
+            process_task_graph(tasks, dependencies, jobs, state, report)
+    finally:
+        state.save()
+
+        if object_cache != None:
+            print('Object cache: ' + str(state.cache_hits) + ' hits, '
+                + str(state.cache_misses) + ' misses')
+
+        report.print_summary()
+        print('Build report: ' + report.save())
+
+def process_tasks_serial(tasks, state, report):
+    for index, task in enumerate(tasks):
+        start = time.time()
+        status = buildreport.FAILED
+
+        try:
+            status = execute_task(task, state)
+        finally:
+            report.add(index, status, start, time.time(), state.is_cacheable(task))
+
+def process_task_graph(tasks, dependencies, jobs, state, report):
+    dependents = [[] for task in tasks]
+    for index, task_dependencies in enumerate(dependencies):
+        for dependency in task_dependencies:
+            dependents[dependency].append(index)
+
+    waiting = [len(d) for d in dependencies]
+    ready = [index for index in range(len(tasks)) if waiting[index] == 0]
+    running = {}
+    completed = 0
+    failed = False
+
+    def task_done(index):
+        for dependent in dependents[index]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                ready.append(dependent)
+
+    with ThreadPoolExecutor(max_workers = jobs) as pool:
+        while ready or running:
+            while ready and not failed and len(running) < jobs:
+                index = ready.pop(0)
+                task = tasks[index]
+                start = time.time()
+                status = skip_task(task, state)
+                if not status == None:
+                    report.add(index, status, start, time.time())
+                    completed += 1
+                    task_done(index)
+                else:
+                    running[pool.submit(run_actions, task)] = index
+
+            if not running:
+                break
+
+            done, not_done = wait(running, return_when = FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                (succeeded, output, start, end) = future.result()
+                print(output, end = '', flush = True)
+                cacheable = state.is_cacheable(tasks[index])
+                if succeeded:
+                    finish_task(tasks[index], state)
+                    report.add(index, buildreport.DONE, start, end, cacheable)
+                    completed += 1
+                    task_done(index)
+                else:
+                    report.add(index, buildreport.FAILED, start, end, cacheable)
+                    failed = True
 
-def process_tasks(generator):
-	for task in generator:
-		if isinstance(task, types.GeneratorType):
-			process_tasks(task)
-		else:
-			execute_task(task)
+    if failed:
+        print('Build failed.')
+        exit(1)
 
+    if completed < len(tasks):
+        print('Circular dependencies between build tasks.')
+        exit(1)
@@ -0,0 +1,158 @@
+"""
+Copyright (C) 2026 Johan Mattsson
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+import time
+from os import path
+
+REPORT_DIRECTORY = path.join('build', 'reports')
+REPORT_VERSION = 1
+
+UP_TO_DATE = 'up to date'
+CACHED = 'copied from cache'
+DONE = 'done'
+FAILED = 'failed'
+
+class BuildReport(object):
+    """time spent on each task in a build, written as JSON to
+    build/reports so that build times can be compared over time"""
+
+    def __init__(self, names, dependencies, jobs):
+        self.names = names
+        self.dependencies = dependencies
+        self.jobs = jobs
+        self.records = {}
+        self.start = time.time()
+        self.end = self.start
+
+    def add(self, index, status, start, end, cacheable = False):
+        cache = None
+
+        if status == CACHED:
+            cache = 'hit'
+        elif cacheable and (status == DONE or status == FAILED):
+            cache = 'miss'
+
+        self.records[index] = {
+            'status': status,
+            'start': start - self.start,
+            'duration': end - start,
+            'cache': cache,
+        }
+
+        self.end = max(self.end, end)
+
+    def get_duration(self, index):
+        if index in self.records:
+            return self.records[index]['duration']
+        return 0
+
+    def get_critical_path(self):
+        """the chain of dependent tasks with the longest total duration"""
+        finish = {}
+        previous = {}
+
+        def get_finish(index):
+            if not index in finish:
+                latest = None
+                latest_finish = 0
+                for dependency in self.dependencies[index]:
+                    if latest == None or get_finish(dependency) > latest_finish:
+                        latest = dependency
+                        latest_finish = get_finish(dependency)
+                previous[index] = latest
+                finish[index] = latest_finish + self.get_duration(index)
+            return finish[index]
+
+        last = None
+        for index in range(len(self.names)):
+            index_finish = get_finish(index)
+            if last == None or index_finish > finish[last]:
+                last = index
+
+        critical_path = []
+        while not last == None:
+            critical_path.insert(0, last)
+            last = previous[last]
+
+        return critical_path
+
+    def get_slowest(self, count):
+        done = [index for index in self.records.keys()
+            if self.records[index]['status'] in (DONE, FAILED)]
+        done.sort(key = lambda index: self.records[index]['duration'], reverse = True)
+        return done[0:count]
+
+    def to_json(self):
+        tasks = []
+        for index, name in enumerate(self.names):
+            task = {
+                'name': name,
+                'dependencies': sorted([self.names[d] for d in self.dependencies[index]]),
+            }
+            task.update(self.records.get(index, {'status': 'not started'}))
+            tasks.append(task)
+
+        return {
+            'version': REPORT_VERSION,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.start)),
+            'jobs': self.jobs,
+            'duration': self.end - self.start,
+            'critical_path': [self.names[index] for index in self.get_critical_path()],
+            'tasks': tasks,
+        }
+
+    def save(self):
+        """write the report to a new file and return its path, a report
+        from an earlier build is never replaced"""
+        name = time.strftime('build-%Y%m%d-%H%M%S', time.localtime(self.start))
+        name += '-%03d' % (int(self.start * 1000) % 1000)
+        os.makedirs(REPORT_DIRECTORY, exist_ok = True)
+        suffix = ''
+        number = 1
+
+        while True:
+            report_path = path.join(REPORT_DIRECTORY, name + suffix + '.json')
+            try:
+                with open(report_path, 'x') as f:
+                    json.dump(self.to_json(), f, indent = 1)
+                return report_path
+            except FileExistsError:
+                number += 1
+                suffix = '-' + str(number)
+
+    def print_summary(self, count = 10):
+        slowest = self.get_slowest(count)
+
+        if len(slowest) == 0:
+            return
+
+        print()
+        print('Slowest tasks:')
+        for index in slowest:
+            print('%8.2fs  %s' % (self.get_duration(index), self.names[index]))
+
+        print()
+        print('Critical path:')
+        total = 0
+        for index in self.get_critical_path():
+            if self.records.get(index, {}).get('status') in (None, UP_TO_DATE):
+                continue
+            total += self.get_duration(index)
+            print('%8.2fs  %s' % (self.get_duration(index), self.names[index]))
+        print('%8.2fs  total, the build took %.2fs' % (total, self.end - self.start))
@@ -0,0 +1,204 @@
+"""
+Copyright (C) 2026 Johan Mattsson
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from os import path
+
+try:
+    from scripts.run import run_output
+except ImportError:
+    from run import run_output
+
+STATE_FILE = path.join('build', 'builder-state.json')
+STATE_VERSION = 1
+RECENTLY_MODIFIED = 2 * 1000 * 1000 * 1000
+COMMAND_SUBSTITUTION = re.compile(r'\$\(([^()]*)\)')
+
+def hash_file(file_path):
+    sha1 = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+def get_action_name(action):
+    if isinstance(action, tuple):
+        return get_action_name(action[0]) + ' ' + repr(action[1:])
+    if callable(action):
+        return action.__module__ + '.' + action.__name__
+    return action
+
+def is_compile_task(task):
+    targets = task.get('targets', [])
+    return ('file_dep' in task.keys()
+        and len(targets) == 1
+        and targets[0].endswith('.o'))
+
+class BuildState(object):
+    """content hashes of the dependencies and commands for each task in
+    the last build, a task is up to date if they have not changed
+    even if the files are newer than the targets"""
+
+    def __init__(self, object_cache = None):
+        self.object_cache = object_cache
+        self.file_hashes = {}
+        self.signatures = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.command_output = {}
+        self.load()
+
+    def load(self):
+        if not path.isfile(STATE_FILE):
+            return
+
+        try:
+            with open(STATE_FILE, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print('Ignoring build state: ' + str(e))
+            return
+
+        if state.get('version') == STATE_VERSION:
+            self.file_hashes = state['files']
+            self.signatures = state['tasks']
+
+    def save(self):
+        temp_file = STATE_FILE + '.tmp'
+        state = {
+            'version': STATE_VERSION,
+            'files': self.file_hashes,
+            'tasks': self.signatures,
+        }
+
+        os.makedirs(path.dirname(STATE_FILE), exist_ok = True)
+        with open(temp_file, 'w') as f:
+            json.dump(state, f, indent = 1, sort_keys = True)
+        os.replace(temp_file, STATE_FILE)
+
+    def get_file_hash(self, file_path):
+        """content hash of a file, the hash is computed again only if
+        the size or modification time has changed"""
+        info = os.stat(file_path)
+        stamp = [info.st_mtime_ns, info.st_size]
+        entry = self.file_hashes.get(file_path)
+
+        if entry != None and entry[0:2] == stamp:
+            return entry[2]
+
+        file_hash = hash_file(file_path)
+
+        # a file can be changed again within the resolution of its
+        # timestamp, recently modified files are hashed in the next build too
+        if time.time_ns() - info.st_mtime_ns < RECENTLY_MODIFIED:
+            stamp = [0, 0]
+
+        self.file_hashes[file_path] = stamp + [file_hash]
+        return file_hash
+
+    def get_command_output(self, command):
+        """output from a shell command, each command is only run once
+        in a build"""
+        if not command in self.command_output:
+            (status, output) = run_output(command)
+            self.command_output[command] = str(status) + ' ' + ' '.join(output.split())
+        return self.command_output[command]
+
+    def get_toolchain(self, command):
+        """the command with $(...) substitutions expanded and the version
+        of the compiler, objects built with other compiler flags, library
+        headers or compilers are not taken from the cache"""
+        expanded = COMMAND_SUBSTITUTION.sub(
+            lambda match: self.get_command_output(match.group(1)), command)
+        words = expanded.split()
+        compiler = words[0] if len(words) > 0 else ''
+        return expanded + '\n' + self.get_command_output(compiler + ' --version')
+
+    def get_signature(self, task):
+        """hash of the commands and the content of all dependencies,
+        the toolchain is a part of the signature for objects"""
+        sha1 = hashlib.sha1()
+
+        for action in task['actions']:
+            sha1.update(get_action_name(action).encode('utf-8'))
+            sha1.update(b'\n')
+
+            if is_compile_task(task) and isinstance(action, str):
+                sha1.update(self.get_toolchain(action).encode('utf-8'))
+                sha1.update(b'\n')
+
+        for dependency in sorted(task.get('file_dep', [])):
+            if not path.basename(dependency) == 'placeholder':
+                sha1.update((dependency + ' ' + self.get_file_hash(dependency) + '\n').encode('utf-8'))
+
+        return sha1.hexdigest()
+
+    def is_unchanged(self, name, task):
+        """True if the task was done with the same commands and
+        dependencies in the last build and its targets still exist"""
+        if not 'file_dep' in task.keys():
+            return False
+
+        for target in task.get('targets', []):
+            if not path.isfile(target):
+                return False
+
+        return self.signatures.get(name) == self.get_signature(task)
+
+    def has_signature(self, name):
+        return name in self.signatures
+
+    def task_done(self, name, task):
+        if 'file_dep' in task.keys():
+            self.signatures[name] = self.get_signature(task)
+
+    def is_cacheable(self, task):
+        """objects are the only targets that are shared between builds"""
+        return self.object_cache != None and is_compile_task(task)
+
+    def get_cache_path(self, task):
+        signature = self.get_signature(task)
+        return path.join(self.object_cache, signature[0:2], signature + '.o')
+
+    def copy_from_cache(self, task):
+        """copy the object for a task from the shared cache, returns
+        False if it is not in the cache"""
+        cached = self.get_cache_path(task)
+
+        if not path.isfile(cached):
+            self.cache_misses += 1
+            return False
+
+        shutil.copyfile(cached, task['targets'][0])
+        self.cache_hits += 1
+        return True
+
+    def add_to_cache(self, task):
+        cached = self.get_cache_path(task)
+        temp_file = cached + '.' + str(os.getpid()) + '.tmp'
+
+        try:
+            os.makedirs(path.dirname(cached), exist_ok = True)
+            shutil.copyfile(task['targets'][0], temp_file)
+            os.replace(temp_file, cached)
+        except OSError as e:
+            print('Can not add ' + task['targets'][0] + ' to the object cache: ' + str(e))
@@ -0,0 +1,332 @@
+#!/usr/bin/python3
+"""
+Copyright (C) 2026 Johan Mattsson
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Fuzz the BF and SVG parsers with several instances of birdfont-test
+running in persistent mode. Each worker mutates the seed files, sends
+the file names to its birdfont-test process and restarts it when it
+crashes. Crashes are grouped by the functions in their backtrace and
+the first input for each crash is saved in build/fuzz/bugs.
+
+Usage: ./scripts/fuzz.py [-j N] BF|SVG SEED...
+"""
+
+import hashlib
+import os
+import random
+import re
+import select
+import subprocess
+import sys
+import threading
+import time
+from optparse import OptionParser
+from os import path
+
+FUZZ_DIRECTORY = path.join('build', 'fuzz')
+BUGS_DIRECTORY = path.join(FUZZ_DIRECTORY, 'bugs')
+HARNESS = './birdfont-test.sh'
+MAX_CASE_SIZE = 1024 * 1024
+SIGNATURE_FRAMES = 5
+
+DONE = 0
+CRASHED = 1
+TIMEOUT = 2
+
+INTERESTING = [b'0', b'-1', b'1', b'65535', b'65536', b'-2147483648',
+               b'4294967296', b'1e308', b'-1e308', b'NaN', b'inf', b'',
+               b'"', b'<', b'>', b'/>', b'&amp;', b'&#0;', b'\x00']
+
+def mutate(rng, data, seeds):
+    """a few random byte, chunk and splice mutations"""
+    data = bytearray(data)
+
+    for i in range(rng.randint(1, 8)):
+        if len(data) == 0:
+            data = bytearray(rng.choice(seeds))
+            continue
+
+        position = rng.randrange(len(data))
+        length = rng.randint(1, min(64, len(data) - position))
+        operation = rng.randrange(6)
+
+        if operation == 0:
+            data[position] ^= 1 << rng.randrange(8)
+        elif operation == 1:
+            data[position] = rng.randrange(256)
+        elif operation == 2:
+            del data[position:position + length]
+        elif operation == 3:
+            chunk = data[position:position + length]
+            insert = rng.randrange(len(data))
+            data[insert:insert] = chunk * rng.randint(1, 16)
+        elif operation == 4:
+            data[position:position + rng.randint(0, 8)] = rng.choice(INTERESTING)
+        else:
+            other = rng.choice(seeds)
+            if len(other) > 0:
+                data[position:] = other[rng.randrange(len(other)):]
+
+    return bytes(data[0:MAX_CASE_SIZE])
+
+def get_signature(backtrace, returncode):
+    """hash of the innermost functions in a backtrace, frames in the
+    signal handler and in libc are not part of the signature"""
+    functions = []
+
+    for line in backtrace.splitlines():
+        match = re.search(r'\(([^+)]*)\+0x[0-9a-f]+\)', line)
+        if match == None or match.group(1) == '':
+            continue
+
+        function = match.group(1)
+        if ('backtrace' in function or function.startswith('__')
+            or function in ('raise', 'abort', 'killpg')):
+            continue
+
+        functions.append(function)
+        if len(functions) == SIGNATURE_FRAMES:
+            break
+
+    if len(functions) == 0:
+        functions.append('exit code ' + str(returncode))
+
+    description = '\n'.join(functions)
+    return (hashlib.sha1(description.encode('utf-8')).hexdigest()[0:16], description)
+
+class Harness(object):
+    """a birdfont-test process in persistent mode"""
+
+    def __init__(self, file_type, directory, timeout):
+        self.file_type = file_type
+        self.timeout = timeout
+        self.stderr_path = path.join(directory, 'stderr.txt')
+        self.process = None
+
+    def start(self):
+        stderr = open(self.stderr_path, 'wb')
+        self.process = subprocess.Popen([HARNESS, 'FUZZ', self.file_type],
+            stdin = subprocess.PIPE, stdout = subprocess.PIPE,
+            stderr = stderr, bufsize = 0, start_new_session = True)
+        stderr.close()
+
+    def stop(self):
+        if self.process != None and self.process.poll() == None:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def wait_until_done(self):
+        """returns DONE when the harness has loaded the file, CRASHED if
+        it exited and TIMEOUT if it did not finish in time, other
+        output from the harness is ignored"""
+        output = b''
+        deadline = time.time() + self.timeout
+
+        while not (output == b'DONE\n' or output.endswith(b'\nDONE\n')):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return TIMEOUT
+
+            readable, writable, failed = select.select([self.process.stdout], [], [], remaining)
+            if len(readable) == 0:
+                return TIMEOUT
+
+            data = os.read(self.process.stdout.fileno(), 4096)
+            if data == b'':
+                return CRASHED
+
+            output = output[-8:] + data
+
+        return DONE
+
+    def run(self, case_path):
+        """load a file, returns None if it was loaded or a tuple with
+        the signature and description of the crash"""
+        if self.process == None:
+            self.start()
+
+        try:
+            self.process.stdin.write((path.abspath(case_path) + '\n').encode('utf-8'))
+        except BrokenPipeError:
+            pass
+
+        status = self.wait_until_done()
+
+        if status == DONE:
+            return None
+
+        if status == TIMEOUT:
+            self.stop()
+            return ('timeout', 'timeout')
+
+        returncode = self.process.wait()
+        self.process = None
+
+        with open(self.stderr_path, 'r', errors = 'replace') as f:
+            backtrace = f.read()
+
+        signature = get_signature(backtrace, returncode)
+        return (signature[0], signature[1] + '\n\n' + backtrace)
+
+class Fuzzer(object):
+
+    def __init__(self, file_type, seeds, jobs, timeout, minimize_crashes):
+        self.file_type = file_type
+        self.extension = '.bf' if file_type == 'BF' else '.svg'
+        self.seeds = seeds
+        self.jobs = jobs
+        self.timeout = timeout
+        self.minimize_crashes = minimize_crashes
+        self.lock = threading.Lock()
+        self.executions = 0
+        self.crashes = 0
+        self.signatures = set()
+        self.running = True
+
+        for bug in os.listdir(BUGS_DIRECTORY):
+            if bug.endswith('.txt'):
+                self.signatures.add(bug[0:-len('.txt')])
+
+    def add_crash(self, signature, description, data):
+        """returns True if this is the first crash with the signature"""
+        with self.lock:
+            self.crashes += 1
+
+            if signature in self.signatures:
+                return False
+
+            self.signatures.add(signature)
+
+        with open(path.join(BUGS_DIRECTORY, signature + self.extension), 'wb') as f:
+            f.write(data)
+
+        with open(path.join(BUGS_DIRECTORY, signature + '.txt'), 'w') as f:
+            f.write(description)
+
+        print('New crash ' + signature + ' saved in ' + BUGS_DIRECTORY)
+        return True
+
+    def minimize(self, harness, case_path, signature, data):
+        """remove chunks from a crashing input as long as it crashes
+        with the same signature"""
+        chunk = len(data) // 2
+
+        while chunk > 0:
+            position = 0
+            while position < len(data):
+                smaller = data[0:position] + data[position + chunk:]
+
+                with open(case_path, 'wb') as f:
+                    f.write(smaller)
+
+                crash = harness.run(case_path)
+                if crash != None and crash[0] == signature:
+                    data = smaller
+                else:
+                    position += chunk
+            chunk //= 2
+
+        return data
+
+    def work(self, worker):
+        rng = random.Random(os.urandom(16))
+        directory = path.join(FUZZ_DIRECTORY, 'worker-' + str(worker))
+        case_path = path.join(directory, 'case' + self.extension)
+        os.makedirs(directory, exist_ok = True)
+        harness = Harness(self.file_type, directory, self.timeout)
+
+        try:
+            while self.running:
+                data = mutate(rng, rng.choice(self.seeds), self.seeds)
+
+                with open(case_path, 'wb') as f:
+                    f.write(data)
+
+                crash = harness.run(case_path)
+
+                with self.lock:
+                    self.executions += 1
+
+                if crash != None:
+                    (signature, description) = crash
+                    if self.add_crash(signature, description, data) and self.minimize_crashes:
+                        smaller = self.minimize(harness, case_path, signature, data)
+                        minimized = path.join(BUGS_DIRECTORY, signature + '.min' + self.extension)
+                        with open(minimized, 'wb') as f:
+                            f.write(smaller)
+        finally:
+            harness.stop()
+
+    def print_statistics(self, start):
+        with self.lock:
+            rate = self.executions / max(time.time() - start, 0.001)
+            print('%d executions, %.0f/s, %d crashes, %d unique'
+                % (self.executions, rate, self.crashes, len(self.signatures)))
+
+    def run(self):
+        threads = [threading.Thread(target = self.work, args = (i,)) for i in range(self.jobs)]
+        start = time.time()
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                time.sleep(10)
+                self.print_statistics(start)
+        except KeyboardInterrupt:
+            self.running = False
+
+        for thread in threads:
+            thread.join()
+
+        self.print_statistics(start)
+
+def load_seeds(seed_paths):
+    """read the seed files, duplicates are only used once"""
+    seeds = {}
+    for seed_path in seed_paths:
+        try:
+            with open(seed_path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            print('Can not read seed file ' + seed_path + ': ' + e.strerror)
+            exit(1)
+        seeds[hashlib.sha1(data).hexdigest()] = data
+    return list(seeds.values())
+
+def main(arguments, usage = 'usage: %prog [options] BF|SVG SEED...'):
+    parser = OptionParser(usage = usage)
+    parser.add_option('-j', '--jobs', dest = 'jobs', type = 'int', default = os.cpu_count() or 1,
+        help = 'number of birdfont-test processes', metavar = 'N')
+    parser.add_option('-t', '--timeout', dest = 'timeout', type = 'float', default = 10,
+        help = 'seconds before an input is considered to hang', metavar = 'SECONDS')
+    parser.add_option('-m', '--minimize', dest = 'minimize', action = 'store_true', default = False,
+        help = 'also save a minimized copy of each new crash')
+    (options, args) = parser.parse_args(arguments)
+
+    if len(args) < 2 or not args[0] in ('BF', 'SVG'):
+        parser.print_help()
+        exit(1)
+
+    seeds = load_seeds(args[1:])
+    os.makedirs(BUGS_DIRECTORY, exist_ok = True)
+    fuzzer = Fuzzer(args[0], seeds, options.jobs, options.timeout, options.minimize)
+    fuzzer.run()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -25,3 +25,10 @@ def run(cmd):
 	if not process.returncode == 0:
 		print("Error: " + cmd)
 		exit(1)
+
+def run_output(cmd):
+	"""run a command and return its exit code and everything it printed"""
+	cmd = "sh -c \"" + cmd.replace ("\"", "\\\"") + "\""
+	process = subprocess.Popen (cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+	output = process.communicate()[0]
+	return (process.returncode, output.decode('utf-8', 'replace'))
@@ -17,19 +17,99 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
 import glob
+from os import path
 
 try:
     from scripts.run import run
 except ImportError:
     from run import run
 
-def compile_translations ():
-    for f_name in glob.glob('po/*.po'):
+COMPLETENESS_FILE = "birdfont.completeness"
+
+def get_build_path (pofile):
+    lang = pofile.replace ("\\", "/").replace ("po/", "").replace (".po", "")
+    return "build/locale/" + lang + "/LC_MESSAGES/"
+
+def completeness (pofile):
+    """ Returns the completeness of the translation in percent """
+    translated = 0
+    total = 0
+    msgid = None
+    msgstr = None
+    current = None
+
+    with open (pofile, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip ()
+
+            if line == "" or line.startswith ("#"):
+                continue
+
+            if line.startswith ("msgid "):
+                if msgid != None and "".join (msgid) != "":
+                    total += 1
+                    if "".join (msgstr) != "":
+                        translated += 1
+                msgid = []
+                msgstr = []
+                current = msgid
+            elif line.startswith ("msgstr"):
+                current = msgstr
+            elif not line.startswith ("\""):
+                current = None
+
+            if current == None:
+                continue
+
+            current.append (line[line.find ("\""):].strip ("\""))
+
+    if msgid != None and "".join (msgid) != "":
+        total += 1
+        if "".join (msgstr) != "":
+            translated += 1
+
+    if total == 0:
+        return 0
+
+    return (translated / total) * 100
+
+def write_completeness (pofile, target):
+    """ Store the completeness next to the compiled translation """
+    with open (target, 'w') as f:
+        f.write (str (completeness (pofile)) + "\n")
+
+def get_completeness (pofile):
+    """ Completeness of a translation, from the compiled translation
+    if it has been built after the last change of the po file """
+    cached = get_build_path (pofile) + COMPLETENESS_FILE
+
+    if path.isfile (cached) and path.getmtime (cached) >= path.getmtime (pofile):
+        with open (cached, 'r') as f:
+            return float (f.read ())
+
+    return completeness (pofile)
+
+def translation_tasks ():
+    """ One task for each po file, the translation is compiled and its
+    completeness is computed only if the po file has changed """
+    for f_name in sorted (glob.glob ('po/*.po')):
+        f_name = f_name.replace ("\\", "/")
         lang = f_name.replace ("po/", "").replace (".po", "")
-        lang = lang.replace ("\\", "/")
-        build_path = "build/locale/" + lang + "/LC_MESSAGES/"
+        build_path = get_build_path (f_name)
         target = build_path + "birdfont.mo"
-        run ("mkdir -p " + build_path);
-        f_name = f_name.replace ("\\", "/")
-        run ("msgfmt --output=%s %s" % (target, f_name));
-        
+        completeness_file = build_path + COMPLETENESS_FILE
+        yield {
+            'name': 'translation ' + lang,
+            'file_dep': [f_name],
+            'actions': ["mkdir -p %s && msgfmt --output=%s %s" % (build_path, target, f_name),
+                        (write_completeness, [f_name, completeness_file])],
+            'targets': [target, completeness_file],
+        }
+
+def compile_translations ():
+    try:
+        from scripts.builder import process_tasks
+    except ImportError:
+        from builder import process_tasks
+
+    process_tasks (translation_tasks ())